@@ -0,0 +1,375 @@
+"""
+Batched Action Applier
+Empire Amplify - Automation Rules
+
+Applies recommended actions with batched mutate calls:
+- PAUSE actions through CampaignService.mutate_campaigns
+- INCREASE_BUDGET actions through CampaignBudgetService.mutate_campaign_budgets
+- ADD_NEGATIVE and PAUSE_KEYWORD actions (see keyword_automation) through
+  AdGroupCriterionService.mutate_ad_group_criteria
+
+Every batch is sent in partial-failure mode, so one bad operation does not
+reject the rest of its batch. Per-operation errors are mapped back to the
+action that produced them.
+"""
+
+from loguru import logger
+
+from google_ads_client import handle_google_ads_exception
+
+# Operations per mutate request (the API accepts up to 10,000)
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _chunks(items, size):
+    """Yield successive slices of at most size items."""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def build_pause_operation(client, customer_id, campaign_id):
+    """Build a CampaignOperation that pauses a campaign."""
+    campaign_service = client.get_service("CampaignService")
+    campaign_operation = client.get_type("CampaignOperation")
+
+    campaign = campaign_operation.update
+    campaign.resource_name = campaign_service.campaign_path(customer_id, campaign_id)
+    campaign.status = client.enums.CampaignStatusEnum.PAUSED
+
+    campaign_operation.update_mask.paths.append("status")
+
+    return campaign_operation
+
+
+def build_budget_operation(client, budget_resource_name, amount_micros):
+    """Build a CampaignBudgetOperation that sets a budget amount."""
+    budget_operation = client.get_type("CampaignBudgetOperation")
+
+    budget = budget_operation.update
+    budget.resource_name = budget_resource_name
+    budget.amount_micros = amount_micros
+
+    budget_operation.update_mask.paths.append("amount_micros")
+
+    return budget_operation
+
+
+def build_keyword_pause_operation(client, customer_id, ad_group_id, criterion_id):
+    """Build an AdGroupCriterionOperation that pauses a keyword."""
+    criterion_service = client.get_service("AdGroupCriterionService")
+    criterion_operation = client.get_type("AdGroupCriterionOperation")
+
+    criterion = criterion_operation.update
+    criterion.resource_name = criterion_service.ad_group_criterion_path(customer_id, ad_group_id, criterion_id)
+    criterion.status = client.enums.AdGroupCriterionStatusEnum.PAUSED
+
+    criterion_operation.update_mask.paths.append("status")
+
+    return criterion_operation
+
+
+def build_negative_keyword_operation(client, customer_id, ad_group_id, text):
+    """Build an AdGroupCriterionOperation that adds an exact-match negative keyword to an ad group."""
+    criterion_service = client.get_service("AdGroupCriterionService")
+    criterion_operation = client.get_type("AdGroupCriterionOperation")
+
+    criterion = criterion_operation.create
+    criterion.ad_group = criterion_service.ad_group_path(customer_id, ad_group_id)
+    criterion.negative = True
+    criterion.keyword.text = text
+    criterion.keyword.match_type = client.enums.KeywordMatchTypeEnum.EXACT
+
+    return criterion_operation
+
+
+def get_partial_failure_errors(client, response):
+    """
+    Extract per-operation errors from a partial-failure mutate response.
+
+    Args:
+        client: Google Ads client
+        response: Mutate response sent with partial_failure=True
+
+    Returns:
+        dict: Operation index -> error message
+    """
+    errors = {}
+    partial_failure_error = response.partial_failure_error
+
+    if not partial_failure_error or not partial_failure_error.code:
+        return errors
+
+    failure_type = type(client.get_type("GoogleAdsFailure"))
+
+    for detail in partial_failure_error.details:
+        failure = failure_type.deserialize(detail.value)
+        for error in failure.errors:
+            index = error.location.field_path_elements[0].index
+            errors.setdefault(index, error.message)
+
+    return errors
+
+
+def build_budget_index(df):
+    """
+    Build a campaign_id -> campaign budget index from a list_campaigns frame.
+
+    Args:
+        df: DataFrame from list_campaigns (budget_resource_name and
+            budget_shared columns)
+
+    Returns:
+        dict: campaign_id (str) -> {"resource_name": str, "shared": bool}
+    """
+    if df.empty or "budget_resource_name" not in df.columns:
+        return {}
+
+    if "budget_shared" in df.columns:
+        shared = df["budget_shared"].astype(bool).tolist()
+    else:
+        shared = [False] * len(df)
+
+    return {
+        str(campaign_id): {"resource_name": resource_name, "shared": is_shared}
+        for campaign_id, resource_name, is_shared in zip(
+            df["campaign_id"].tolist(), df["budget_resource_name"].tolist(), shared
+        )
+        if resource_name
+    }
+
+
+def lookup_budget_resource_names(client, customer_id, campaign_ids):
+    """
+    Look up campaign budget resource names with a single query.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        campaign_ids: Campaign IDs to resolve
+
+    Returns:
+        dict: campaign_id (str) -> campaign_budget resource name
+    """
+    if not campaign_ids:
+        return {}
+
+    ga_service = client.get_service("GoogleAdsService")
+    id_list = ", ".join(str(int(campaign_id)) for campaign_id in campaign_ids)
+
+    query = f"""
+        SELECT
+            campaign.id,
+            campaign_budget.resource_name
+        FROM campaign
+        WHERE campaign.id IN ({id_list})
+    """
+
+    budgets = {}
+    for row in ga_service.search(customer_id=customer_id, query=query):
+        budgets[str(row.campaign.id)] = row.campaign_budget.resource_name
+
+    return budgets
+
+
+def _known_budget_resource_name(action, budget_index):
+    """Return the budget resource name carried by the action or found in the index."""
+    if action.get("budget_resource_name"):
+        return action["budget_resource_name"]
+    entry = budget_index.get(str(action["campaign_id"]))
+    return entry["resource_name"] if entry else None
+
+
+def with_budget_resource_names(actions, budget_index):
+    """
+    Copy INCREASE_BUDGET actions with the budget_resource_name from budget_index.
+
+    Lets the action ledger key budget raises on the budget itself, so two
+    campaigns sharing a budget cannot each raise it.
+
+    Args:
+        actions: Actions returned by evaluate_campaigns
+        budget_index: Index from build_budget_index
+
+    Returns:
+        list: The actions, with budget raises carrying their budget where known
+    """
+    if not budget_index:
+        return list(actions)
+
+    resolved = []
+    for action in actions:
+        if action["action"] == "INCREASE_BUDGET" and not action.get("budget_resource_name"):
+            budget_resource_name = _known_budget_resource_name(action, budget_index)
+            if budget_resource_name:
+                action = {**action, "budget_resource_name": budget_resource_name}
+        resolved.append(action)
+    return resolved
+
+
+def _mutate_in_batches(client, customer_id, service_name, request_type, method_name, pending, batch_size, results):
+    """
+    Send (result_indexes, operation) pairs in partial-failure batches.
+
+    Updates results in place with APPLIED or FAILED per operation. An
+    operation can stand for several actions (e.g. a shared budget), in which
+    case all of them get that operation's outcome.
+    """
+    from google.ads.googleads.errors import GoogleAdsException
+
+    service = client.get_service(service_name)
+    mutate = getattr(service, method_name)
+
+    for batch in _chunks(pending, batch_size):
+        request = client.get_type(request_type)
+        request.customer_id = customer_id
+        request.operations = [operation for _, operation in batch]
+        request.partial_failure = True
+
+        try:
+            response = mutate(request=request)
+        except GoogleAdsException as ex:
+            handle_google_ads_exception(ex)
+            for indexes, _ in batch:
+                for index in indexes:
+                    results[index].update({"status": "FAILED", "error": f"Request failed (request_id={ex.request_id})"})
+            continue
+
+        errors = get_partial_failure_errors(client, response)
+
+        for position, (indexes, _) in enumerate(batch):
+            for index in indexes:
+                if position in errors:
+                    results[index].update({"status": "FAILED", "error": errors[position]})
+                else:
+                    results[index].update({"status": "APPLIED", "error": None})
+
+        logger.info(f"{method_name}: {len(batch) - len(errors)}/{len(batch)} operations applied")
+
+
+def apply_actions_batched(client, customer_id, actions, batch_size=DEFAULT_BATCH_SIZE, budget_index=None):
+    """
+    Apply PAUSE and INCREASE_BUDGET actions with batched mutate calls.
+
+    ALERT actions need no mutation and are marked NOTIFIED; they are only
+    reported in the notification digest.
+
+    Budget resource names are resolved from budget_index first, so no extra
+    lookups are needed when it was built from the same list_campaigns frame.
+    Campaigns sharing one budget produce a single budget operation (with the
+    highest requested amount) instead of bumping the budget once per campaign.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID the actions belong to
+        actions: Actions returned by evaluate_campaigns
+        batch_size: Maximum operations per mutate request
+        budget_index: Optional index from build_budget_index
+
+    Returns:
+        list: One result per action, in input order. Each is a copy of the
+        action with "status" (APPLIED, NOTIFIED, FAILED or SKIPPED) and "error".
+    """
+    budget_index = budget_index or {}
+    results = [{**action, "status": "SKIPPED", "error": None} for action in actions]
+
+    pause_pending = []
+    budget_actions = []
+
+    for index, action in enumerate(actions):
+        if action["action"] == "PAUSE":
+            pause_pending.append(([index], build_pause_operation(client, customer_id, action["campaign_id"])))
+        elif action["action"] == "INCREASE_BUDGET":
+            budget_actions.append(index)
+        elif action["action"] == "ALERT":
+            results[index]["status"] = "NOTIFIED"
+
+    missing = [actions[i]["campaign_id"] for i in budget_actions if not _known_budget_resource_name(actions[i], budget_index)]
+    looked_up = {}
+    for campaign_ids in _chunks(missing, batch_size):
+        looked_up.update(lookup_budget_resource_names(client, customer_id, campaign_ids))
+
+    # Group by budget resource name so shared budgets are changed once
+    budget_groups = {}
+    for index in budget_actions:
+        action = actions[index]
+        budget_resource_name = _known_budget_resource_name(action, budget_index) or looked_up.get(str(action["campaign_id"]))
+
+        if not budget_resource_name:
+            results[index].update({"status": "FAILED", "error": "Campaign budget not found"})
+            continue
+
+        budget_groups.setdefault(budget_resource_name, []).append(index)
+
+    budget_pending = []
+    for budget_resource_name, indexes in budget_groups.items():
+        if len(indexes) > 1:
+            logger.info(f"Shared budget {budget_resource_name}: {len(indexes)} campaigns, applying one update")
+
+        new_budget = max(actions[i]["new_budget"] for i in indexes)
+        new_budget_micros = int(round(new_budget * 1_000_000))
+        budget_pending.append((indexes, build_budget_operation(client, budget_resource_name, new_budget_micros)))
+
+    _mutate_in_batches(
+        client,
+        customer_id,
+        "CampaignService",
+        "MutateCampaignsRequest",
+        "mutate_campaigns",
+        pause_pending,
+        batch_size,
+        results,
+    )
+    _mutate_in_batches(
+        client,
+        customer_id,
+        "CampaignBudgetService",
+        "MutateCampaignBudgetsRequest",
+        "mutate_campaign_budgets",
+        budget_pending,
+        batch_size,
+        results,
+    )
+
+    return results
+
+
+def apply_keyword_actions_batched(client, customer_id, actions, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Apply ADD_NEGATIVE and PAUSE_KEYWORD actions with batched mutate calls.
+
+    Both are ad group criterion operations, so they share mutate requests.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID the actions belong to
+        actions: Actions from keyword_automation.evaluate_chunk
+        batch_size: Maximum operations per mutate request
+
+    Returns:
+        list: One result per action, in input order, with "status" (APPLIED,
+        FAILED or SKIPPED) and "error"
+    """
+    results = [{**action, "status": "SKIPPED", "error": None} for action in actions]
+
+    pending = []
+    for index, action in enumerate(actions):
+        if action["action"] == "ADD_NEGATIVE":
+            operation = build_negative_keyword_operation(client, customer_id, action["ad_group_id"], action["search_term"])
+        elif action["action"] == "PAUSE_KEYWORD":
+            operation = build_keyword_pause_operation(client, customer_id, action["ad_group_id"], action["criterion_id"])
+        else:
+            continue
+        pending.append(([index], operation))
+
+    _mutate_in_batches(
+        client,
+        customer_id,
+        "AdGroupCriterionService",
+        "MutateAdGroupCriteriaRequest",
+        "mutate_ad_group_criteria",
+        pending,
+        batch_size,
+        results,
+    )
+
+    return results
@@ -0,0 +1,407 @@
+"""
+Action Ledger
+Empire Amplify - Automation Rules
+
+Local SQLite record of every action the automation applies, so runs are
+idempotent and resumable:
+- Each action is written as PENDING before its mutate and updated with the
+  outcome afterwards; a crashed run leaves PENDING rows that a later run
+  marks INTERRUPTED once they are older than any live run could be, and
+  simply re-applies (mutates are idempotent)
+- Actions identical to one applied recently (same hash) are skipped, so
+  repeated runs do not re-apply or re-notify
+- Per-campaign cooldowns stop e.g. a budget raised yesterday from being
+  raised again today; budget raises are also keyed on the campaign budget,
+  so a shared budget raised through one campaign is not raised again
+  through another
+- Checking and recording happen in one transaction (claim), and live
+  PENDING rows block their campaign (and budget), so concurrent runs
+  sharing the file never apply the same kind of action to one campaign or
+  budget twice
+"""
+
+import hashlib
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+DEFAULT_LEDGER_PATH = "action_ledger.sqlite"
+
+# Identical actions within this window are skipped as duplicates
+DEFAULT_DEDUPE_HOURS = 24
+
+# Minimum hours between two applied actions of a type on the same campaign (or budget)
+DEFAULT_COOLDOWN_HOURS = {
+    "PAUSE": 24,
+    "INCREASE_BUDGET": 72,
+    "ALERT": 0,
+}
+
+# PENDING rows older than this belong to a run that died; younger ones may be
+# in flight in another process or job sharing the ledger file
+DEFAULT_STALE_MINUTES = 30
+
+# Outcomes that count as done for duplicate and cooldown checks
+DONE_STATUSES = ("APPLIED", "NOTIFIED")
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS actions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL,
+        action_hash TEXT NOT NULL,
+        customer_id TEXT NOT NULL,
+        campaign_id TEXT NOT NULL,
+        action TEXT NOT NULL,
+        reason TEXT,
+        new_budget REAL,
+        budget_resource_name TEXT,
+        status TEXT NOT NULL,
+        error TEXT,
+        created_at TEXT NOT NULL,
+        completed_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_actions_campaign ON actions (customer_id, campaign_id, completed_at);
+    CREATE INDEX IF NOT EXISTS idx_actions_hash ON actions (action_hash, completed_at);
+    CREATE INDEX IF NOT EXISTS idx_actions_status ON actions (customer_id, status);
+"""
+
+# Created after migrating ledgers written before the budget_resource_name column existed
+_BUDGET_INDEX = "CREATE INDEX IF NOT EXISTS idx_actions_budget ON actions (customer_id, budget_resource_name, completed_at)"
+
+
+def action_hash(customer_id, action):
+    """
+    Stable hash of what an action does (not why).
+
+    The reason text is left out because it carries metric values that move
+    between runs; the budget target and alert metric/date are included.
+    Budget raises that carry a budget_resource_name are identified by the
+    budget rather than the campaign, since that is what they change.
+    """
+    target = ""
+    if action["action"] == "INCREASE_BUDGET":
+        target = str(int(round(action["new_budget"] * 1_000_000)))
+    elif action["action"] == "ALERT":
+        # Anomaly alerts are identified by metric and day, other alerts by their text
+        target = f"{action['metric']}:{action.get('date', '')}" if "metric" in action else action["reason"]
+
+    subject = _budget_of(action) or str(action["campaign_id"])
+    key = "|".join([str(customer_id), subject, action["action"], target])
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _budget_of(action):
+    """Budget resource name of a budget raise, or None for other actions and unknown budgets."""
+    if action["action"] != "INCREASE_BUDGET":
+        return None
+    return action.get("budget_resource_name") or None
+
+
+def _keys(campaign_id, action_type, budget_resource_name):
+    """Cooldown / in-flight keys of an action: its campaign, and its budget for budget raises."""
+    keys = [(str(campaign_id), action_type)]
+    if budget_resource_name:
+        keys.append((budget_resource_name, action_type))
+    return keys
+
+
+def _timestamp(moment):
+    return moment.isoformat(timespec="seconds")
+
+
+class ActionLedger:
+    """
+    SQLite ledger of applied actions keyed by customer and campaign (and
+    campaign budget, for budget raises).
+
+    Args:
+        path: SQLite file
+        dedupe_hours: Window in which identical actions are skipped
+        cooldown_hours: Action type -> minimum hours between applied actions
+            on one campaign or budget (default: DEFAULT_COOLDOWN_HOURS)
+        stale_minutes: Age after which a PENDING row counts as interrupted
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_LEDGER_PATH,
+        dedupe_hours=DEFAULT_DEDUPE_HOURS,
+        cooldown_hours=None,
+        stale_minutes=DEFAULT_STALE_MINUTES,
+    ):
+        self.path = path
+        self.dedupe_hours = dedupe_hours
+        self.cooldown_hours = {**DEFAULT_COOLDOWN_HOURS, **(cooldown_hours or {})}
+        self.stale_minutes = stale_minutes
+        self._lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(actions)")}
+            if "budget_resource_name" not in columns:
+                conn.execute("ALTER TABLE actions ADD COLUMN budget_resource_name TEXT")
+            conn.execute(_BUDGET_INDEX)
+
+    @contextmanager
+    def _connection(self):
+        """Open a connection for one transaction; SQLite access is serialized across threads."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def recover(self, customer_id, now=None):
+        """
+        Mark PENDING actions left by a crashed run as INTERRUPTED.
+
+        Only rows older than stale_minutes are touched: younger ones may
+        belong to a run still in flight in another process or daemon job,
+        whose complete() would otherwise find nothing to update.
+
+        Their outcome is unknown, so they do not count as done: if the next
+        evaluation produces them again they are re-applied.
+
+        Returns:
+            int: Number of interrupted actions
+        """
+        stale_before = _timestamp((now or datetime.now()) - timedelta(minutes=self.stale_minutes))
+
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE actions SET status = 'INTERRUPTED'
+                WHERE customer_id = ? AND status = 'PENDING' AND created_at < ?
+                """,
+                (str(customer_id), stale_before),
+            )
+
+        if cursor.rowcount:
+            logger.warning(f"Customer {customer_id}: {cursor.rowcount} actions from an interrupted run will be retried")
+        return cursor.rowcount
+
+    def filter(self, customer_id, actions, now=None):
+        """
+        Split actions into those to apply and those already done, cooling down
+        or in flight in another run.
+
+        Read-only, e.g. for dry runs; runs that apply use claim(), which
+        checks and records in one transaction.
+
+        Args:
+            customer_id: Customer ID the actions belong to
+            actions: Actions from evaluate_campaigns
+            now: Override for the current time
+
+        Returns:
+            tuple: (actions to apply, skipped results with status SKIPPED and
+            an error explaining why)
+        """
+        if not actions:
+            return [], []
+
+        with self._connection() as conn:
+            return self._split(conn, customer_id, actions, now or datetime.now())
+
+    def claim(self, customer_id, actions, now=None):
+        """
+        Filter actions and record the remaining ones as PENDING, atomically.
+
+        The check and the insert run in one write transaction, so two runs
+        sharing the ledger file (e.g. the daemon's rules and pacing jobs)
+        cannot both pass the checks for the same campaign or budget: the
+        second one sees the first one's PENDING rows and skips those actions.
+
+        Args:
+            customer_id: Customer ID the actions belong to
+            actions: Actions to apply
+            now: Override for the current time
+
+        Returns:
+            tuple: (run ID to pass to complete(), actions to apply, skipped
+            results as from filter())
+        """
+        now = now or datetime.now()
+        run_id = uuid.uuid4().hex
+        if not actions:
+            return run_id, [], []
+
+        with self._connection() as conn:
+            # Take the write lock before reading, so no other run can claim in between
+            conn.execute("BEGIN IMMEDIATE")
+            to_apply, skipped = self._split(conn, customer_id, actions, now)
+            self._insert_pending(conn, run_id, customer_id, to_apply, now)
+
+        return run_id, to_apply, skipped
+
+    def _split(self, conn, customer_id, actions, now):
+        longest = max([self.dedupe_hours] + list(self.cooldown_hours.values()))
+        since = _timestamp(now - timedelta(hours=longest))
+        live_since = _timestamp(now - timedelta(minutes=self.stale_minutes))
+        campaign_ids = sorted({str(action["campaign_id"]) for action in actions})
+        budgets = sorted({_budget_of(action) for action in actions} - {None})
+
+        done_hashes = {}
+        last_applied = {}
+        in_flight = {}
+        in_flight_hashes = {}
+        # Rows touching any of the campaigns, or any of the budgets through another campaign
+        for column, values in (("campaign_id", campaign_ids), ("budget_resource_name", budgets)):
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(values), 500):
+                end = start + 500
+                batch = values[start:end]
+                rows = conn.execute(
+                    f"""
+                    SELECT action_hash, campaign_id, action, budget_resource_name, status, created_at, completed_at
+                    FROM actions
+                    WHERE customer_id = ? AND {column} IN ({', '.join('?' * len(batch))})
+                        AND ((status IN ({', '.join('?' * len(DONE_STATUSES))}) AND completed_at >= ?)
+                            OR (status = 'PENDING' AND created_at >= ?))
+                    """,
+                    (str(customer_id), *batch, *DONE_STATUSES, since, live_since),
+                )
+                for hash_value, campaign_id, action_type, budget, status, created_at, completed_at in rows:
+                    keys = _keys(campaign_id, action_type, budget)
+                    if status == "PENDING":
+                        for key in keys:
+                            in_flight[key] = min(in_flight.get(key, created_at), created_at)
+                        in_flight_hashes[hash_value] = created_at
+                        continue
+                    done_hashes[hash_value] = max(done_hashes.get(hash_value, ""), completed_at)
+                    for key in keys:
+                        last_applied[key] = max(last_applied.get(key, ""), completed_at)
+
+        dedupe_since = _timestamp(now - timedelta(hours=self.dedupe_hours))
+
+        to_apply = []
+        skipped = []
+        for action in actions:
+            keys = _keys(action["campaign_id"], action["action"], _budget_of(action))
+            hash_value = action_hash(customer_id, action)
+            done_at = done_hashes.get(hash_value, "")
+            cooldown = self.cooldown_hours.get(action["action"], 0)
+
+            # Live PENDING rows count as applied: the same action, or any action of a type with a cooldown
+            started_at = in_flight_hashes.get(hash_value)
+            if not started_at and cooldown:
+                started_at = min((in_flight[key] for key in keys if key in in_flight), default=None)
+            if started_at:
+                skipped.append({**action, "status": "SKIPPED", "error": f"In progress in another run since {started_at}"})
+                continue
+
+            if done_at and done_at >= dedupe_since:
+                skipped.append({**action, "status": "SKIPPED", "error": f"Duplicate of action applied at {done_at}"})
+                continue
+
+            applied_at = max((last_applied[key] for key in keys if key in last_applied), default=None)
+            if cooldown and applied_at:
+                until = datetime.fromisoformat(applied_at) + timedelta(hours=cooldown)
+                if until > now:
+                    skipped.append({**action, "status": "SKIPPED", "error": f"Cooldown until {_timestamp(until)}"})
+                    continue
+
+            to_apply.append(action)
+
+        # A shared budget gets one update from all its campaigns' actions, so
+        # if any of them is skipped the budget is left alone
+        blocked = {
+            result["budget_resource_name"]
+            for result in skipped
+            if result["action"] == "INCREASE_BUDGET" and result.get("budget_resource_name")
+        }
+        if blocked:
+            kept = []
+            for action in to_apply:
+                budget = action.get("budget_resource_name") if action["action"] == "INCREASE_BUDGET" else None
+                if budget in blocked:
+                    skipped.append(
+                        {**action, "status": "SKIPPED", "error": f"Shared budget {budget} skipped for another campaign"}
+                    )
+                else:
+                    kept.append(action)
+            to_apply = kept
+
+        return to_apply, skipped
+
+    def begin(self, customer_id, actions, now=None):
+        """
+        Record actions as PENDING before they are applied, without checks.
+
+        Returns:
+            str: Run ID to pass to complete()
+        """
+        run_id = uuid.uuid4().hex
+
+        with self._connection() as conn:
+            self._insert_pending(conn, run_id, customer_id, actions, now or datetime.now())
+
+        return run_id
+
+    def _insert_pending(self, conn, run_id, customer_id, actions, now):
+        created_at = _timestamp(now)
+        conn.executemany(
+            """
+            INSERT INTO actions (run_id, action_hash, customer_id, campaign_id, action, reason, new_budget,
+                                 budget_resource_name, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?)
+            """,
+            [
+                (
+                    run_id,
+                    action_hash(customer_id, action),
+                    str(customer_id),
+                    str(action["campaign_id"]),
+                    action["action"],
+                    action.get("reason"),
+                    action.get("new_budget"),
+                    _budget_of(action),
+                    created_at,
+                )
+                for action in actions
+            ],
+        )
+
+    def complete(self, run_id, customer_id, results, now=None):
+        """
+        Record the outcome of each action from a run started with begin().
+
+        Args:
+            run_id: ID returned by begin()
+            customer_id: Customer ID the actions belong to
+            results: Results from apply_actions_batched
+            now: Override for the current time
+        """
+        completed_at = _timestamp(now or datetime.now())
+
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                UPDATE actions SET status = ?, error = ?, completed_at = ?
+                WHERE run_id = ? AND action_hash = ? AND status = 'PENDING'
+                """,
+                [
+                    (result["status"], result.get("error"), completed_at, run_id, action_hash(customer_id, result))
+                    for result in results
+                ],
+            )
+
+    def history(self, customer_id, campaign_id=None, limit=100):
+        """Most recent ledger entries for a customer (optionally one campaign), newest first."""
+        query = "SELECT * FROM actions WHERE customer_id = ?"
+        params = [str(customer_id)]
+        if campaign_id is not None:
+            query += " AND campaign_id = ?"
+            params.append(str(campaign_id))
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connection() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(query, params)]
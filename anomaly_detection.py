@@ -0,0 +1,406 @@
+"""
+Anomaly Detection
+Empire Amplify - Automation Rules
+
+Flags unusual days in per-campaign daily series of cost, clicks, CTR and CPA:
+- Rolling z-score against the previous N days
+- EWMA mean/variance baselines
+- Seasonal baselines (same weekday in previous weeks)
+
+Daily rows are laid out as dense campaign x day matrices, so every baseline
+is a handful of array operations across all campaigns at once. Anomalies
+become ALERT actions that go through the normal apply/notification path.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from loguru import logger
+
+from metrics_cache import fetch_daily_metrics, refresh_cache
+
+METHODS = ("zscore", "ewma", "seasonal")
+
+DEFAULT_METHOD = "zscore"
+DEFAULT_WINDOW = 14  # Baseline days for zscore
+DEFAULT_EWMA_SPAN = 7
+DEFAULT_SEASONS = 4  # Previous same-weekday observations for seasonal
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_MIN_PERIODS = 5  # Baseline observations needed before a day is scored
+
+# Which deviations matter per metric: "up", "down" or "both"
+METRIC_DIRECTIONS = {
+    "cost": "both",
+    "clicks": "both",
+    "ctr": "down",
+    "cpa": "up",
+}
+
+# Baseline spread floors, so flat series do not turn tiny changes into huge scores
+MIN_RELATIVE_STD = 0.05
+MIN_ABSOLUTE_STD = {"cost": 1.0, "clicks": 1.0, "ctr": 0.1, "cpa": 1.0}
+
+_LABELS = {
+    "cost": ("Cost", "${:,.2f}"),
+    "clicks": ("Clicks", "{:,.0f}"),
+    "ctr": ("CTR", "{:.2f}%"),
+    "cpa": ("CPA", "${:,.2f}"),
+}
+
+
+def required_history(method=DEFAULT_METHOD, window=DEFAULT_WINDOW, seasons=DEFAULT_SEASONS, span=DEFAULT_EWMA_SPAN):
+    """Days of history a method needs before the first checked day."""
+    if method == "zscore":
+        return window
+    if method == "seasonal":
+        return 7 * seasons
+    if method == "ewma":
+        return 3 * span
+    raise ValueError(f"Unknown anomaly method: {method}")
+
+
+def build_daily_matrices(daily, metrics=tuple(METRIC_DIRECTIONS), start_date=None, end_date=None):
+    """
+    Lay out daily campaign rows as campaign x day matrices.
+
+    Days without a row are zero activity. CTR and CPA are derived from the
+    summed columns and are NaN where they are undefined (no impressions or
+    no conversions).
+
+    Args:
+        daily: DataFrame with date, campaign_id, campaign_name, impressions,
+            clicks, cost_micros and conversions (see fetch_daily_metrics)
+        metrics: Metrics to build
+        start_date: First day of the axis (default: earliest date in daily)
+        end_date: Last day of the axis (default: latest date in daily); pass
+            the requested window so days no campaign had rows for, e.g. an
+            account-wide outage on the last day, are still zero-filled
+
+    Returns:
+        tuple: (campaign_ids, campaign_names, days, {metric: matrix})
+    """
+    import pandas as pd
+
+    # Dates repeat once per campaign, so parse each distinct date once
+    date_codes, unique_dates = pd.factorize(daily["date"])
+    dates = np.asarray(unique_dates, dtype="datetime64[D]")
+    first = np.datetime64(start_date, "D") if start_date is not None else dates.min()
+    last = np.datetime64(end_date, "D") if end_date is not None else dates.max()
+    n_days = int((last - first).astype(np.int64)) + 1
+    day_index = (dates - first).astype(np.int64)[date_codes]
+
+    # Rows outside an explicit window are left out
+    inside = (day_index >= 0) & (day_index < n_days)
+    if not inside.all():
+        daily, day_index = daily[inside], day_index[inside]
+
+    codes, campaign_ids = pd.factorize(daily["campaign_id"], sort=True)
+    n_campaigns = len(campaign_ids)
+
+    campaign_names = np.empty(n_campaigns, dtype=object)
+    campaign_names[codes] = daily["campaign_name"].to_numpy()
+
+    cells = codes * n_days + day_index
+
+    def matrix(column, scale=1.0):
+        weights = daily[column].to_numpy(dtype=np.float64)
+        values = np.bincount(cells, weights=weights, minlength=n_campaigns * n_days)
+        return values.reshape(n_campaigns, n_days) * scale
+
+    cost = matrix("cost_micros", 1 / 1_000_000)
+    clicks = matrix("clicks")
+
+    matrices = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for metric in metrics:
+            if metric == "cost":
+                matrices[metric] = cost
+            elif metric == "clicks":
+                matrices[metric] = clicks
+            elif metric == "ctr":
+                impressions = matrix("impressions")
+                matrices[metric] = np.where(impressions > 0, clicks / impressions * 100, np.nan)
+            elif metric == "cpa":
+                conversions = matrix("conversions")
+                matrices[metric] = np.where(conversions > 0, cost / conversions, np.nan)
+            else:
+                matrices[metric] = matrix(metric)
+
+    days = first + np.arange(n_days)
+    return np.asarray(campaign_ids), campaign_names, days, matrices
+
+
+def _baseline_zscore(values, check_days, window):
+    """Previous `window` days for each checked day, shape (campaigns, check_days, window)."""
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    n_days = values.shape[1]
+    start = n_days - check_days - window
+    history = values[:, start:-1]
+    return sliding_window_view(history, window, axis=1)[:, -check_days:]
+
+
+def _baseline_seasonal(values, check_days, seasons):
+    """Same weekday in each of the previous `seasons` weeks for each checked day."""
+    n_days = values.shape[1]
+    checked = np.arange(n_days - check_days, n_days)
+    lags = 7 * np.arange(1, seasons + 1)
+    columns = checked[:, None] - lags[None, :]
+    return values[:, columns]
+
+
+def _score(values, windows, min_periods, metric):
+    """Mean, spread and z-score of the checked values against baseline windows."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        counts = np.sum(~np.isnan(windows), axis=-1)
+        mean = np.nanmean(windows, axis=-1) if windows.size else np.full(values.shape, np.nan)
+        std = np.sqrt(np.nanvar(windows, axis=-1, ddof=1)) if windows.size else np.full(values.shape, np.nan)
+
+    return _zscore(values, mean, std, metric, counts >= min_periods)
+
+
+def _zscore(values, mean, std, metric, enough):
+    spread = np.fmax(std, np.maximum(MIN_RELATIVE_STD * np.abs(mean), MIN_ABSOLUTE_STD.get(metric, 1e-9)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (values - mean) / spread
+    z[~enough] = np.nan
+    return mean, z
+
+
+def _ewma(values, check_days, span, min_periods, metric):
+    """EWMA mean/variance up to the day before each checked day."""
+    alpha = 2 / (span + 1)
+    n_campaigns, n_days = values.shape
+
+    mean = np.full(n_campaigns, np.nan)
+    var = np.zeros(n_campaigns)
+    counts = np.zeros(n_campaigns, dtype=np.int64)
+
+    means = np.empty((n_campaigns, check_days))
+    stds = np.empty((n_campaigns, check_days))
+    enough = np.empty((n_campaigns, check_days), dtype=bool)
+
+    for t in range(n_days):
+        offset = t - (n_days - check_days)
+        if offset >= 0:
+            means[:, offset] = mean
+            stds[:, offset] = np.sqrt(var)
+            enough[:, offset] = counts >= min_periods
+
+        x = values[:, t]
+        seen = ~np.isnan(x)
+        first = seen & np.isnan(mean)
+        mean[first] = x[first]
+
+        update = seen & ~first
+        diff = x[update] - mean[update]
+        increment = alpha * diff
+        mean[update] += increment
+        var[update] = (1 - alpha) * (var[update] + diff * increment)
+        counts += seen
+
+    return _zscore(values[:, -check_days:], means, stds, metric, enough)
+
+
+def detect_anomalies(
+    daily,
+    method=DEFAULT_METHOD,
+    metrics=None,
+    check_days=1,
+    window=DEFAULT_WINDOW,
+    seasons=DEFAULT_SEASONS,
+    span=DEFAULT_EWMA_SPAN,
+    z_threshold=DEFAULT_Z_THRESHOLD,
+    min_periods=DEFAULT_MIN_PERIODS,
+    start_date=None,
+    end_date=None,
+):
+    """
+    Score the latest days of every campaign's daily series.
+
+    Args:
+        daily: Daily campaign rows (see build_daily_matrices)
+        method: "zscore", "ewma" or "seasonal"
+        metrics: {metric: "up" | "down" | "both"} (default: METRIC_DIRECTIONS)
+        check_days: Number of most recent days to score
+        window: Baseline days for zscore
+        seasons: Previous same-weekday observations for seasonal
+        span: EWMA span in days
+        z_threshold: Absolute z-score that counts as an anomaly
+        min_periods: Baseline observations needed to score a day
+        start_date: First day of the requested window (default: earliest date in daily)
+        end_date: Last day of the requested window (default: latest date in
+            daily); the checked days are the last ones up to end_date
+
+    Returns:
+        pandas.DataFrame: One row per anomaly (campaign_id, campaign_name,
+        date, metric, value, expected, zscore), largest deviations first
+    """
+    import pandas as pd
+
+    if method not in METHODS:
+        raise ValueError(f"Unknown anomaly method: {method}")
+
+    metrics = metrics or METRIC_DIRECTIONS
+    columns = ["campaign_id", "campaign_name", "date", "metric", "value", "expected", "zscore"]
+    if daily.empty:
+        return pd.DataFrame(columns=columns)
+
+    campaign_ids, campaign_names, days, matrices = build_daily_matrices(daily, tuple(metrics), start_date, end_date)
+    n_days = len(days)
+    history = required_history(method, window, seasons, span)
+    if n_days < check_days + min(history, min_periods):
+        logger.info(f"Not enough history for anomaly detection ({n_days} days)")
+        return pd.DataFrame(columns=columns)
+
+    # Pad the front with NaN so every checked day has a full (if partly empty) baseline
+    pad = max(0, history + check_days - n_days)
+    frames = []
+
+    for metric, direction in metrics.items():
+        values = matrices[metric]
+        if pad:
+            values = np.hstack([np.full((values.shape[0], pad), np.nan), values])
+        checked = values[:, -check_days:]
+
+        if method == "zscore":
+            expected, z = _score(checked, _baseline_zscore(values, check_days, window), min_periods, metric)
+        elif method == "seasonal":
+            expected, z = _score(checked, _baseline_seasonal(values, check_days, seasons), min(min_periods, seasons), metric)
+        else:
+            expected, z = _ewma(values, check_days, span, min_periods, metric)
+
+        with np.errstate(invalid="ignore"):
+            if direction == "up":
+                flagged = z >= z_threshold
+            elif direction == "down":
+                flagged = z <= -z_threshold
+            else:
+                flagged = np.abs(z) >= z_threshold
+
+        rows, cols = np.nonzero(flagged)
+        if not len(rows):
+            continue
+
+        frames.append(
+            pd.DataFrame(
+                {
+                    "campaign_id": campaign_ids[rows],
+                    "campaign_name": campaign_names[rows],
+                    "date": days[n_days - check_days + cols],
+                    "metric": metric,
+                    "value": checked[rows, cols],
+                    "expected": expected[rows, cols],
+                    "zscore": z[rows, cols],
+                }
+            )
+        )
+
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    anomalies = pd.concat(frames, ignore_index=True)
+    order = np.argsort(-np.abs(anomalies["zscore"].to_numpy()), kind="stable")
+    return anomalies.iloc[order].reset_index(drop=True)
+
+
+def anomalies_to_actions(anomalies):
+    """
+    Turn detected anomalies into ALERT actions for apply_actions.
+
+    Args:
+        anomalies: DataFrame from detect_anomalies
+
+    Returns:
+        list: ALERT actions (no mutation; reported in the notification digest)
+    """
+    actions = []
+    for row in anomalies.itertuples(index=False):
+        label, number = _LABELS.get(row.metric, (row.metric, "{:,.2f}"))
+        direction = "above" if row.value > row.expected else "below"
+        actions.append(
+            {
+                "campaign_id": row.campaign_id,
+                "campaign_name": row.campaign_name,
+                "action": "ALERT",
+                "reason": (
+                    f"{label} {number.format(row.value)} on {str(row.date)[:10]} is {direction} "
+                    f"expected {number.format(row.expected)} (z={row.zscore:.1f})"
+                ),
+                "metric": row.metric,
+                "date": str(row.date)[:10],
+            }
+        )
+    return actions
+
+
+def lookback_window(days=None, today=None):
+    """
+    First and last day of a lookback of `days` days ending with the last complete day.
+
+    Returns:
+        tuple: (start_date, end_date)
+    """
+    today = today or date.today()
+    days = days or required_history() + 1
+    end_date = today - timedelta(days=1)
+    return end_date - timedelta(days=days - 1), end_date
+
+
+def load_daily_series(client, customer_id, cache=None, days=None, today=None):
+    """
+    Daily rows for the anomaly lookback, ending with the last complete day.
+
+    Uses the metrics cache when given, so scheduled runs only fetch missing
+    or still-changing days.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        cache: Optional MetricsCache
+        days: Days of history (default: enough for the default method)
+        today: Override for today's date
+
+    Returns:
+        pandas.DataFrame: Daily campaign rows
+    """
+    today = today or date.today()
+    start_date, end_date = lookback_window(days, today)
+
+    if cache is None:
+        return fetch_daily_metrics(client, customer_id, start_date, end_date)
+
+    refresh_cache(client, customer_id, cache, start_date, end_date, today=today)
+    return cache.load_daily(customer_id, start_date, end_date)
+
+
+def find_anomaly_actions(client, customer_id, cache=None, method=DEFAULT_METHOD, **kwargs):
+    """
+    Load an account's daily series and return ALERT actions for its anomalies.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to scan
+        cache: Optional MetricsCache
+        method: "zscore", "ewma" or "seasonal"
+        **kwargs: Passed to detect_anomalies
+
+    Returns:
+        list: ALERT actions
+    """
+    history = required_history(
+        method,
+        kwargs.get("window", DEFAULT_WINDOW),
+        kwargs.get("seasons", DEFAULT_SEASONS),
+        kwargs.get("span", DEFAULT_EWMA_SPAN),
+    )
+    days = history + kwargs.get("check_days", 1)
+    today = date.today()
+    start_date, end_date = lookback_window(days, today)
+    daily = load_daily_series(client, customer_id, cache=cache, days=days, today=today)
+    anomalies = detect_anomalies(daily, method=method, start_date=start_date, end_date=end_date, **kwargs)
+
+    if len(anomalies):
+        logger.info(f"Found {len(anomalies)} anomalies for customer {customer_id}")
+
+    return anomalies_to_actions(anomalies)
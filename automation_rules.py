@@ -5,17 +5,38 @@ Empire Amplify - Automation Rules
 Implements automated rules for campaign management:
 - Pause underperforming campaigns
 - Increase budget for top performers
-- Alert on anomalies
+- Alert on anomalies (see anomaly_detection)
 """
 
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-from google.ads.googleads.errors import GoogleAdsException
 from loguru import logger
 
-from google_ads_client import get_customer_id, get_google_ads_client, handle_google_ads_exception
+from action_applier import (
+    DEFAULT_BATCH_SIZE,
+    apply_actions_batched,
+    build_budget_index,
+    build_budget_operation,
+    build_pause_operation,
+    lookup_budget_resource_names,
+    with_budget_resource_names,
+)
+from action_ledger import ActionLedger
+from anomaly_detection import find_anomaly_actions
+from change_detection import CampaignSnapshots
+from google_ads_client import (
+    get_customer_id,
+    get_google_ads_client,
+    get_login_customer_id,
+    handle_google_ads_exception,
+    list_child_accounts,
+)
+from instrumentation import get_metrics, profile_run
 from list_campaigns import list_campaigns
+from metrics_cache import MetricsCache
+from notifications import get_dispatcher
+from query_planner import rule_projection
+from rule_engine import compile_rules, load_rules, rules_from_thresholds
 
 # Rule thresholds (customize these)
 RULES = {
@@ -28,157 +49,476 @@ RULES = {
     "min_spend_for_evaluation": 50.0,  # Need $50 spend to evaluate
 }
 
+# Accounts fetched concurrently in multi-account (MCC) mode
+DEFAULT_MAX_WORKERS = 8
+
 
 def send_slack_notification(message):
-    """Send notification to Slack."""
-    webhook_url = os.getenv("SLACK_WEBHOOK_URL")
-    if webhook_url:
-        try:
-            requests.post(webhook_url, json={"text": message})
-            logger.info("Slack notification sent")
-        except Exception as e:
-            logger.warning(f"Failed to send Slack notification: {e}")
+    """Queue a Slack notification; it is posted by a background thread."""
+    get_dispatcher().send(message)
 
 
-def evaluate_campaigns(df):
+def evaluate_campaigns(df, rules=None, customer_id=None):
     """
     Evaluate campaigns against rules and return recommended actions.
 
+    The rule set is compiled into vectorized column predicates (see
+    rule_engine) and evaluated over the whole frame. Each campaign gets at
+    most one action and the first matching rule by priority wins; the
+    built-in rules run in this order: CPA pause, CTR pause, ROAS budget
+    increase.
+
     Args:
         df: DataFrame with campaign metrics
+        rules: Rule set definition (default: built from RULES)
+        customer_id: Account whose overrides in the rule set apply
 
     Returns:
         list: List of recommended actions
     """
-    actions = []
+    definition = rules if rules is not None else rules_from_thresholds(RULES)
+    with get_metrics().span("evaluate", customer_id=customer_id):
+        return compile_rules(definition, customer_id).evaluate(df)
+
+
+def apply_pause_action(client, customer_id, campaign_id):
+    """Pause a campaign."""
+    campaign_service = client.get_service("CampaignService")
+    campaign_operation = build_pause_operation(client, customer_id, campaign_id)
+
+    response = campaign_service.mutate_campaigns(customer_id=customer_id, operations=[campaign_operation])
+
+    return response
+
+
+def apply_budget_action(client, customer_id, campaign_id, new_budget_micros, budget_resource_name=None):
+    """
+    Update campaign budget.
 
-    for _, campaign in df.iterrows():
-        campaign_name = campaign["campaign_name"]
-        campaign_id = campaign["campaign_id"]
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID the campaign belongs to
+        campaign_id: Campaign whose budget to change
+        new_budget_micros: New daily budget in micros
+        budget_resource_name: Budget resource name, if already known (e.g.
+            from build_budget_index); otherwise it is looked up
+    """
+    if not budget_resource_name:
+        budget_resource_name = lookup_budget_resource_names(client, customer_id, [campaign_id]).get(str(campaign_id))
+        if not budget_resource_name:
+            raise ValueError(f"No campaign budget found for campaign {campaign_id}")
+
+    budget_service = client.get_service("CampaignBudgetService")
+    budget_operation = build_budget_operation(client, budget_resource_name, new_budget_micros)
+
+    response = budget_service.mutate_campaign_budgets(customer_id=customer_id, operations=[budget_operation])
 
-        # Skip if not enough spend to evaluate
-        if campaign.get("cost", 0) < RULES["min_spend_for_evaluation"]:
+    logger.info(f"Set budget {budget_resource_name} to ${new_budget_micros / 1_000_000:.2f}")
+    return response
+
+
+def apply_actions(
+    client,
+    customer_id,
+    actions,
+    dry_run=True,
+    batch_size=DEFAULT_BATCH_SIZE,
+    budget_index=None,
+    ledger=None,
+    reused=None,
+):
+    """
+    Report recommended actions and optionally apply them.
+
+    Actions are applied with batched mutate calls (see action_applier), so
+    apply time grows with the number of batches rather than campaigns.
+
+    With a ledger, actions already applied recently or still in cooldown are
+    skipped, and every applied action is recorded before and after its
+    mutate so an interrupted run can be resumed (see action_ledger). Dry runs
+    only read the ledger; applying runs claim their actions atomically, so
+    concurrent runs sharing the ledger never apply one twice.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID the actions belong to
+        actions: Actions returned by evaluate_campaigns
+        dry_run: If True, only report actions without applying them
+        batch_size: Maximum operations per mutate request
+        budget_index: Optional campaign -> budget index from build_budget_index
+        ledger: Optional ActionLedger for duplicate, cooldown and resume checks
+        reused: Actions carried over unchanged from the previous run (see
+            change_detection); applied like actions but only counted in the log
+
+    Returns:
+        list: Per-action results from apply_actions_batched, followed by
+        SKIPPED results from the ledger (empty on dry run)
+    """
+    reused = reused or []
+    skipped = []
+    if ledger is not None:
+        # Budget raises are keyed on their budget, so shared budgets are only raised once
+        actions = with_budget_resource_names(actions, budget_index)
+        reused = with_budget_resource_names(reused, budget_index)
+        actions, skipped = ledger.filter(customer_id, actions)
+        reused, skipped_reused = ledger.filter(customer_id, reused)
+        skipped += skipped_reused
+
+    for action in actions:
+        action_str = f"  [{action['action']}] {action['campaign_name']}: {action['reason']}"
+        logger.info(action_str)
+
+    if reused:
+        logger.info(f"  ... and {len(reused)} unchanged actions from the previous run")
+
+    for result in skipped:
+        logger.debug(f"  [SKIPPED {result['action']}] {result['campaign_name']}: {result['error']}")
+    if skipped:
+        logger.info(f"  {len(skipped)} actions skipped (already applied or in cooldown)")
+
+    actions = actions + reused
+
+    if dry_run:
+        return []
+
+    run_id = None
+    if ledger is not None:
+        ledger.recover(customer_id)
+        # Re-check and record in one transaction; another run may have claimed some since filter()
+        run_id, actions, claimed_elsewhere = ledger.claim(customer_id, actions)
+        if claimed_elsewhere:
+            logger.info(f"  {len(claimed_elsewhere)} actions skipped (claimed by a concurrent run)")
+        skipped += claimed_elsewhere
+    results = apply_actions_batched(client, customer_id, actions, batch_size=batch_size, budget_index=budget_index)
+    if ledger is not None:
+        ledger.complete(run_id, customer_id, results)
+
+    digest = []
+    for result in results:
+        if result["status"] == "NOTIFIED":
+            digest.append(f"⚠️ Anomaly: {result['campaign_name']} - {result['reason']}")
             continue
 
-        # Rule 1: Pause if CPA too high
-        if campaign.get("conversions", 0) > 0:
-            cpa = campaign["cost"] / campaign["conversions"]
-            if cpa > RULES["pause_if_cpa_above"]:
-                actions.append(
-                    {
-                        "campaign_id": campaign_id,
-                        "campaign_name": campaign_name,
-                        "action": "PAUSE",
-                        "reason": f"CPA ${cpa:.2f} > ${RULES['pause_if_cpa_above']}",
-                    }
-                )
-                continue
-
-        # Rule 2: Pause if CTR too low
-        if campaign.get("ctr", 0) < RULES["pause_if_ctr_below"]:
-            actions.append(
-                {
-                    "campaign_id": campaign_id,
-                    "campaign_name": campaign_name,
-                    "action": "PAUSE",
-                    "reason": f"CTR {campaign['ctr']:.2f}% < {RULES['pause_if_ctr_below']}%",
-                }
-            )
+        if result["status"] != "APPLIED":
+            logger.warning(f"    ❌ Not applied: {result['campaign_name']}: {result['error']}")
             continue
 
-        # Rule 3: Increase budget if ROAS is high
-        if campaign.get("conversions", 0) > 0 and campaign.get("conversion_value", 0) > 0:
-            roas = campaign["conversion_value"] / campaign["cost"]
-            if roas > RULES["increase_budget_if_roas_above"]:
-                current_budget = campaign.get("daily_budget", 0)
-                new_budget = min(current_budget * (1 + RULES["budget_increase_percent"] / 100), RULES["max_daily_budget"])
-                if new_budget > current_budget:
-                    actions.append(
-                        {
-                            "campaign_id": campaign_id,
-                            "campaign_name": campaign_name,
-                            "action": "INCREASE_BUDGET",
-                            "reason": f"ROAS {roas:.2f}x > {RULES['increase_budget_if_roas_above']}x",
-                            "current_budget": current_budget,
-                            "new_budget": new_budget,
-                        }
-                    )
-
-    return actions
+        if result["action"] == "PAUSE":
+            logger.info(f"    ✅ Applied: Paused campaign {result['campaign_name']}")
+            digest.append(f"🛑 Paused campaign: {result['campaign_name']} - {result['reason']}")
 
+        elif result["action"] == "INCREASE_BUDGET":
+            logger.info(f"    ✅ Applied: Budget increased for {result['campaign_name']}")
+            digest.append(
+                f"📈 Budget increased: {result['campaign_name']} "
+                f"${result['current_budget']:.2f} → ${result['new_budget']:.2f}"
+            )
 
-def apply_pause_action(client, customer_id, campaign_id):
-    """Pause a campaign."""
-    campaign_service = client.get_service("CampaignService")
-    campaign_operation = client.get_type("CampaignOperation")
+    # One digest per run instead of one webhook call per action
+    get_dispatcher().send_digest(digest, title=f"Google Ads automation - customer {customer_id}")
 
-    campaign = campaign_operation.update
-    campaign.resource_name = campaign_service.campaign_path(customer_id, campaign_id)
-    campaign.status = client.enums.CampaignStatusEnum.PAUSED
+    return results + skipped
 
-    campaign_operation.update_mask.paths.append("status")
 
-    response = campaign_service.mutate_campaigns(customer_id=customer_id, operations=[campaign_operation])
+def fetch_rule_campaigns(client, customer_id, definition, cache=None):
+    """
+    Fetch an account's campaigns with only the columns and rows a rule set needs.
 
-    return response
+    The query selects the columns the rules and the apply path read, and
+    skip_if thresholds and statuses are filtered server-side (see query_planner).
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        definition: Rule set definition
+        cache: Optional MetricsCache for incremental metric fetches
+
+    Returns:
+        pandas.DataFrame: Campaign data
+    """
+    columns, predicates, statuses = rule_projection(definition, customer_id)
+    return list_campaigns(
+        client,
+        customer_id,
+        include_metrics=True,
+        days_back=14,
+        stream=True,
+        cache=cache,
+        columns=columns,
+        predicates=predicates,
+        statuses=statuses,
+    )
+
+
+def run_account_rules(
+    client,
+    customer_id,
+    dry_run=True,
+    cache=None,
+    rules=None,
+    anomalies=False,
+    ledger=None,
+    snapshots=None,
+    df=None,
+    actions=None,
+):
+    """
+    Fetch, evaluate and optionally apply rules for a single account.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to evaluate
+        dry_run: If True, only report actions without applying them
+        cache: Optional MetricsCache for incremental metric fetches
+        rules: Rule set definition (default: built from RULES)
+        anomalies: Also scan daily series for anomalies and add ALERT actions
+        ledger: Optional ActionLedger shared across runs (see apply_actions)
+        snapshots: Optional CampaignSnapshots; only campaigns whose metrics
+            changed since the previous run are evaluated (see change_detection)
+        df: Campaign frame already fetched for the account (default: fetched here)
+        actions: Rule actions already evaluated for df (see
+            parallel_evaluation); snapshots are not used then
+
+    Returns:
+        list: Recommended actions for the account (with apply status and
+        error when not a dry run)
+    """
+    definition = rules if rules is not None else rules_from_thresholds(RULES)
+
+    # Get campaign data
+    if df is None:
+        df = fetch_rule_campaigns(client, customer_id, definition, cache=cache)
 
+    if df.empty:
+        logger.info(f"No campaigns to evaluate for customer {customer_id}")
+        return []
+
+    def drop_paused(frame, actions):
+        # Campaigns that are already paused need no PAUSE
+        if actions and "status" in frame.columns:
+            paused = set(frame.loc[frame["status"] == "PAUSED", "campaign_id"].astype(str))
+            actions = [a for a in actions if not (a["action"] == "PAUSE" and str(a["campaign_id"]) in paused)]
+        return actions
+
+    def evaluate(frame):
+        return drop_paused(frame, evaluate_campaigns(frame, rules=definition, customer_id=customer_id))
+
+    # Evaluate against rules
+    reused = []
+    if actions is not None:
+        actions = drop_paused(df, list(actions))
+    elif snapshots is not None:
+        actions, reused = snapshots.evaluate_changed(customer_id, df, evaluate, definition)
+    else:
+        actions = evaluate(df)
 
-def apply_budget_action(client, customer_id, campaign_id, new_budget_micros):
-    """Update campaign budget."""
-    # Note: This requires getting the budget resource name first
-    # Simplified implementation - in production, get budget ID from campaign
-    logger.info(f"Would set budget to ${new_budget_micros / 1_000_000:.2f}")
+    if anomalies:
+        actions += find_anomaly_actions(client, customer_id, cache=cache)
 
+    if not actions and not reused:
+        logger.info(f"✅ Customer {customer_id}: all campaigns within thresholds - no actions needed")
+        return []
 
-def run_automation_rules(dry_run=True):
+    # Report and optionally apply actions
+    logger.info(f"Found {len(actions) + len(reused)} recommended actions for customer {customer_id}:")
+    results = apply_actions(
+        client,
+        customer_id,
+        actions,
+        dry_run=dry_run,
+        budget_index=build_budget_index(df),
+        ledger=ledger,
+        reused=reused,
+    )
+
+    return results or actions + reused
+
+
+def run_automation_rules(
+    dry_run=True,
+    cache_path=None,
+    client=None,
+    rules_path=None,
+    anomalies=False,
+    ledger_path=None,
+    snapshot_path=None,
+    snapshots=None,
+    cache=None,
+):
     """
     Run all automation rules.
 
     Args:
         dry_run: If True, only report actions without applying them
+        cache_path: Optional SQLite metrics cache file (see metrics_cache)
+        client: Google Ads client to reuse (default: a new client)
+        rules_path: Optional YAML/JSON rule set (default: built from RULES)
+        anomalies: Also alert on anomalies in daily metric series
+        ledger_path: Optional SQLite action ledger (see action_ledger)
+        snapshot_path: Optional SQLite campaign snapshots for diff mode (see
+            change_detection)
+        snapshots: CampaignSnapshots to reuse instead of opening snapshot_path,
+            so its in-memory snapshots survive between runs
+        cache: MetricsCache to reuse instead of opening cache_path
+
+    Returns:
+        list: Recommended actions
     """
-    client = get_google_ads_client()
+    client = client or get_google_ads_client()
     customer_id = get_customer_id()
 
     logger.info(f"Running automation rules (dry_run={dry_run})")
 
-    # Get campaign data
-    df = list_campaigns(client, customer_id, include_metrics=True, days_back=14)
+    if cache is None and cache_path:
+        cache = MetricsCache(cache_path)
+    rules = load_rules(rules_path) if rules_path else None
+    ledger = ActionLedger(ledger_path) if ledger_path else None
+    if snapshots is None and snapshot_path:
+        snapshots = CampaignSnapshots(snapshot_path)
+    return run_account_rules(
+        client, customer_id, dry_run=dry_run, cache=cache, rules=rules, anomalies=anomalies, ledger=ledger, snapshots=snapshots
+    )
 
-    if df.empty:
-        logger.info("No campaigns to evaluate")
-        return
 
-    # Evaluate against rules
-    actions = evaluate_campaigns(df)
+def map_accounts(func, customer_ids, max_workers):
+    """
+    Run func(customer_id) for every account on a bounded thread pool.
 
-    if not actions:
-        logger.info("✅ All campaigns within thresholds - no actions needed")
-        return
+    A failure in one account is logged and recorded without affecting the others.
 
-    # Report and optionally apply actions
-    logger.info(f"Found {len(actions)} recommended actions:")
+    Returns:
+        tuple: (customer_id -> result, customer_id -> error message)
+    """
+    from google.ads.googleads.errors import GoogleAdsException
 
-    for action in actions:
-        action_str = f"  [{action['action']}] {action['campaign_name']}: {action['reason']}"
-        logger.info(action_str)
+    results = {}
+    failed = {}
 
-        if not dry_run:
-            if action["action"] == "PAUSE":
-                try:
-                    apply_pause_action(client, customer_id, action["campaign_id"])
-                    logger.info(f"    ✅ Applied: Paused campaign")
-                    send_slack_notification(f"🛑 Paused campaign: {action['campaign_name']} - {action['reason']}")
-                except GoogleAdsException as ex:
-                    handle_google_ads_exception(ex)
-
-            elif action["action"] == "INCREASE_BUDGET":
-                new_budget_micros = int(action["new_budget"] * 1_000_000)
-                apply_budget_action(client, customer_id, action["campaign_id"], new_budget_micros)
-                send_slack_notification(
-                    f"📈 Budget increased: {action['campaign_name']} "
-                    f"${action['current_budget']:.2f} → ${action['new_budget']:.2f}"
-                )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, customer_id): customer_id for customer_id in customer_ids}
+
+        for future in as_completed(futures):
+            customer_id = futures[future]
+            try:
+                results[customer_id] = future.result()
+            except GoogleAdsException as ex:
+                logger.error(f"❌ Customer {customer_id} failed")
+                handle_google_ads_exception(ex)
+                failed[customer_id] = f"GoogleAdsException (request_id={ex.request_id})"
+            except Exception as e:
+                logger.error(f"❌ Customer {customer_id} failed: {e}")
+                failed[customer_id] = str(e)
+
+    return results, failed
+
+
+def _evaluate_accounts_in_processes(client, customer_ids, max_workers, processes, cache, rules):
+    """
+    Fetch every account, then evaluate all frames together on a process pool.
+
+    Returns:
+        tuple: (customer_id -> (frame, actions), customer_id -> error message)
+    """
+    import pandas as pd
+
+    from parallel_evaluation import evaluate_portfolio
+
+    definition = rules if rules is not None else rules_from_thresholds(RULES)
+
+    def fetch(customer_id):
+        return fetch_rule_campaigns(client, customer_id, definition, cache=cache)
+
+    frames, failed = map_accounts(fetch, customer_ids, max_workers)
+    frames = {customer_id: frames[customer_id] for customer_id in customer_ids if customer_id in frames}
+
+    non_empty = [frame.assign(customer_id=customer_id) for customer_id, frame in frames.items() if not frame.empty]
+    if not non_empty:
+        return {customer_id: (frame, []) for customer_id, frame in frames.items()}, failed
+
+    portfolio = evaluate_portfolio(pd.concat(non_empty, ignore_index=True), rules=rules, processes=processes, summaries=False)
+    evaluated = {customer_id: (frame, portfolio["actions"].get(str(customer_id), [])) for customer_id, frame in frames.items()}
+    return evaluated, failed
+
+
+def run_automation_rules_for_accounts(
+    dry_run=True,
+    customer_ids=None,
+    max_workers=DEFAULT_MAX_WORKERS,
+    client=None,
+    cache_path=None,
+    rules_path=None,
+    anomalies=False,
+    ledger_path=None,
+    snapshot_path=None,
+    processes=None,
+    snapshots=None,
+    cache=None,
+):
+    """
+    Run all automation rules across many accounts with one shared client.
+
+    Accounts are processed on a bounded thread pool. A failure in one account
+    is logged and recorded without affecting the others.
+
+    Args:
+        dry_run: If True, only report actions without applying them
+        customer_ids: Accounts to evaluate (default: all child accounts of
+            GOOGLE_ADS_LOGIN_CUSTOMER_ID)
+        max_workers: Maximum number of accounts processed concurrently
+        client: Google Ads client to share (default: a new client)
+        cache_path: Optional SQLite metrics cache file shared by all accounts
+        rules_path: Optional YAML/JSON rule set with per-account overrides
+            (default: built from RULES)
+        anomalies: Also alert on anomalies in daily metric series
+        ledger_path: Optional SQLite action ledger shared by all accounts
+        snapshot_path: Optional SQLite campaign snapshots for diff mode
+        processes: Evaluate all fetched accounts together on this many worker
+            processes (see parallel_evaluation) instead of per account on the
+            thread pool; diff mode snapshots are not used then
+        snapshots: CampaignSnapshots to reuse instead of opening snapshot_path
+        cache: MetricsCache to reuse instead of opening cache_path
+
+    Returns:
+        dict: "actions" (each tagged with customer_id, in account order) and
+        "failed" (customer_id -> error message)
+    """
+    client = client or get_google_ads_client()
+    if cache is None and cache_path:
+        cache = MetricsCache(cache_path)
+    rules = load_rules(rules_path) if rules_path else None
+    ledger = ActionLedger(ledger_path) if ledger_path else None
+    if snapshots is None and snapshot_path:
+        snapshots = CampaignSnapshots(snapshot_path)
+
+    if customer_ids is None:
+        customer_ids = list_child_accounts(client, get_login_customer_id())
+
+    logger.info(f"Running automation rules for {len(customer_ids)} accounts (dry_run={dry_run}, max_workers={max_workers})")
+
+    if processes:
+        evaluated, failed = _evaluate_accounts_in_processes(client, customer_ids, max_workers, processes, cache, rules)
+
+        def run(customer_id):
+            df, actions = evaluated[customer_id]
+            return run_account_rules(client, customer_id, dry_run, cache, rules, anomalies, ledger, df=df, actions=actions)
+
+        account_actions, apply_failed = map_accounts(run, list(evaluated), max_workers)
+        failed.update(apply_failed)
+    else:
+
+        def run(customer_id):
+            return run_account_rules(client, customer_id, dry_run, cache, rules, anomalies, ledger, snapshots)
+
+        account_actions, failed = map_accounts(run, customer_ids, max_workers)
+
+    actions = []
+    for customer_id in customer_ids:
+        for action in account_actions.get(customer_id, []):
+            actions.append({"customer_id": customer_id, **action})
+
+    logger.info(f"Completed {len(customer_ids) - len(failed)}/{len(customer_ids)} accounts, {len(actions)} actions")
+
+    return {"actions": actions, "failed": failed}
 
 
 if __name__ == "__main__":
@@ -186,11 +526,63 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Run Google Ads automation rules")
     parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry run)")
+    parser.add_argument(
+        "--all-accounts", action="store_true", help="Run for every client account under GOOGLE_ADS_LOGIN_CUSTOMER_ID"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Accounts processed concurrently with --all-accounts"
+    )
+    parser.add_argument(
+        "--processes", type=int, metavar="N", help="Evaluate all accounts together on N processes with --all-accounts"
+    )
+    parser.add_argument("--cache", metavar="PATH", help="SQLite metrics cache; only fetch missing or recent days")
+    parser.add_argument("--rules", metavar="PATH", help="YAML/JSON rule set (default: built-in RULES thresholds)")
+    parser.add_argument("--anomalies", action="store_true", help="Alert on anomalies in daily cost, clicks, CTR and CPA")
+    parser.add_argument("--ledger", metavar="PATH", help="SQLite action ledger; skip duplicates and resume interrupted runs")
+    parser.add_argument(
+        "--snapshots", metavar="PATH", help="SQLite campaign snapshots; only evaluate campaigns whose metrics changed"
+    )
+    parser.add_argument("--export", metavar="PATH", help="Write the action audit log (.xlsx, .csv, .csv.gz or .parquet)")
+    parser.add_argument("--metrics", metavar="PATH", help="Write run timings and counters as a Prometheus text file")
+    parser.add_argument("--profile", metavar="PATH", help="Profile the run (cProfile stats, or pyinstrument for .html)")
     args = parser.parse_args()
 
+    from contextlib import nullcontext
+
+    from google.ads.googleads.errors import GoogleAdsException
+
     try:
-        run_automation_rules(dry_run=not args.apply)
+        profiler = profile_run(args.profile) if args.profile else nullcontext()
+        with profiler:
+            if args.all_accounts:
+                actions = run_automation_rules_for_accounts(
+                    dry_run=not args.apply,
+                    max_workers=args.max_workers,
+                    cache_path=args.cache,
+                    rules_path=args.rules,
+                    anomalies=args.anomalies,
+                    ledger_path=args.ledger,
+                    snapshot_path=args.snapshots,
+                    processes=args.processes,
+                )["actions"]
+            else:
+                actions = run_automation_rules(
+                    dry_run=not args.apply,
+                    cache_path=args.cache,
+                    rules_path=args.rules,
+                    anomalies=args.anomalies,
+                    ledger_path=args.ledger,
+                    snapshot_path=args.snapshots,
+                )
+
+            if args.export:
+                from exporters import export_action_log
+
+                export_action_log(args.export, actions)
     except GoogleAdsException as ex:
         handle_google_ads_exception(ex)
     except Exception as e:
         logger.error(f"Error: {e}")
+    finally:
+        if args.metrics:
+            get_metrics().write_prometheus(args.metrics)
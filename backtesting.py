@@ -0,0 +1,316 @@
+"""
+Rule Threshold Backtesting
+Empire Amplify - Automation Rules
+
+Replays daily campaign history through the built-in rules for a whole grid
+of RULES thresholds:
+- Every simulated run evaluates the previous `lookback_days` of metrics
+  (as run_account_rules does), once per day or every `step_days`
+- A paused campaign stays paused, so its later spend and conversions are
+  what the pause would have affected
+- Budget increases are counted until a campaign is paused, with the daily
+  budget added and the spend of increased campaigns from the first increase
+
+Daily rows are laid out as campaign x day matrices and window sums come from
+cumulative sums. The pause thresholds and the budget thresholds are swept
+separately and combined per campaign through cumulative counts, so a grid
+of thousands of combinations costs little more than its two halves.
+"""
+
+import itertools
+
+import numpy as np
+from loguru import logger
+
+from anomaly_detection import build_daily_matrices, load_daily_series, lookback_window
+
+# RULES keys that can be swept, in result column order
+GRID_PARAMS = (
+    "min_spend_for_evaluation",
+    "pause_if_cpa_above",
+    "pause_if_ctr_below",
+    "increase_budget_if_roas_above",
+    "budget_increase_percent",
+    "max_daily_budget",
+)
+
+DEFAULT_LOOKBACK_DAYS = 14  # Same window as run_account_rules
+DEFAULT_HISTORY_DAYS = 90
+
+_METRICS = ("cost", "clicks", "impressions", "conversions", "conversion_value", "budget_micros")
+
+
+class BacktestHistory:
+    """
+    Windowed metrics of every campaign at every simulated run.
+
+    Args:
+        daily: DataFrame of daily campaign rows (see fetch_daily_metrics)
+        lookback_days: Days of metrics each simulated run evaluates
+        step_days: Days between simulated runs
+        start_date: First day of the history (default: earliest date in daily)
+        end_date: Last day of the history (default: latest date in daily);
+            days without rows are zero activity
+    """
+
+    def __init__(self, daily, lookback_days=DEFAULT_LOOKBACK_DAYS, step_days=1, start_date=None, end_date=None):
+        campaign_ids, _, days, matrices = build_daily_matrices(
+            daily, metrics=_METRICS, start_date=start_date, end_date=end_date
+        )
+        n_days = len(days)
+        if n_days <= lookback_days:
+            raise ValueError(f"Backtesting needs more than {lookback_days} days of history, got {n_days}")
+
+        # Simulated run at the start of day t evaluates days [t - lookback_days, t) and affects days t onwards
+        runs = np.arange(lookback_days, n_days, step_days)
+        self.campaign_ids = campaign_ids
+        self.run_days = days[runs]
+
+        def window(matrix):
+            totals = np.zeros((matrix.shape[0], n_days + 1))
+            np.cumsum(matrix, axis=1, out=totals[:, 1:])
+            return totals[:, runs] - totals[:, runs - lookback_days], totals
+
+        self.cost, cost_totals = window(matrices["cost"])
+        self.conversions, conversion_totals = window(matrices["conversions"])
+        self.conversion_value, _ = window(matrices["conversion_value"])
+        clicks, _ = window(matrices["clicks"])
+        impressions, _ = window(matrices["impressions"])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.cpa = np.where(self.conversions > 0, self.cost / self.conversions, np.nan)
+            self.ctr = np.where(impressions > 0, clicks / impressions * 100, 0.0)
+            self.roas = self.conversion_value / self.cost
+
+        self.budget = _latest_budget(matrices["budget_micros"])[:, runs - 1] / 1_000_000
+
+        # Spend and conversions from each run to the end of the history; the
+        # extra last column (all zeros) stands for "never"
+        self.spend_after = self._after(cost_totals, runs)
+        self.conversions_after = self._after(conversion_totals, runs)
+
+    @staticmethod
+    def _after(totals, runs):
+        after = np.zeros((totals.shape[0], len(runs) + 1))
+        after[:, :-1] = totals[:, -1:] - totals[:, runs]
+        return after
+
+    @property
+    def n_runs(self):
+        return len(self.run_days)
+
+
+def _latest_budget(budget_micros):
+    """Carry each campaign's budget forward over days without a row (0 in the matrix)."""
+    known = budget_micros > 0
+    last = np.where(known, np.arange(budget_micros.shape[1]), 0)
+    np.maximum.accumulate(last, axis=1, out=last)
+    return np.take_along_axis(budget_micros, last, axis=1)
+
+
+def _first_run(mask, n_runs):
+    """Index of the first True run per campaign, n_runs where there is none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), n_runs)
+
+
+def _cumulative(values):
+    totals = np.zeros((values.shape[0], values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=totals[:, 1:])
+    return totals
+
+
+def expand_grid(grid, base=None):
+    """
+    Threshold values to sweep per RULES key.
+
+    Args:
+        grid: Dict of RULES key -> value or list of values
+        base: RULES dict for keys not in grid (default: automation_rules.RULES)
+
+    Returns:
+        dict: GRID_PARAMS key -> float64 array of values
+    """
+    if base is None:
+        from automation_rules import RULES
+
+        base = RULES
+
+    unknown = set(grid) - set(GRID_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown grid params: {sorted(unknown)} (expected some of {list(GRID_PARAMS)})")
+
+    return {name: np.atleast_1d(np.asarray(grid.get(name, base[name]), dtype=np.float64)) for name in GRID_PARAMS}
+
+
+def _sweep(history, min_spend, cpa_values, ctr_values, budget_grid):
+    """Results for one min spend, flattened in (max CPA, min CTR, budget thresholds) order."""
+    n_runs = history.n_runs
+    rows = np.arange(len(history.campaign_ids))[:, None]
+    eligible = history.cost >= min_spend
+
+    with np.errstate(invalid="ignore"):
+        first_cpa = np.stack([_first_run(eligible & (history.cpa > value), n_runs) for value in cpa_values])
+        first_ctr = np.stack([_first_run(eligible & (history.ctr < value), n_runs) for value in ctr_values])
+        # The first pause by either rule, per (max CPA, min CTR) and campaign
+        first_pause = np.minimum(first_cpa[:, None], first_ctr[None, :]).reshape(-1, len(rows))
+        can_increase = eligible & (history.conversions > 0) & (history.conversion_value > 0)
+        roas_masks = {value: can_increase & (history.roas > value) for value in np.unique(budget_grid[:, 0])}
+
+    # Pause results do not depend on the budget thresholds
+    n_budgets = len(budget_grid)
+    results = {
+        "pauses": np.repeat((first_pause < n_runs).sum(axis=1), n_budgets),
+        "paused_spend": np.repeat(history.spend_after[rows.T, first_pause].sum(axis=1), n_budgets),
+        "paused_conversions": np.repeat(history.conversions_after[rows.T, first_pause].sum(axis=1), n_budgets),
+    }
+
+    increases = np.empty((len(first_pause), len(budget_grid)))
+    campaigns = np.empty_like(increases)
+    added = np.empty_like(increases)
+    spend = np.empty_like(increases)
+
+    for b, (min_roas, percent, max_budget) in enumerate(budget_grid):
+        new_budget = np.minimum(history.budget * (1 + percent / 100), max_budget)
+        increase = roas_masks[min_roas] & (new_budget > history.budget)
+
+        # Runs before the campaign's first pause only
+        count = _cumulative(increase)[rows.T, first_pause]
+        delta = _cumulative(np.where(increase, new_budget - history.budget, 0.0))[rows.T, first_pause]
+        first_increase = _first_run(increase, n_runs)
+        increased = first_increase < first_pause
+
+        increases[:, b] = count.sum(axis=1)
+        campaigns[:, b] = increased.sum(axis=1)
+        added[:, b] = delta.sum(axis=1)
+        spend[:, b] = np.where(increased, history.spend_after[rows[:, 0], first_increase], 0.0).sum(axis=1)
+
+    results.update(
+        budget_increases=increases.ravel(),
+        budget_campaigns=campaigns.ravel(),
+        budget_added=added.ravel(),
+        budget_spend=spend.ravel(),
+    )
+    return results
+
+
+def backtest_grid(daily, grid, lookback_days=DEFAULT_LOOKBACK_DAYS, step_days=1, base=None, start_date=None, end_date=None):
+    """
+    Replay daily history through the built-in rules for every threshold combination.
+
+    Args:
+        daily: DataFrame of daily campaign rows (see fetch_daily_metrics or
+            MetricsCache.load_daily)
+        grid: Dict of RULES key -> list of values to sweep (see GRID_PARAMS);
+            other keys keep their base value
+        lookback_days: Days of metrics each simulated run evaluates
+        step_days: Days between simulated runs
+        base: RULES dict for keys not in grid (default: automation_rules.RULES)
+        start_date: First day of the requested history (default: earliest date in daily)
+        end_date: Last day of the requested history (default: latest date in daily)
+
+    Returns:
+        pandas.DataFrame: One row per combination with its thresholds, pauses,
+        paused_spend, paused_conversions (after each pause to the end of the
+        history), budget_increases, budget_campaigns, budget_added (daily
+        budget added over all increases) and budget_spend (spend of increased
+        campaigns from their first increase)
+    """
+    import pandas as pd
+
+    history = BacktestHistory(
+        daily, lookback_days=lookback_days, step_days=step_days, start_date=start_date, end_date=end_date
+    )
+    values = expand_grid(grid, base)
+    budget_grid = np.array(
+        list(
+            itertools.product(
+                values["increase_budget_if_roas_above"], values["budget_increase_percent"], values["max_daily_budget"]
+            )
+        )
+    )
+
+    combinations = []
+    metrics = {}
+    for min_spend in values["min_spend_for_evaluation"]:
+        swept = _sweep(history, min_spend, values["pause_if_cpa_above"], values["pause_if_ctr_below"], budget_grid)
+        for name, result in swept.items():
+            metrics.setdefault(name, []).append(result)
+
+        pause_grid = itertools.product(values["pause_if_cpa_above"], values["pause_if_ctr_below"])
+        combinations.extend(
+            (min_spend, max_cpa, min_ctr, *budget)
+            for (max_cpa, min_ctr), budget in itertools.product(pause_grid, budget_grid.tolist())
+        )
+
+    results = pd.DataFrame(combinations, columns=list(GRID_PARAMS))
+    for name, parts in metrics.items():
+        results[name] = np.concatenate(parts)
+
+    logger.info(
+        f"Backtested {len(results)} threshold combinations over {len(history.campaign_ids)} campaigns "
+        f"and {history.n_runs} simulated runs"
+    )
+    return results
+
+
+def parse_grid_values(text):
+    """
+    Parse "50,75,100" or an inclusive range "50:200:25" into a list of floats.
+    """
+    if ":" in text:
+        start, stop, step = (float(part) for part in text.split(":"))
+        return np.arange(start, stop + step / 2, step).round(10).tolist()
+    return [float(part) for part in text.split(",") if part.strip()]
+
+
+if __name__ == "__main__":
+    import argparse
+    from datetime import date
+
+    from google_ads_client import get_customer_id, get_google_ads_client, handle_google_ads_exception
+    from metrics_cache import MetricsCache
+
+    parser = argparse.ArgumentParser(description="Backtest rule thresholds over daily campaign history")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="KEY=VALUES",
+        help="RULES key and values to sweep, e.g. pause_if_cpa_above=50:200:10 or pause_if_ctr_below=0.3,0.5 (repeatable)",
+    )
+    parser.add_argument("--days", type=int, default=DEFAULT_HISTORY_DAYS, help="Days of history to replay")
+    parser.add_argument("--lookback", type=int, default=DEFAULT_LOOKBACK_DAYS, help="Days each simulated run evaluates")
+    parser.add_argument("--step", type=int, default=1, help="Days between simulated runs")
+    parser.add_argument("--cache", metavar="PATH", help="SQLite metrics cache; only fetch missing or recent days")
+    parser.add_argument("--sort", default="paused_spend", help="Result column to sort by (descending)")
+    parser.add_argument("--top", type=int, default=20, help="Combinations to print")
+    parser.add_argument("--output", metavar="PATH", help="Write all combinations (.xlsx, .csv, .csv.gz or .parquet)")
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
+    try:
+        grid = {}
+        for item in args.grid:
+            name, _, text = item.partition("=")
+            grid[name.strip()] = parse_grid_values(text)
+
+        client = get_google_ads_client()
+        cache = MetricsCache(args.cache) if args.cache else None
+        today = date.today()
+        start_date, end_date = lookback_window(args.days, today)
+        daily = load_daily_series(client, get_customer_id(), cache=cache, days=args.days, today=today)
+
+        results = backtest_grid(
+            daily, grid, lookback_days=args.lookback, step_days=args.step, start_date=start_date, end_date=end_date
+        )
+        print(results.sort_values(args.sort, ascending=False).head(args.top).to_string(index=False))
+
+        if args.output:
+            from exporters import export_frames
+
+            export_frames(args.output, [results], summary=False, sheet_name="Backtest")
+    except GoogleAdsException as ex:
+        handle_google_ads_exception(ex)
+    except Exception as e:
+        logger.error(f"Error: {e}")
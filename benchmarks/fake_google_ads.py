@@ -0,0 +1,423 @@
+"""
+Synthetic Google Ads API
+Empire Amplify - Benchmarks
+
+In-process stand-in for the parts of GoogleAdsClient the automation uses:
+- GoogleAdsService.search / search_stream over generated campaign rows
+  (aggregate, daily- and hourly-segmented, customer and customer_client
+  queries) and over generated keyword_view / search_term_view rows
+- CampaignService / CampaignBudgetService / AdGroupCriterionService mutates
+- get_type / enums for building operations
+
+Rows are generated deterministically per account at any scale, and every
+page, stream batch and mutate call can be given an artificial latency.
+"""
+
+import re
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+PAGE_SIZE = 10_000
+
+CHANNEL_TYPES = ("SEARCH", "DISPLAY", "SHOPPING", "VIDEO", "PERFORMANCE_MAX")
+BIDDING_STRATEGIES = ("TARGET_CPA", "TARGET_ROAS", "MAXIMIZE_CONVERSIONS", "MANUAL_CPC")
+STATUSES = ("ENABLED", "PAUSED")
+
+_BETWEEN = re.compile(r"segments\.date BETWEEN '(\d{4}-\d{2}-\d{2})' AND\s+'(\d{4}-\d{2}-\d{2})'")
+_ID_IN = re.compile(r"campaign\.id IN \(([\d,\s]+)\)")
+_FROM_CUSTOMER = re.compile(r"FROM customer\b(?!_)")
+
+# Share of a day's spend per hour: low overnight, peaking mid-afternoon
+_HOURLY_WEIGHTS = 0.2 + np.clip(np.sin(np.pi * (np.arange(24) - 6) / 18), 0, None)
+HOURLY_SHARES = _HOURLY_WEIGHTS / _HOURLY_WEIGHTS.sum()
+
+TIME_ZONE = "America/New_York"
+
+
+class _Enum(int):
+    """Enum number with a .name, like proto-plus (IntEnum) enums."""
+
+    def __new__(cls, number, name):
+        member = super().__new__(cls, number)
+        member.name = name
+        return member
+
+
+_ENUMS = {
+    name: _Enum(number, name)
+    for names in (CHANNEL_TYPES, BIDDING_STRATEGIES, STATUSES)
+    for number, name in enumerate(names, start=2)
+}
+
+
+class _Campaign:
+    __slots__ = ("id", "name", "status", "advertising_channel_type", "bidding_strategy_type")
+
+
+class _Budget:
+    __slots__ = ("amount_micros", "resource_name", "explicitly_shared")
+
+
+class _Metrics:
+    __slots__ = ("impressions", "clicks", "cost_micros", "conversions", "conversions_value", "ctr", "average_cpc")
+
+
+class _Segments:
+    __slots__ = ("date", "hour")
+
+
+class _AdGroup:
+    __slots__ = ("id",)
+
+
+class _Keyword:
+    __slots__ = ("text",)
+
+
+class _Criterion:
+    __slots__ = ("criterion_id", "keyword")
+
+
+class _SearchTermView:
+    __slots__ = ("search_term",)
+
+
+class _Row:
+    __slots__ = (
+        "campaign",
+        "campaign_budget",
+        "metrics",
+        "segments",
+        "customer_client",
+        "ad_group",
+        "ad_group_criterion",
+        "search_term_view",
+        "customer",
+    )
+
+
+class SyntheticAccount:
+    """Generated campaign data for one customer ID (column arrays)."""
+
+    def __init__(self, customer_id, n_campaigns, seed):
+        rng = np.random.default_rng(seed)
+        n = n_campaigns
+
+        self.customer_id = customer_id
+        self.campaign_id = np.arange(1, n + 1, dtype=np.int64) + int(seed) * 10_000_000
+        self.status = rng.choice(len(STATUSES), n, p=[0.85, 0.15])
+        self.channel = rng.integers(0, len(CHANNEL_TYPES), n)
+        self.bidding = rng.integers(0, len(BIDDING_STRATEGIES), n)
+
+        # Roughly one in ten campaigns sits on a shared budget (groups of 4)
+        budget_ids = np.arange(n)
+        shared = rng.random(n) < 0.1
+        budget_ids[shared] = n + budget_ids[shared] // 4
+        self.budget_id = budget_ids
+        self.budget_shared = shared
+        self.budget_micros = (rng.choice([10, 25, 50, 100, 250, 500], n) * 1_000_000).astype(np.int64)
+
+        self.impressions = rng.lognormal(8, 1.5, n).astype(np.int64)
+        ctr = rng.beta(2, 60, n)
+        self.clicks = (self.impressions * ctr).astype(np.int64)
+        cpc_micros = rng.lognormal(14.5, 0.6, n)
+        self.cost_micros = (self.clicks * cpc_micros).astype(np.int64)
+        conversion_rate = rng.beta(1.5, 30, n)
+        self.conversions = np.round(self.clicks * conversion_rate, 1)
+        self.conversion_value = np.round(self.conversions * rng.lognormal(4, 0.8, n), 2)
+
+        # Today's spend rate relative to the campaign's usual day
+        self.pace = rng.lognormal(0, 0.5, n)
+
+    def __len__(self):
+        return len(self.campaign_id)
+
+    def make_row(self, i, day=None, day_fraction=1.0, hour=None):
+        """Build one GoogleAdsRow-like object for campaign index i."""
+        row = _Row()
+
+        campaign = _Campaign()
+        campaign.id = int(self.campaign_id[i])
+        campaign.name = f"Campaign {campaign.id}"
+        campaign.status = _ENUMS[STATUSES[self.status[i]]]
+        campaign.advertising_channel_type = _ENUMS[CHANNEL_TYPES[self.channel[i]]]
+        campaign.bidding_strategy_type = _ENUMS[BIDDING_STRATEGIES[self.bidding[i]]]
+        row.campaign = campaign
+
+        budget = _Budget()
+        budget.amount_micros = int(self.budget_micros[i])
+        budget.resource_name = f"customers/{self.customer_id}/campaignBudgets/{int(self.budget_id[i])}"
+        budget.explicitly_shared = bool(self.budget_shared[i])
+        row.campaign_budget = budget
+
+        metrics = _Metrics()
+        metrics.impressions = int(self.impressions[i] * day_fraction)
+        metrics.clicks = int(self.clicks[i] * day_fraction)
+        metrics.cost_micros = int(self.cost_micros[i] * day_fraction)
+        metrics.conversions = float(self.conversions[i] * day_fraction)
+        metrics.conversions_value = float(self.conversion_value[i] * day_fraction)
+        metrics.ctr = metrics.clicks / metrics.impressions if metrics.impressions else 0.0
+        metrics.average_cpc = metrics.cost_micros / metrics.clicks if metrics.clicks else 0.0
+        row.metrics = metrics
+
+        segments = _Segments()
+        segments.date = day
+        segments.hour = hour
+        row.segments = segments
+
+        return row
+
+
+def criterion_rows(account, resource, count, seed):
+    """
+    Generate keyword_view or search_term_view rows for an account.
+
+    Rows are generated PAGE_SIZE at a time from a per-block seed, so any
+    count streams in bounded memory and the same rows come back every time.
+    About 20 rows share an ad group; search terms spend and convert like
+    keywords but with a longer tail of non-converting rows.
+    """
+    conversion_rate = 0.02 if resource == "search_term_view" else 0.04
+    for start in range(0, count, PAGE_SIZE):
+        size = min(PAGE_SIZE, count - start)
+        rng = np.random.default_rng([int(seed), start])
+        index = np.arange(start, start + size)
+        campaign_ids = account.campaign_id[index % len(account)]
+
+        clicks = rng.negative_binomial(1, 0.08, size)
+        impressions = clicks * rng.integers(5, 60, size) + rng.integers(0, 50, size)
+        cost_micros = (clicks * rng.lognormal(13.8, 0.7, size)).astype(np.int64)
+        conversions = rng.binomial(clicks, conversion_rate).astype(np.float64)
+        conversion_value = np.round(conversions * rng.lognormal(4, 0.8, size), 2)
+
+        for j in range(size):
+            row = _Row()
+
+            campaign = _Campaign()
+            campaign.id = int(campaign_ids[j])
+            campaign.name = f"Campaign {campaign.id}"
+            row.campaign = campaign
+
+            ad_group = _AdGroup()
+            ad_group.id = int(seed) * 10_000_000 + int(index[j]) // 20 + 1
+            row.ad_group = ad_group
+
+            if resource == "keyword_view":
+                keyword = _Keyword()
+                keyword.text = f"keyword {index[j]}"
+                criterion = _Criterion()
+                criterion.criterion_id = int(index[j]) + 1
+                criterion.keyword = keyword
+                row.ad_group_criterion = criterion
+            else:
+                search_term_view = _SearchTermView()
+                search_term_view.search_term = f"search term {index[j]}"
+                row.search_term_view = search_term_view
+
+            metrics = _Metrics()
+            metrics.impressions = int(impressions[j])
+            metrics.clicks = int(clicks[j])
+            metrics.cost_micros = int(cost_micros[j])
+            metrics.conversions = float(conversions[j])
+            metrics.conversions_value = float(conversion_value[j])
+            row.metrics = metrics
+
+            yield row
+
+
+class FakeGoogleAdsService:
+    """GoogleAdsService stand-in serving generated rows."""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def _rows(self, customer_id, query):
+        backend = self._backend
+
+        if "FROM customer_client" in query:
+            for account_id in backend.accounts:
+                row = _Row()
+                row.customer_client = SimpleNamespace(id=int(account_id))
+                yield row
+            return
+
+        if _FROM_CUSTOMER.search(query):
+            row = _Row()
+            row.customer = SimpleNamespace(id=int(customer_id), time_zone=TIME_ZONE)
+            yield row
+            return
+
+        account = backend.account(customer_id)
+
+        for resource, count in (
+            ("keyword_view", backend.keywords_per_account),
+            ("search_term_view", backend.search_terms_per_account),
+        ):
+            if f"FROM {resource}" in query:
+                yield from criterion_rows(account, resource, count, backend.account_seed(customer_id))
+                return
+
+        select_clause = query.split("FROM", 1)[0]
+
+        id_match = _ID_IN.search(query)
+        if id_match:
+            wanted = {int(value) for value in id_match.group(1).split(",")}
+            indexes = np.flatnonzero(np.isin(account.campaign_id, list(wanted)))
+        else:
+            indexes = range(len(account))
+
+        between = _BETWEEN.search(query)
+        if "segments.hour" in select_clause:
+            # Today: completed hours at the usual daily rate times the campaign's pace;
+            # a date range: the range's spend spread over the hourly curve
+            if "DURING TODAY" in query:
+                hours = range(backend.today_hour)
+                fractions = [account.pace / 30 * HOURLY_SHARES[hour] for hour in hours]
+            else:
+                days = (date.fromisoformat(between.group(2)) - date.fromisoformat(between.group(1))).days + 1
+                hours = range(24)
+                fractions = [np.full(len(account), days / 30 * HOURLY_SHARES[hour]) for hour in hours]
+            for hour, fraction in zip(hours, fractions):
+                for i in indexes:
+                    yield account.make_row(i, day_fraction=fraction[i], hour=hour)
+            return
+
+        if "segments.date" in select_clause and between:
+            start = date.fromisoformat(between.group(1))
+            end = date.fromisoformat(between.group(2))
+            days = [(start + timedelta(days=d)).isoformat() for d in range((end - start).days + 1)]
+            for day in days:
+                for i in indexes:
+                    yield account.make_row(i, day=day, day_fraction=1 / 30)
+            return
+
+        for i in indexes:
+            yield account.make_row(i)
+
+    def search(self, customer_id=None, query=None, **kwargs):
+        self._backend.record_call("search", customer_id)
+        for index, row in enumerate(self._rows(customer_id, query)):
+            if index % PAGE_SIZE == 0:
+                self._backend.sleep()
+            yield row
+
+    def search_stream(self, customer_id=None, query=None, **kwargs):
+        self._backend.record_call("search_stream", customer_id)
+        batch = []
+        for row in self._rows(customer_id, query):
+            batch.append(row)
+            if len(batch) == PAGE_SIZE:
+                self._backend.sleep()
+                yield SimpleNamespace(results=batch)
+                batch = []
+        self._backend.sleep()
+        yield SimpleNamespace(results=batch)
+
+
+class FakeMutateService:
+    """CampaignService / CampaignBudgetService / AdGroupCriterionService stand-in."""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    def campaign_path(self, customer_id, campaign_id):
+        return f"customers/{customer_id}/campaigns/{campaign_id}"
+
+    def ad_group_path(self, customer_id, ad_group_id):
+        return f"customers/{customer_id}/adGroups/{ad_group_id}"
+
+    def ad_group_criterion_path(self, customer_id, ad_group_id, criterion_id):
+        return f"customers/{customer_id}/adGroupCriteria/{ad_group_id}~{criterion_id}"
+
+    def _mutate(self, name, request=None, customer_id=None, operations=None):
+        operations = request.operations if request is not None else operations
+        customer_id = request.customer_id if request is not None else customer_id
+        self._backend.record_call(name, customer_id, operations=len(operations))
+        self._backend.sleep()
+        return SimpleNamespace(results=[SimpleNamespace(resource_name="") for _ in operations], partial_failure_error=None)
+
+    def mutate_campaigns(self, request=None, customer_id=None, operations=None):
+        return self._mutate("mutate_campaigns", request, customer_id, operations)
+
+    def mutate_campaign_budgets(self, request=None, customer_id=None, operations=None):
+        return self._mutate("mutate_campaign_budgets", request, customer_id, operations)
+
+    def mutate_ad_group_criteria(self, request=None, customer_id=None, operations=None):
+        return self._mutate("mutate_ad_group_criteria", request, customer_id, operations)
+
+
+def _operation():
+    return SimpleNamespace(
+        update=SimpleNamespace(), create=SimpleNamespace(keyword=SimpleNamespace()), update_mask=SimpleNamespace(paths=[])
+    )
+
+
+class FakeGoogleAdsClient:
+    """
+    GoogleAdsClient stand-in.
+
+    Args:
+        accounts: Number of client accounts under the manager
+        campaigns_per_account: Campaigns generated per account
+        latency_ms: Artificial latency per page, stream batch and mutate call
+        keywords_per_account: keyword_view rows generated per account
+        search_terms_per_account: search_term_view rows generated per account
+        today_hour: Account-local hour; DURING TODAY hourly rows cover the hours before it
+    """
+
+    def __init__(
+        self,
+        accounts=1,
+        campaigns_per_account=1000,
+        latency_ms=0.0,
+        keywords_per_account=0,
+        search_terms_per_account=0,
+        today_hour=12,
+    ):
+        self.accounts = [str(1_000_000_000 + i) for i in range(accounts)]
+        self.campaigns_per_account = campaigns_per_account
+        self.latency_ms = latency_ms
+        self.keywords_per_account = keywords_per_account
+        self.search_terms_per_account = search_terms_per_account
+        self.today_hour = today_hour
+        self.calls = []
+        self.enums = SimpleNamespace(
+            CampaignStatusEnum=SimpleNamespace(PAUSED="PAUSED", ENABLED="ENABLED"),
+            AdGroupCriterionStatusEnum=SimpleNamespace(PAUSED="PAUSED", ENABLED="ENABLED"),
+            KeywordMatchTypeEnum=SimpleNamespace(EXACT="EXACT", PHRASE="PHRASE", BROAD="BROAD"),
+        )
+
+        self._accounts = {}
+        self._services = {
+            "GoogleAdsService": FakeGoogleAdsService(self),
+            "CampaignService": FakeMutateService(self),
+            "CampaignBudgetService": FakeMutateService(self),
+            "AdGroupCriterionService": FakeMutateService(self),
+        }
+
+    def account_seed(self, customer_id):
+        return self.accounts.index(customer_id) if customer_id in self.accounts else 0
+
+    def account(self, customer_id):
+        if customer_id not in self._accounts:
+            seed = self.account_seed(customer_id)
+            self._accounts[customer_id] = SyntheticAccount(customer_id, self.campaigns_per_account, seed)
+        return self._accounts[customer_id]
+
+    def sleep(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def record_call(self, method, customer_id, **details):
+        self.calls.append({"method": method, "customer_id": customer_id, **details})
+
+    def get_service(self, name, version=None):
+        return self._services[name]
+
+    def get_type(self, name, version=None):
+        if name.endswith("Operation"):
+            return _operation()
+        return SimpleNamespace()
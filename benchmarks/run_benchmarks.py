@@ -0,0 +1,181 @@
+"""
+Offline Benchmark Suite
+Empire Amplify - Benchmarks
+
+Times the automation pipeline end to end against the synthetic API in
+benchmarks/fake_google_ads.py, at configurable scale and latency:
+- list_campaigns (paged search and search_stream)
+- evaluate_campaigns
+- get_campaign_performance_summary
+- apply loop (batched mutates)
+- multi-account run_automation_rules_for_accounts
+
+Reports throughput and peak RSS per stage and saves a JSON file so runs can
+be compared over time.
+
+Run with: python benchmarks/run_benchmarks.py --campaigns 1000 100000 --accounts 4
+"""
+
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from loguru import logger  # noqa: E402
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient  # noqa: E402
+
+DEFAULT_RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage(results, name, rows, func):
+    """Run one timed stage and record its throughput."""
+    start = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - start
+
+    results.append(
+        {
+            "stage": name,
+            "rows": rows,
+            "seconds": round(seconds, 6),
+            "rows_per_second": round(rows / seconds, 1) if seconds > 0 else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    )
+    print(f"  {name:<28} {rows:>10} rows  {seconds:>9.3f}s  {results[-1]['rows_per_second'] or 0:>12,.0f} rows/s")
+    return value
+
+
+def run_scale(campaigns, accounts=1, latency_ms=0.0, batch_size=None, max_workers=None):
+    """
+    Benchmark every stage at one scale.
+
+    Args:
+        campaigns: Campaigns per account
+        accounts: Number of accounts for the multi-account stage
+        latency_ms: Artificial API latency per page/batch/mutate
+        batch_size: Mutate batch size (default: action_applier.DEFAULT_BATCH_SIZE)
+        max_workers: Account concurrency (default: automation_rules.DEFAULT_MAX_WORKERS)
+
+    Returns:
+        list: Stage results
+    """
+    # Load the lazily imported dependencies up front so the first stage does not pay for them
+    import google.ads.googleads.errors  # noqa: F401
+    import pandas  # noqa: F401
+
+    from action_applier import DEFAULT_BATCH_SIZE, apply_actions_batched, build_budget_index
+    from automation_rules import DEFAULT_MAX_WORKERS, evaluate_campaigns, run_automation_rules_for_accounts
+    from list_campaigns import get_campaign_performance_summary, list_campaigns
+
+    # Offline: the apply stages must never post to a real webhook
+    os.environ["SLACK_WEBHOOK_URL"] = ""
+
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    max_workers = max_workers or DEFAULT_MAX_WORKERS
+
+    client = FakeGoogleAdsClient(accounts=accounts, campaigns_per_account=campaigns, latency_ms=latency_ms)
+    customer_id = client.accounts[0]
+    client.account(customer_id)
+
+    print(f"\n{campaigns:,} campaigns x {accounts} accounts, latency {latency_ms}ms")
+    results = []
+
+    _stage(results, "list_campaigns[search]", campaigns, lambda: list_campaigns(client, customer_id))
+    df = _stage(results, "list_campaigns[stream]", campaigns, lambda: list_campaigns(client, customer_id, stream=True))
+    actions = _stage(results, "evaluate_campaigns", campaigns, lambda: evaluate_campaigns(df))
+    _stage(results, "performance_summary", campaigns, lambda: get_campaign_performance_summary(df))
+
+    budget_index = build_budget_index(df)
+    _stage(
+        results,
+        "apply_actions_batched",
+        len(actions),
+        lambda: apply_actions_batched(client, customer_id, actions, batch_size=batch_size, budget_index=budget_index),
+    )
+
+    if accounts > 1:
+        _stage(
+            results,
+            "run_rules_all_accounts",
+            campaigns * accounts,
+            lambda: run_automation_rules_for_accounts(
+                dry_run=False, customer_ids=client.accounts, max_workers=max_workers, client=client
+            ),
+        )
+
+    for result in results:
+        result.update({"campaigns": campaigns, "accounts": accounts, "latency_ms": latency_ms})
+
+    return results
+
+
+def save_results(results, params, output=None):
+    """Write results to JSON and return the file path."""
+    if output is None:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    payload = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+
+    with open(output, "w") as f:
+        json.dump(payload, f, indent=2)
+
+    return output
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run offline benchmarks against a synthetic Google Ads API")
+    parser.add_argument("--campaigns", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Campaigns per account")
+    parser.add_argument("--accounts", type=int, default=1, help="Accounts for the multi-account stage")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency per page, stream batch and mutate call")
+    parser.add_argument("--batch-size", type=int, default=None, help="Mutate batch size")
+    parser.add_argument("--max-workers", type=int, default=None, help="Account concurrency")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/benchmark-<timestamp>.json)")
+    args = parser.parse_args()
+
+    # Per-row and per-action log lines would dominate the timings
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    all_results = []
+    for campaigns in args.campaigns:
+        all_results.extend(
+            run_scale(
+                campaigns,
+                accounts=args.accounts,
+                latency_ms=args.latency_ms,
+                batch_size=args.batch_size,
+                max_workers=args.max_workers,
+            )
+        )
+
+    path = save_results(all_results, vars(args), output=args.output)
+    print(f"\nResults saved to {path}")
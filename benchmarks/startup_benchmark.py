@@ -0,0 +1,153 @@
+"""
+Startup Benchmark
+Empire Amplify - Benchmarks
+
+Measures import cost of the entry-point modules with `python -X importtime`
+and fails when it regresses:
+- Cumulative import time must stay within STARTUP_BUDGETS
+- Heavy dependencies (pandas, the Google Ads SDK, requests) must not be
+  imported until a code path actually needs them
+
+Run with: python benchmarks/startup_benchmark.py [--scale 2.0]
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import budget per module, in seconds
+STARTUP_BUDGETS = {
+    "google_ads_client": 0.20,
+    "list_campaigns": 0.35,
+    "automation_rules": 0.35,
+    "scheduler_daemon": 0.40,
+}
+
+# Modules that must load lazily, never at import time of the entry points
+LAZY_MODULES = ("pandas", "google.ads.googleads", "requests")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_import(module, runs=3):
+    """
+    Import a module in fresh interpreters with -X importtime.
+
+    Args:
+        module: Module name to import
+        runs: Number of interpreters to start; the fastest run is kept
+
+    Returns:
+        dict: "seconds" (cumulative import time), "modules" (set of imported
+        module names) and "heaviest" (top-level imports sorted by cost)
+    """
+    best = None
+
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        total_us = 0
+        modules = set()
+        top_level = []
+
+        for line in completed.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+
+            cumulative_us, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            modules.add(name)
+
+            # Top-level entries are the ones with a single leading space
+            if len(indent) == 1:
+                total_us += cumulative_us
+                top_level.append((name, cumulative_us / 1_000_000))
+
+        result = {
+            "seconds": total_us / 1_000_000,
+            "modules": modules,
+            "heaviest": sorted(top_level, key=lambda item: item[1], reverse=True)[:5],
+        }
+
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+
+    return best
+
+
+def check_module(module, budget, scale=1.0, runs=3):
+    """
+    Check one module against its import budget and the lazy-module list.
+
+    Args:
+        module: Module name to import
+        budget: Import budget in seconds, or None to only check lazy imports
+        scale: Multiplier applied to the budget
+        runs: Interpreter starts; the fastest run is kept
+
+    Returns:
+        tuple: (measure_import result, list of failure messages)
+    """
+    result = measure_import(module, runs=runs)
+    failures = []
+
+    eager = sorted(name for name in result["modules"] if name in LAZY_MODULES)
+    if eager:
+        failures.append(f"{module}: imports {', '.join(eager)} at import time")
+
+    if budget is None:
+        return result, failures
+
+    limit = budget * scale
+    if result["seconds"] > limit:
+        heaviest = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in result["heaviest"])
+        failures.append(f"{module}: {result['seconds']:.3f}s > budget {limit:.3f}s (heaviest: {heaviest})")
+
+    return result, failures
+
+
+def check_startup(budgets=None, scale=1.0, runs=3):
+    """
+    Check every entry-point module.
+
+    Args:
+        budgets: Module -> budget in seconds (default: STARTUP_BUDGETS)
+        scale: Multiplier applied to every budget (for slow machines)
+        runs: Interpreter starts per module
+
+    Returns:
+        list: Failure messages (empty when within budget)
+    """
+    failures = []
+    for module, budget in (budgets or STARTUP_BUDGETS).items():
+        failures.extend(check_module(module, budget, scale=scale, runs=runs)[1])
+    return failures
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check entry-point import time against budgets")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (for slow machines)")
+    parser.add_argument("--runs", type=int, default=3, help="Interpreter starts per module")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget in STARTUP_BUDGETS.items():
+        result, module_failures = check_module(module, budget, scale=args.scale, runs=args.runs)
+        failures.extend(module_failures)
+        print(f"{module:<20} {result['seconds']:.3f}s (budget {budget * args.scale:.3f}s)")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+
+    sys.exit(1 if failures else 0)
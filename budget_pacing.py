@@ -0,0 +1,707 @@
+"""
+Intraday Budget Pacing
+Empire Amplify - Automation Rules
+
+Reacts within the day to campaigns that are about to exhaust or badly
+underspend their daily budget:
+- Today's spend by hour (segments.hour) is fitted against each campaign's
+  historical hourly spend profile to project end-of-day spend
+- Budgets on pace to run out with a good ROAS get an INCREASE_BUDGET action
+  (applied through the regular apply_actions flow, ledger included), capped
+  per day relative to the budget first seen that day
+- Budgets on pace to spend well under budget get an ALERT
+
+Hourly profiles come from one aggregated query over the last 28 days (one
+row per campaign and hour) and are kept in a local SQLite store, refreshed
+once a day. A pacing run only fetches today's hourly rows, so it is cheap
+enough to run every 15 minutes across all accounts.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from loguru import logger
+
+from action_ledger import ActionLedger
+from automation_rules import DEFAULT_MAX_WORKERS, RULES, apply_actions, map_accounts
+from google_ads_client import (
+    get_customer_id,
+    get_google_ads_client,
+    get_login_customer_id,
+    handle_google_ads_exception,
+    list_child_accounts,
+)
+from typed_columns import read_columns
+
+# Pacing thresholds (customize these)
+PACING_RULES = {
+    "min_expected_share": 0.15,  # Project only once 15% of a typical day's spend is in
+    "exhaust_ratio": 0.95,  # Projected spend >= 95% of budget: about to exhaust it
+    "underspend_ratio": 0.5,  # Projected spend < 50% of budget: badly underspending
+    "min_roas_for_increase": RULES["increase_budget_if_roas_above"],
+    "min_history_spend": RULES["min_spend_for_evaluation"],  # Profile-period spend needed to act
+    "budget_headroom_percent": 10,  # New budget = projected spend + 10%
+    "max_intraday_increase_percent": 50,  # At most +50% over the day's starting budget
+    "max_daily_budget": RULES["max_daily_budget"],
+}
+
+DEFAULT_PACING_PATH = "pacing_profiles.sqlite"
+DEFAULT_PROFILE_DAYS = 28
+DEFAULT_PROFILE_MAX_AGE_HOURS = 24
+
+# Google Ads cost data trails real time; today's rows describe spend up to about this long ago
+DEFAULT_REPORTING_LAG_MINUTES = 30
+
+# Account-profile spend (in dollars) blended into every campaign profile, so
+# campaigns with little history follow the account's daily curve
+PROFILE_PRIOR_SPEND = 50.0
+
+HOURS = 24
+
+_BUDGET_FIELDS = [
+    ("campaign_id", "campaign.id", "int"),
+    ("campaign_name", "campaign.name", "str"),
+    ("budget_resource_name", "campaign_budget.resource_name", "str"),
+    ("budget_micros", "campaign_budget.amount_micros", "int"),
+    ("budget_shared", "campaign_budget.explicitly_shared", "bool"),
+    ("hour", "segments.hour", "int"),
+    ("cost_micros", "metrics.cost_micros", "int"),
+]
+
+_PROFILE_FIELDS = _BUDGET_FIELDS + [("conversion_value", "metrics.conversions_value", "float")]
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS hourly_profiles (
+        customer_id TEXT NOT NULL,
+        campaign_id INTEGER NOT NULL,
+        campaign_name TEXT,
+        budget_resource_name TEXT,
+        budget_micros INTEGER,
+        budget_shared INTEGER,
+        cost_micros INTEGER,
+        conversion_value REAL,
+        hour_costs BLOB NOT NULL,
+        PRIMARY KEY (customer_id, campaign_id)
+    );
+    CREATE TABLE IF NOT EXISTS profile_accounts (
+        customer_id TEXT PRIMARY KEY,
+        time_zone TEXT,
+        history_days INTEGER,
+        fetched_at TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS base_budgets (
+        customer_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        budget_resource_name TEXT NOT NULL,
+        amount_micros INTEGER NOT NULL,
+        PRIMARY KEY (customer_id, date, budget_resource_name)
+    );
+"""
+
+_CAMPAIGN_COLUMNS = (
+    "campaign_id",
+    "campaign_name",
+    "budget_resource_name",
+    "budget_micros",
+    "budget_shared",
+    "cost_micros",
+    "conversion_value",
+)
+
+
+class HourlyProfiles:
+    """
+    Historical spend by hour of day for the campaigns of one account.
+
+    Args:
+        campaigns: DataFrame with one row per campaign (_CAMPAIGN_COLUMNS),
+            sorted by campaign_id
+        hour_costs: (campaigns x 24) float64 array of cost micros by hour
+        time_zone: Account time zone (segments.hour is in account time)
+        fetched_at: When the history was fetched
+    """
+
+    def __init__(self, campaigns, hour_costs, time_zone, fetched_at):
+        self.campaigns = campaigns
+        self.hour_costs = hour_costs
+        self.time_zone = time_zone
+        self.fetched_at = fetched_at
+
+        account = hour_costs.sum(axis=0)
+        self.account_share = account / account.sum() if account.sum() > 0 else np.full(HOURS, 1 / HOURS)
+
+        # Each campaign's share of daily spend per hour, shrunk towards the account curve
+        prior = PROFILE_PRIOR_SPEND * 1_000_000
+        totals = hour_costs.sum(axis=1)
+        self.shares = (hour_costs + prior * self.account_share) / (totals + prior)[:, None]
+
+    def __len__(self):
+        return len(self.campaigns)
+
+    def shares_for(self, campaign_ids):
+        """Hourly shares for campaign_ids; campaigns without history follow the account curve."""
+        ids = self.campaigns["campaign_id"].to_numpy()
+        positions = np.searchsorted(ids, campaign_ids)
+        positions = np.minimum(positions, max(len(ids) - 1, 0))
+        found = ids[positions] == campaign_ids if len(ids) else np.zeros(len(campaign_ids), dtype=bool)
+
+        shares = np.tile(self.account_share, (len(campaign_ids), 1))
+        shares[found] = self.shares[positions[found]]
+        return shares
+
+
+def _read_columns(client, customer_id, query, fields):
+    """Stream a query into typed columns (see typed_columns), keyed by column name."""
+    ga_service = client.get_service("GoogleAdsService")
+    return read_columns(ga_service, customer_id, query, fields).to_columns()
+
+
+def _campaign_hours(columns):
+    """
+    Fold (campaign, hour) rows into one row per campaign and a campaigns x 24 cost matrix.
+
+    Returns:
+        tuple: (campaign DataFrame sorted by campaign_id, hour cost matrix)
+    """
+    import pandas as pd
+
+    campaign_ids, first, inverse = np.unique(columns["campaign_id"], return_index=True, return_inverse=True)
+    n = len(campaign_ids)
+    cost = columns["cost_micros"].astype(np.float64)
+    hour_costs = np.bincount(inverse * HOURS + columns["hour"], weights=cost, minlength=n * HOURS).reshape(n, HOURS)
+
+    value = columns.get("conversion_value")
+    campaigns = pd.DataFrame(
+        {
+            "campaign_id": campaign_ids,
+            "campaign_name": [columns["campaign_name"][i] for i in first],
+            "budget_resource_name": [columns["budget_resource_name"][i] for i in first],
+            "budget_micros": columns["budget_micros"][first],
+            "budget_shared": columns["budget_shared"][first],
+            "cost_micros": hour_costs.sum(axis=1).astype(np.int64),
+            "conversion_value": np.bincount(inverse, weights=value, minlength=n) if value is not None else 0.0,
+        }
+    )
+    return campaigns, hour_costs
+
+
+def get_account_time_zone(client, customer_id):
+    """Time zone of an account (segments.hour and DURING TODAY use it)."""
+    ga_service = client.get_service("GoogleAdsService")
+    for row in ga_service.search(customer_id=customer_id, query="SELECT customer.time_zone FROM customer"):
+        return row.customer.time_zone
+    return None
+
+
+def fetch_hourly_profiles(client, customer_id, days=DEFAULT_PROFILE_DAYS, end_date=None):
+    """
+    Fetch the hourly spend profiles of an account's enabled campaigns.
+
+    Without segments.date in the SELECT, the API sums the date range, so the
+    query returns at most one row per campaign and hour.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        days: Days of history (ending yesterday)
+        end_date: Last day of history (default: yesterday)
+
+    Returns:
+        HourlyProfiles: Profiles of the account
+    """
+    end_date = end_date or date.today() - timedelta(days=1)
+    start_date = end_date - timedelta(days=days - 1)
+
+    query = f"""
+        SELECT
+            {', '.join(field for _, field, _ in _PROFILE_FIELDS)}
+        FROM campaign
+        WHERE campaign.status = 'ENABLED'
+            AND segments.date BETWEEN '{start_date.isoformat()}' AND '{end_date.isoformat()}'
+    """
+    campaigns, hour_costs = _campaign_hours(_read_columns(client, customer_id, query, _PROFILE_FIELDS))
+    time_zone = get_account_time_zone(client, customer_id)
+
+    logger.info(f"Fetched hourly profiles for {len(campaigns)} campaigns of customer {customer_id} ({days} days)")
+    return HourlyProfiles(campaigns, hour_costs, time_zone, datetime.now())
+
+
+def fetch_today_hourly(client, customer_id):
+    """
+    Fetch today's spend by hour for an account's enabled campaigns.
+
+    Returns:
+        tuple: (campaign DataFrame sorted by campaign_id, campaigns x 24 cost matrix)
+    """
+    query = f"""
+        SELECT
+            {', '.join(field for _, field, _ in _BUDGET_FIELDS)}
+        FROM campaign
+        WHERE campaign.status = 'ENABLED'
+            AND segments.date DURING TODAY
+    """
+    return _campaign_hours(_read_columns(client, customer_id, query, _BUDGET_FIELDS))
+
+
+class ProfileStore:
+    """
+    SQLite store of hourly profiles and each day's starting budgets.
+
+    Profiles are also kept in memory, so a long-running process (see
+    scheduler_daemon) reads the file at most once per account and refresh.
+
+    Args:
+        path: SQLite file
+        days: Days of history per profile
+        max_age_hours: Refetch profiles older than this (and every new day)
+    """
+
+    def __init__(self, path=DEFAULT_PACING_PATH, days=DEFAULT_PROFILE_DAYS, max_age_hours=DEFAULT_PROFILE_MAX_AGE_HOURS):
+        self.path = path
+        self.days = days
+        self.max_age_hours = max_age_hours
+        self._lock = threading.Lock()
+        self._profiles = {}
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        """Open a connection for one transaction; SQLite access is serialized across threads."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _is_fresh(self, profiles, now):
+        return profiles.fetched_at.date() == now.date() and now - profiles.fetched_at < timedelta(hours=self.max_age_hours)
+
+    def save(self, customer_id, profiles):
+        """Replace the stored profiles of an account."""
+        campaigns = profiles.campaigns
+        records = [
+            (str(customer_id), *values, costs.tobytes())
+            for values, costs in zip(
+                campaigns[list(_CAMPAIGN_COLUMNS)].itertuples(index=False, name=None), profiles.hour_costs
+            )
+        ]
+
+        with self._connection() as conn:
+            conn.execute("DELETE FROM hourly_profiles WHERE customer_id = ?", (str(customer_id),))
+            conn.executemany(
+                f"INSERT INTO hourly_profiles (customer_id, {', '.join(_CAMPAIGN_COLUMNS)}, hour_costs) "
+                f"VALUES ({', '.join('?' * (len(_CAMPAIGN_COLUMNS) + 2))})",
+                records,
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO profile_accounts (customer_id, time_zone, history_days, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (str(customer_id), profiles.time_zone, self.days, profiles.fetched_at.isoformat(timespec="seconds")),
+            )
+        self._profiles[str(customer_id)] = profiles
+
+    def load(self, customer_id):
+        """Stored profiles of an account, or None."""
+        import pandas as pd
+
+        with self._connection() as conn:
+            account = conn.execute(
+                "SELECT time_zone, fetched_at FROM profile_accounts WHERE customer_id = ?", (str(customer_id),)
+            ).fetchone()
+            if account is None:
+                return None
+            rows = conn.execute(
+                f"SELECT {', '.join(_CAMPAIGN_COLUMNS)}, hour_costs FROM hourly_profiles "
+                "WHERE customer_id = ? ORDER BY campaign_id",
+                (str(customer_id),),
+            ).fetchall()
+
+        campaigns = pd.DataFrame([row[:-1] for row in rows], columns=list(_CAMPAIGN_COLUMNS))
+        campaigns["budget_shared"] = campaigns["budget_shared"].astype(bool)
+        hour_costs = np.frombuffer(b"".join(row[-1] for row in rows), dtype=np.float64).reshape(len(rows), HOURS)
+        return HourlyProfiles(campaigns, hour_costs, account[0], datetime.fromisoformat(account[1]))
+
+    def get(self, client, customer_id, now=None):
+        """
+        Profiles of an account: from memory, else from the file, else fetched (and stored).
+
+        Args:
+            client: Google Ads client (only used when profiles must be refetched)
+            customer_id: Customer ID
+            now: Override for the current time
+
+        Returns:
+            HourlyProfiles: Profiles fetched today and within max_age_hours
+        """
+        now = now or datetime.now()
+        customer_id = str(customer_id)
+
+        profiles = self._profiles.get(customer_id)
+        if profiles is None or not self._is_fresh(profiles, now):
+            profiles = self.load(customer_id)
+            if profiles is not None:
+                self._profiles[customer_id] = profiles
+
+        if profiles is None or not self._is_fresh(profiles, now):
+            profiles = fetch_hourly_profiles(client, customer_id, days=self.days)
+            self.save(customer_id, profiles)
+
+        return profiles
+
+    def base_budgets(self, customer_id, day, budgets):
+        """
+        Starting budget of the day per budget, recorded the first time each budget is seen that day.
+
+        Args:
+            customer_id: Customer ID
+            day: Account-local date
+            budgets: Dict of budget resource name -> current amount (micros)
+
+        Returns:
+            dict: Budget resource name -> the day's starting amount (micros)
+        """
+        key = (str(customer_id), day.isoformat())
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO base_budgets (customer_id, date, budget_resource_name, amount_micros) "
+                "VALUES (?, ?, ?, ?)",
+                [(*key, name, int(amount)) for name, amount in budgets.items()],
+            )
+            conn.execute("DELETE FROM base_budgets WHERE customer_id = ? AND date < ?", key)
+            rows = conn.execute(
+                "SELECT budget_resource_name, amount_micros FROM base_budgets WHERE customer_id = ? AND date = ?", key
+            )
+            return {name: amount for name, amount in rows if name in budgets}
+
+
+def project_spend(shares, hour_costs, hour, fraction):
+    """
+    Project end-of-day spend by fitting today's cumulative spend curve to each campaign's profile.
+
+    The observed points are the end of every completed hour and the current
+    moment. End-of-day spend is the least-squares scale of the expected
+    cumulative share curve through them, which weights the latest points most.
+
+    Args:
+        shares: (campaigns x 24) expected share of daily spend per hour
+        hour_costs: (campaigns x 24) today's cost by hour so far
+        hour: Current hour of day (account time)
+        fraction: Elapsed fraction of the current hour
+
+    Returns:
+        tuple: (projected end-of-day spend, expected share of daily spend by now)
+    """
+    cumulative_share = np.cumsum(shares, axis=1)
+    cumulative_spend = np.cumsum(hour_costs, axis=1)
+
+    share_before = cumulative_share[:, hour - 1] if hour else np.zeros(len(shares))
+    expected = share_before + fraction * shares[:, hour]
+
+    points_share = np.column_stack([cumulative_share[:, :hour], expected])
+    points_spend = np.column_stack([cumulative_spend[:, :hour], cumulative_spend[:, -1]])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        projected = (points_spend * points_share).sum(axis=1) / (points_share**2).sum(axis=1)
+    return np.nan_to_num(projected), expected
+
+
+def pacing_frame(profiles, today, as_of):
+    """
+    Today's spend, projected spend and history of every campaign.
+
+    Campaigns with history but no spend yet today are included with zero
+    spend (their budget as of the profile fetch).
+
+    Args:
+        profiles: HourlyProfiles of the account
+        today: (campaigns, hour costs) from fetch_today_hourly
+        as_of: Account-local time today's rows describe
+
+    Returns:
+        pandas.DataFrame: campaign_id, campaign_name, budget_resource_name,
+        budget_shared, budget, spent, expected_share, projected,
+        history_cost and history_value (money in dollars)
+    """
+    import pandas as pd
+
+    today_campaigns, today_costs = today
+    history = profiles.campaigns
+    idle = history[~history["campaign_id"].isin(today_campaigns["campaign_id"])]
+
+    campaigns = pd.concat([today_campaigns, idle], ignore_index=True)
+    hour_costs = np.vstack([today_costs, np.zeros((len(idle), HOURS))])
+
+    hour = as_of.hour
+    fraction = (as_of.minute * 60 + as_of.second) / 3600
+    projected, expected = project_spend(profiles.shares_for(campaigns["campaign_id"].to_numpy()), hour_costs, hour, fraction)
+
+    history_cost = dict(zip(history["campaign_id"], history["cost_micros"]))
+    history_value = dict(zip(history["campaign_id"], history["conversion_value"]))
+    ids = campaigns["campaign_id"]
+
+    return pd.DataFrame(
+        {
+            "campaign_id": ids,
+            "campaign_name": campaigns["campaign_name"],
+            "budget_resource_name": campaigns["budget_resource_name"],
+            "budget_shared": campaigns["budget_shared"].astype(bool),
+            "budget": campaigns["budget_micros"] / 1_000_000,
+            "spent": hour_costs.sum(axis=1) / 1_000_000,
+            "expected_share": expected,
+            "projected": projected / 1_000_000,
+            "history_cost": ids.map(history_cost).fillna(0).to_numpy() / 1_000_000,
+            "history_value": ids.map(history_value).fillna(0.0).to_numpy(),
+        }
+    )
+
+
+def evaluate_pacing(frame, rules=None, base_budgets=None, day=None):
+    """
+    Decide budget increases and underspend alerts from projected spend.
+
+    Campaigns sharing a budget are paced together against it; an increase
+    produces one action per campaign, which apply_actions_batched merges into
+    a single budget update.
+
+    Args:
+        frame: DataFrame from pacing_frame
+        rules: Thresholds (default: PACING_RULES)
+        base_budgets: Budget resource name -> the day's starting budget in
+            dollars (default: the current budget)
+        day: Account-local date, for alert deduplication in the ledger
+
+    Returns:
+        list: INCREASE_BUDGET actions (with current_budget, new_budget and
+        budget_resource_name) and ALERT actions, in frame order
+    """
+    import pandas as pd
+
+    rules = {**PACING_RULES, **(rules or {})}
+    if frame.empty:
+        return []
+
+    keys = frame["budget_resource_name"].where(frame["budget_resource_name"] != "", frame["campaign_id"].astype(str))
+    codes, budget_names = pd.factorize(keys)
+    counts = np.bincount(codes)
+
+    def total(column):
+        return np.bincount(codes, weights=frame[column].to_numpy(dtype=np.float64))
+
+    budget = np.bincount(codes, weights=frame["budget"].to_numpy()) / counts
+    projected = total("projected")
+    expected = total("expected_share") / counts
+    history_cost = total("history_cost")
+    history_value = total("history_value")
+
+    base = np.array([(base_budgets or {}).get(name, np.nan) for name in budget_names], dtype=np.float64)
+    base = np.where(np.isnan(base), budget, base)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(budget > 0, projected / budget, np.nan)
+        roas = np.where(history_cost > 0, history_value / history_cost, 0.0)
+
+    ready = (expected >= rules["min_expected_share"]) & (history_cost >= rules["min_history_spend"])
+    cap = np.minimum(base * (1 + rules["max_intraday_increase_percent"] / 100), rules["max_daily_budget"])
+    new_budget = np.round(np.minimum(projected * (1 + rules["budget_headroom_percent"] / 100), cap), 2)
+
+    increase = ready & (ratio >= rules["exhaust_ratio"]) & (roas >= rules["min_roas_for_increase"])
+    increase &= new_budget >= budget + 0.01
+    alert = ready & (ratio < rules["underspend_ratio"])
+
+    day = (day or date.today()).isoformat()
+    campaign_ids = frame["campaign_id"].tolist()
+    campaign_names = frame["campaign_name"].tolist()
+    resource_names = frame["budget_resource_name"].tolist()
+
+    actions = []
+    alerted = set()
+    for i, code in enumerate(codes.tolist()):
+        if not (increase[code] or alert[code]):
+            continue
+
+        pace = f"on pace to spend ${projected[code]:.2f} of ${budget[code]:.2f} ({ratio[code]:.0%})"
+        if counts[code] > 1:
+            pace = f"Shared budget {pace}"
+        else:
+            pace = pace[0].upper() + pace[1:]
+
+        if increase[code]:
+            actions.append(
+                {
+                    "campaign_id": campaign_ids[i],
+                    "campaign_name": campaign_names[i],
+                    "action": "INCREASE_BUDGET",
+                    "reason": f"{pace}, ROAS {roas[code]:.2f}x",
+                    "current_budget": float(budget[code]),
+                    "new_budget": float(new_budget[code]),
+                    "budget_resource_name": resource_names[i],
+                }
+            )
+        elif code not in alerted:
+            alerted.add(code)
+            actions.append(
+                {
+                    "campaign_id": campaign_ids[i],
+                    "campaign_name": campaign_names[i],
+                    "action": "ALERT",
+                    "reason": pace,
+                    "metric": "pacing",
+                    "date": day,
+                }
+            )
+
+    return actions
+
+
+def _account_now(time_zone):
+    """Current time in the account's time zone (naive), or local time if unknown."""
+    if time_zone:
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+        try:
+            return datetime.now(ZoneInfo(time_zone)).replace(tzinfo=None)
+        except ZoneInfoNotFoundError:
+            logger.warning(f"Unknown time zone {time_zone!r}; pacing on local time")
+    return datetime.now()
+
+
+def run_pacing(
+    client,
+    customer_id,
+    store,
+    dry_run=True,
+    rules=None,
+    ledger=None,
+    now=None,
+    lag_minutes=DEFAULT_REPORTING_LAG_MINUTES,
+):
+    """
+    Project today's spend for one account and apply the pacing actions.
+
+    With a ledger, the INCREASE_BUDGET cooldown also covers pacing increases
+    and each underspend alert is sent once per day.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to pace
+        store: ProfileStore with the hourly profiles
+        dry_run: If True, only report actions without applying them
+        rules: Threshold overrides (see PACING_RULES)
+        ledger: Optional ActionLedger
+        now: Override for the current account-local time
+        lag_minutes: How far today's rows trail real time
+
+    Returns:
+        list: Recommended actions
+    """
+    profiles = store.get(client, customer_id)
+    today = fetch_today_hourly(client, customer_id)
+
+    now = now or _account_now(profiles.time_zone)
+    midnight = datetime.combine(now.date(), datetime.min.time())
+    as_of = max(now - timedelta(minutes=lag_minutes), midnight)
+
+    frame = pacing_frame(profiles, today, as_of)
+    budgets = dict(zip(frame["budget_resource_name"], (frame["budget"] * 1_000_000).round().astype(np.int64)))
+    budgets.pop("", None)
+    base = store.base_budgets(customer_id, as_of.date(), budgets)
+
+    actions = evaluate_pacing(
+        frame, rules=rules, base_budgets={name: micros / 1_000_000 for name, micros in base.items()}, day=as_of.date()
+    )
+
+    increases = sum(action["action"] == "INCREASE_BUDGET" for action in actions)
+    logger.info(
+        f"Customer {customer_id}: paced {len(frame)} campaigns at {as_of:%H:%M}, "
+        f"{increases} budget increases, {len(actions) - increases} underspend alerts"
+    )
+
+    apply_actions(client, customer_id, actions, dry_run=dry_run, ledger=ledger)
+    return actions
+
+
+def run_pacing_for_accounts(
+    dry_run=True,
+    customer_ids=None,
+    max_workers=DEFAULT_MAX_WORKERS,
+    client=None,
+    store_path=DEFAULT_PACING_PATH,
+    ledger_path=None,
+    rules=None,
+    store=None,
+):
+    """
+    Pace many accounts with one shared client and profile store.
+
+    Args:
+        dry_run: If True, only report actions without applying them
+        customer_ids: Accounts to pace (default: all child accounts of
+            GOOGLE_ADS_LOGIN_CUSTOMER_ID)
+        max_workers: Maximum number of accounts processed concurrently
+        client: Google Ads client to share (default: a new client)
+        store_path: SQLite profile store file
+        ledger_path: Optional SQLite action ledger shared by all accounts
+        rules: Threshold overrides (see PACING_RULES)
+        store: ProfileStore to reuse across runs (overrides store_path)
+
+    Returns:
+        dict: "actions" (each tagged with customer_id, in account order) and
+        "failed" (customer_id -> error message)
+    """
+    client = client or get_google_ads_client()
+    store = store or ProfileStore(store_path)
+    ledger = ActionLedger(ledger_path) if ledger_path else None
+
+    if customer_ids is None:
+        customer_ids = list_child_accounts(client, get_login_customer_id())
+
+    def run(customer_id):
+        return run_pacing(client, customer_id, store, dry_run=dry_run, rules=rules, ledger=ledger)
+
+    account_actions, failed = map_accounts(run, customer_ids, max_workers)
+
+    actions = []
+    for customer_id in customer_ids:
+        for action in account_actions.get(customer_id, []):
+            actions.append({"customer_id": customer_id, **action})
+
+    logger.info(f"Paced {len(customer_ids) - len(failed)}/{len(customer_ids)} accounts, {len(actions)} actions")
+    return {"actions": actions, "failed": failed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Intraday budget pacing")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry run)")
+    parser.add_argument(
+        "--all-accounts", action="store_true", help="Pace every client account under GOOGLE_ADS_LOGIN_CUSTOMER_ID"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Accounts processed concurrently with --all-accounts"
+    )
+    parser.add_argument("--store", default=DEFAULT_PACING_PATH, metavar="PATH", help="SQLite hourly profile store")
+    parser.add_argument("--ledger", metavar="PATH", help="SQLite action ledger; enforce cooldowns and daily alerts")
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
+    try:
+        run_pacing_for_accounts(
+            dry_run=not args.apply,
+            customer_ids=None if args.all_accounts else [get_customer_id()],
+            max_workers=args.max_workers,
+            store_path=args.store,
+            ledger_path=args.ledger,
+        )
+    except GoogleAdsException as ex:
+        handle_google_ads_exception(ex)
+    except Exception as e:
+        logger.error(f"Error: {e}")
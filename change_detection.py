@@ -0,0 +1,218 @@
+"""
+Campaign Change Detection
+Empire Amplify - Automation Rules
+
+Incremental (diff) evaluation for frequent scheduled runs:
+- Every campaign row is hashed over the columns rules can read
+- Campaigns whose hash matches the previous snapshot keep their previous
+  decision (an action or none) without being evaluated again
+- Only changed and new campaigns go through evaluate_campaigns
+
+Snapshots live in a local SQLite file keyed by customer. They also record
+the rule set they were made with, so editing the rules re-evaluates every
+campaign on the next run.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from loguru import logger
+
+DEFAULT_SNAPSHOT_PATH = "campaign_snapshots.sqlite"
+
+# Columns that rules and actions read; a change in any of them re-evaluates the campaign
+HASH_COLUMNS = [
+    "campaign_name",
+    "status",
+    "daily_budget",
+    "impressions",
+    "clicks",
+    "cost",
+    "conversions",
+    "conversion_value",
+    "ctr",
+]
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS campaign_snapshots (
+        customer_id TEXT NOT NULL,
+        campaign_id TEXT NOT NULL,
+        row_hash INTEGER NOT NULL,
+        rules_key TEXT NOT NULL,
+        action TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (customer_id, campaign_id)
+    );
+"""
+
+
+def row_hashes(df, columns=None):
+    """
+    Hash each campaign row over the given columns.
+
+    Args:
+        df: DataFrame from list_campaigns
+        columns: Columns to hash (default: the HASH_COLUMNS present in df)
+
+    Returns:
+        numpy.ndarray: One int64 hash per row
+    """
+    import pandas as pd
+
+    columns = [column for column in (columns or HASH_COLUMNS) if column in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy().view("int64")
+
+
+def rules_key(definition):
+    """Fingerprint of a rule set definition."""
+    return hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CampaignSnapshots:
+    """
+    SQLite store of per-campaign row hashes and the decision made for each.
+
+    The latest snapshot of each account is also kept in memory, so a
+    long-running process (see scheduler_daemon) only reads the file once.
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._latest = {}
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        """Open a connection for one transaction; SQLite access is serialized across threads."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def load(self, customer_id, key):
+        """
+        Load the previous snapshot of an account made with the same rule set.
+
+        Returns:
+            tuple: (campaign IDs, int64 row hashes, action dict or None per
+            campaign); empty if there is no snapshot or the rules changed since
+        """
+        import numpy as np
+
+        latest = self._latest.get(str(customer_id))
+        if latest is not None and latest[0] == key:
+            return latest[1:]
+
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT campaign_id, row_hash, action FROM campaign_snapshots WHERE customer_id = ? AND rules_key = ?",
+                (str(customer_id), key),
+            ).fetchall()
+
+        if not rows:
+            return [], np.empty(0, dtype="int64"), np.empty(0, dtype=object)
+
+        campaign_ids, hashes, actions = zip(*rows)
+        # One parse for the whole snapshot instead of one per campaign
+        decoded = np.empty(len(actions), dtype=object)
+        decoded[:] = json.loads(f"[{','.join(action or 'null' for action in actions)}]")
+        return list(campaign_ids), np.array(hashes, dtype="int64"), decoded
+
+    def save(self, customer_id, key, rows, removed=(), replace=False):
+        """
+        Write changed campaigns to an account's snapshot.
+
+        Args:
+            customer_id: Customer ID the snapshot belongs to
+            key: rules_key() of the rule set the decisions were made with
+            rows: (campaign_id, row hash, action dict or None) per changed or
+                new campaign
+            removed: Campaign IDs no longer in the account
+            replace: Drop the whole previous snapshot first (e.g. the rules changed)
+        """
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        customer = str(customer_id)
+
+        with self._connection() as conn:
+            if replace:
+                conn.execute("DELETE FROM campaign_snapshots WHERE customer_id = ?", (customer,))
+            elif removed:
+                conn.executemany(
+                    "DELETE FROM campaign_snapshots WHERE customer_id = ? AND campaign_id = ?",
+                    [(customer, campaign_id) for campaign_id in removed],
+                )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO campaign_snapshots
+                    (customer_id, campaign_id, row_hash, rules_key, action, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (customer, campaign_id, row_hash, key, json.dumps(action, default=str) if action else None, updated_at)
+                    for campaign_id, row_hash, action in rows
+                ],
+            )
+
+    def evaluate_changed(self, customer_id, df, evaluate, definition):
+        """
+        Evaluate only campaigns that changed since the previous snapshot.
+
+        Args:
+            customer_id: Customer ID the frame belongs to
+            df: DataFrame from list_campaigns
+            evaluate: Callable taking a frame and returning actions (e.g.
+                evaluate_campaigns with the rule set bound)
+            definition: Rule set the decisions are made with
+
+        Returns:
+            tuple: (actions for changed and new campaigns, previous actions
+            reused for unchanged campaigns)
+        """
+        import numpy as np
+        import pandas as pd
+
+        key = rules_key(definition)
+        campaign_ids = df["campaign_id"].astype(str).to_numpy(dtype=object)
+        hashes = row_hashes(df)
+        previous_ids, previous_hashes, previous_actions = self.load(customer_id, key)
+
+        positions = pd.Index(previous_ids, dtype=object).get_indexer(campaign_ids)
+        changed = positions < 0
+        if previous_ids:
+            changed |= previous_hashes[np.maximum(positions, 0)] != hashes
+
+        actions = evaluate(df[changed]) if changed.any() else []
+
+        decisions = np.empty(len(df), dtype=object)
+        decisions[~changed] = previous_actions[positions[~changed]]
+        by_campaign = {str(action["campaign_id"]): action for action in actions}
+        changed_ids = campaign_ids[changed]
+        decisions[changed] = [by_campaign.get(campaign_id) for campaign_id in changed_ids]
+
+        reused = [dict(action) for action in decisions[~changed] if action]
+
+        removed = set(previous_ids) - set(campaign_ids) if previous_ids else ()
+        self.save(
+            customer_id,
+            key,
+            zip(changed_ids.tolist(), hashes[changed].tolist(), decisions[changed].tolist()),
+            removed=removed,
+            replace=not previous_ids,
+        )
+        self._latest[str(customer_id)] = (key, campaign_ids.tolist(), hashes, decisions)
+
+        logger.info(
+            f"Customer {customer_id}: {int(changed.sum())} changed or new campaigns evaluated, "
+            f"{int((~changed).sum())} unchanged ({len(reused)} previous actions reused)"
+        )
+        return actions, reused
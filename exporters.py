@@ -0,0 +1,312 @@
+"""
+Report Exports
+Empire Amplify - Campaign Management
+
+Streams campaign reports and rule-action audit logs to disk:
+- XLSX via xlsxwriter in constant_memory mode (rows are flushed as written)
+- gzip CSV
+- Parquet (requires pyarrow)
+
+Exporters accept DataFrame chunks straight from the fetch path, so only one
+chunk is held in memory at a time. Campaign exports add a summary sheet (or
+a sibling summary CSV) built from get_campaign_performance_summary.
+"""
+
+import csv
+import gzip
+import os
+
+from loguru import logger
+
+from list_campaigns import (
+    DEFAULT_CHUNK_SIZE,
+    get_campaign_performance_summary,
+    iter_campaign_chunks,
+    merge_performance_summaries,
+)
+
+# Excel's hard limit per worksheet; longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1_048_576
+
+CURRENCY_COLUMNS = ("daily_budget", "current_budget", "new_budget", "cost", "avg_cpc", "cpa", "total_spend")
+PERCENT_COLUMNS = ("ctr", "avg_ctr", "overall_ctr")
+INTEGER_COLUMNS = ("impressions", "clicks", "total_campaigns", "active_campaigns", "total_clicks", "total_impressions")
+
+
+def _python_rows(chunk):
+    """Yield rows as plain Python values, with missing values as None."""
+    values = chunk.astype(object).where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+class XlsxExporter:
+    """
+    XLSX writer in constant_memory mode.
+
+    Args:
+        path: Output .xlsx path
+        sheet_name: Name of the data sheet(s)
+        summary_sheet: Name of the summary sheet (created first so it is the first tab)
+    """
+
+    def __init__(self, path, sheet_name="Campaigns", summary_sheet="Summary"):
+        import xlsxwriter
+
+        self.path = path
+        self.sheet_name = sheet_name
+        self.rows = 0
+
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.formats = {
+            "header": self.workbook.add_format({"bold": True, "bg_color": "#D9E1F2", "border": 1}),
+            "currency": self.workbook.add_format({"num_format": "#,##0.00"}),
+            "percent": self.workbook.add_format({"num_format": '0.00"%"'}),
+            "integer": self.workbook.add_format({"num_format": "#,##0"}),
+        }
+
+        self.summary_sheet = self.workbook.add_worksheet(summary_sheet) if summary_sheet else None
+        self.columns = None
+        self.sheet = None
+        self.sheet_count = 0
+        self.sheet_row = 0
+
+    def _column_format(self, column):
+        if column in CURRENCY_COLUMNS:
+            return self.formats["currency"]
+        if column in PERCENT_COLUMNS:
+            return self.formats["percent"]
+        if column in INTEGER_COLUMNS:
+            return self.formats["integer"]
+        return None
+
+    def _new_sheet(self):
+        self.sheet_count += 1
+        name = self.sheet_name if self.sheet_count == 1 else f"{self.sheet_name} {self.sheet_count}"
+        self.sheet = self.workbook.add_worksheet(name)
+
+        for index, column in enumerate(self.columns):
+            self.sheet.set_column(index, index, max(12, len(column) + 2), self._column_format(column))
+        self.sheet.write_row(0, 0, self.columns, self.formats["header"])
+        self.sheet.freeze_panes(1, 0)
+        self.sheet_row = 1
+
+    def write_chunk(self, chunk):
+        """Append a DataFrame chunk; rows are flushed to disk as they are written."""
+        if self.columns is None:
+            self.columns = [str(column) for column in chunk.columns]
+        if chunk.empty:
+            return
+
+        if self.sheet is None:
+            self._new_sheet()
+
+        for row in _python_rows(chunk):
+            if self.sheet_row >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.write_row(self.sheet_row, 0, row)
+            self.sheet_row += 1
+
+        self.rows += len(chunk)
+
+    def write_summary(self, summary):
+        """Write a summary dict as a formatted two-column sheet."""
+        if self.summary_sheet is None:
+            return
+
+        sheet = self.summary_sheet
+        sheet.set_column(0, 0, 24)
+        sheet.set_column(1, 1, 16)
+        sheet.write_row(0, 0, ["Metric", "Value"], self.formats["header"])
+
+        for index, (key, value) in enumerate(summary.items(), start=1):
+            sheet.write(index, 0, key)
+            sheet.write(index, 1, value, self._column_format(key))
+
+    def close(self):
+        if self.sheet is None and self.columns:
+            self._new_sheet()
+        self.workbook.close()
+
+
+class CsvExporter:
+    """
+    CSV writer, gzip-compressed when the path ends in .gz.
+
+    Args:
+        path: Output .csv or .csv.gz path
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.columns = None
+        self._file = gzip.open(path, "wt", newline="") if path.endswith(".gz") else open(path, "w", newline="")
+
+    def write_chunk(self, chunk):
+        """Append a DataFrame chunk."""
+        chunk.to_csv(self._file, header=self.columns is None, index=False)
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        self.rows += len(chunk)
+
+    def write_summary(self, summary):
+        """Write the summary to a sibling <name>.summary.csv file."""
+        write_summary_csv(_summary_path(self.path), summary)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetExporter:
+    """
+    Parquet writer; each chunk becomes one row group.
+
+    Args:
+        path: Output .parquet path
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+        self.path = path
+        self.rows = 0
+        self.columns = None
+        self._writer = None
+
+    def write_chunk(self, chunk):
+        """Append a DataFrame chunk as a row group."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression="snappy")
+            self.columns = list(chunk.columns)
+        else:
+            table = pa.Table.from_pandas(chunk, schema=self._writer.schema, preserve_index=False)
+
+        self._writer.write_table(table)
+        self.rows += len(chunk)
+
+    def write_summary(self, summary):
+        """Write the summary to a sibling <name>.summary.csv file."""
+        write_summary_csv(_summary_path(self.path), summary)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _summary_path(path):
+    for suffix in (".csv.gz", ".csv", ".parquet"):
+        if path.endswith(suffix):
+            return path[: -len(suffix)] + ".summary.csv"
+    return path + ".summary.csv"
+
+
+def write_summary_csv(path, summary):
+    """Write a summary dict as metric,value rows."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["metric", "value"])
+        for key, value in summary.items():
+            writer.writerow([key, value])
+
+
+def get_exporter(path, sheet_name="Campaigns", summary=True):
+    """
+    Pick an exporter from the file extension.
+
+    Args:
+        path: .xlsx, .csv, .csv.gz or .parquet output path
+        sheet_name: Data sheet name (XLSX only)
+        summary: Whether the XLSX gets a summary sheet
+
+    Returns:
+        Exporter with write_chunk, write_summary and close
+    """
+    if path.endswith(".xlsx"):
+        return XlsxExporter(path, sheet_name=sheet_name, summary_sheet="Summary" if summary else None)
+    if path.endswith((".csv", ".csv.gz")):
+        return CsvExporter(path)
+    if path.endswith(".parquet"):
+        return ParquetExporter(path)
+    raise ValueError(f"Unsupported export format: {os.path.basename(path)}")
+
+
+def export_frames(path, chunks, summary=True, sheet_name="Campaigns"):
+    """
+    Stream DataFrame chunks to a file.
+
+    Args:
+        path: Output path (format from the extension)
+        chunks: Iterable of DataFrames with the same columns
+        summary: Add a campaign performance summary, merged across chunks
+        sheet_name: Data sheet name (XLSX only)
+
+    Returns:
+        int: Number of rows written
+    """
+    exporter = get_exporter(path, sheet_name=sheet_name, summary=summary)
+    summaries = []
+
+    try:
+        for chunk in chunks:
+            exporter.write_chunk(chunk)
+            if summary and not chunk.empty:
+                summaries.append(get_campaign_performance_summary(chunk))
+
+        if summary:
+            exporter.write_summary(merge_performance_summaries(summaries))
+    finally:
+        exporter.close()
+
+    logger.info(f"Exported {exporter.rows} rows to {path}")
+    return exporter.rows
+
+
+def export_campaign_report(client, customer_id, path, days_back=30, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Export campaigns with metrics straight from search_stream.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        path: Output path (.xlsx, .csv, .csv.gz or .parquet)
+        days_back: Number of days to look back for metrics
+        chunk_size: Rows held in memory at a time
+
+    Returns:
+        int: Number of rows written
+    """
+    chunks = iter_campaign_chunks(client, customer_id, include_metrics=True, days_back=days_back, chunk_size=chunk_size)
+    return export_frames(path, chunks, summary=True, sheet_name="Campaigns")
+
+
+def export_action_log(path, actions, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Export a rule-action audit log.
+
+    Args:
+        path: Output path (.xlsx, .csv, .csv.gz or .parquet)
+        actions: Action dicts from evaluate_campaigns or apply_actions
+        chunk_size: Actions converted to a DataFrame at a time
+
+    Returns:
+        int: Number of rows written
+    """
+    import pandas as pd
+
+    # Action types carry different fields; every chunk gets the full column set
+    columns = list(dict.fromkeys(key for action in actions for key in action))
+
+    def chunks():
+        for start in range(0, len(actions), chunk_size):
+            end = start + chunk_size
+            yield pd.DataFrame(actions[start:end], columns=columns)
+
+    return export_frames(path, chunks(), summary=False, sheet_name="Actions")
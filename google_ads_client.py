@@ -6,17 +6,24 @@ This module provides a centralized client for interacting with the Google Ads AP
 """
 
 import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from google.ads.googleads.client import GoogleAdsClient
-from google.ads.googleads.errors import GoogleAdsException
 from loguru import logger
 
+from instrumentation import get_metrics, instrument_results
+
+if TYPE_CHECKING:
+    from google.ads.googleads.errors import GoogleAdsException
+
 # Load environment variables
 load_dotenv()
 
 
-def get_google_ads_client():
+def get_google_ads_client(governed=True):
     """
     Initialize and return a Google Ads API client.
 
@@ -27,14 +34,22 @@ def get_google_ads_client():
     - GOOGLE_ADS_CLIENT_SECRET
     - GOOGLE_ADS_REFRESH_TOKEN
 
+    Args:
+        governed: Route search and mutate calls through the shared
+            RequestGovernor (rate limiting and retries)
+
     Returns:
         GoogleAdsClient: Configured client instance
     """
+    from google.ads.googleads.client import GoogleAdsClient
+
     config_path = os.getenv("GOOGLE_ADS_CONFIG_PATH")
 
     if config_path and os.path.exists(config_path):
         logger.info(f"Loading Google Ads config from: {config_path}")
-        return GoogleAdsClient.load_from_storage(config_path)
+        with get_metrics().span("client_init"):
+            client = GoogleAdsClient.load_from_storage(config_path)
+        return GovernedClient(client, get_request_governor(client.developer_token)) if governed else client
 
     # Build config from environment variables
     credentials = {
@@ -47,7 +62,281 @@ def get_google_ads_client():
     }
 
     logger.info("Initializing Google Ads client from environment variables")
-    return GoogleAdsClient.load_from_dict(credentials)
+    with get_metrics().span("client_init"):
+        client = GoogleAdsClient.load_from_dict(credentials)
+    return GovernedClient(client, get_request_governor(client.developer_token)) if governed else client
+
+
+class CachedServiceClient:
+    """
+    Wrap a GoogleAdsClient so service stubs are created once and reused.
+
+    Every other attribute (get_type, enums, ...) is delegated to the wrapped
+    client, so it can be passed anywhere a GoogleAdsClient is expected.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def get_service(self, name, version=None):
+        key = (name, version)
+        with self._lock:
+            if key not in self._services:
+                if version:
+                    self._services[key] = self._client.get_service(name, version=version)
+                else:
+                    self._services[key] = self._client.get_service(name)
+            return self._services[key]
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# Request governance: token buckets per developer token and per customer
+DEFAULT_DEVELOPER_QPS = float(os.getenv("GOOGLE_ADS_DEVELOPER_QPS", "20"))
+DEFAULT_CUSTOMER_QPS = float(os.getenv("GOOGLE_ADS_CUSTOMER_QPS", "5"))
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_CAP = 60.0
+
+# Google Ads error codes worth retrying, by error_code field
+RETRYABLE_ERROR_CODES = {
+    "quota_error": {"RESOURCE_EXHAUSTED", "RESOURCE_TEMPORARILY_EXHAUSTED"},
+    "internal_error": {"INTERNAL_ERROR", "TRANSIENT_ERROR", "DEADLINE_EXCEEDED"},
+}
+RETRYABLE_GRPC_CODES = {"UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "RESOURCE_EXHAUSTED"}
+
+# Service methods that are routed through the governor
+GOVERNED_METHODS = ("search", "search_stream")
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate * 2)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold every caller of this bucket for at least the given time (e.g. after a quota error)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
+
+    def acquire(self, tokens=1.0):
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+
+            self._sleep(wait)
+
+
+def is_retryable_exception(ex):
+    """Return True if a GoogleAdsException is a quota or transient server error."""
+    for error in getattr(getattr(ex, "failure", None), "errors", []):
+        for field, names in RETRYABLE_ERROR_CODES.items():
+            value = getattr(error.error_code, field, None)
+            if getattr(value, "name", None) in names:
+                return True
+
+    code = getattr(getattr(ex, "error", None), "code", None)
+    if callable(code):
+        return getattr(code(), "name", None) in RETRYABLE_GRPC_CODES
+
+    return False
+
+
+def get_retry_after(ex):
+    """Return the server-requested retry delay in seconds, if the error carries one."""
+    delays = []
+    for error in getattr(getattr(ex, "failure", None), "errors", []):
+        details = getattr(error, "details", None)
+        quota_details = getattr(details, "quota_error_details", None)
+        retry_delay = getattr(quota_details, "retry_delay", None)
+
+        if hasattr(retry_delay, "total_seconds"):
+            delays.append(retry_delay.total_seconds())
+        elif retry_delay is not None:
+            delays.append(getattr(retry_delay, "seconds", 0) + getattr(retry_delay, "nanos", 0) / 1e9)
+
+    delays = [delay for delay in delays if delay > 0]
+    return max(delays) if delays else None
+
+
+class RequestGovernor:
+    """
+    Rate limiting and retry policy shared by every call for one developer token.
+
+    Each call takes a token from the developer-token bucket and from its
+    customer's bucket. Retryable errors are retried with jittered
+    exponential backoff; quota errors also pause the customer's bucket for
+    the server's retry delay so other threads back off too.
+    """
+
+    def __init__(
+        self,
+        developer_qps=DEFAULT_DEVELOPER_QPS,
+        customer_qps=DEFAULT_CUSTOMER_QPS,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_base=DEFAULT_BACKOFF_BASE,
+        backoff_cap=DEFAULT_BACKOFF_CAP,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.customer_qps = customer_qps
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._clock = clock
+        self._sleep = sleep
+
+        self.developer_bucket = TokenBucket(developer_qps, clock=clock, sleep=sleep)
+        self._customer_buckets = {}
+        self._lock = threading.Lock()
+
+    def customer_bucket(self, customer_id):
+        with self._lock:
+            if customer_id not in self._customer_buckets:
+                self._customer_buckets[customer_id] = TokenBucket(self.customer_qps, clock=self._clock, sleep=self._sleep)
+            return self._customer_buckets[customer_id]
+
+    def _acquire(self, customer_id):
+        self.customer_bucket(customer_id).acquire()
+        self.developer_bucket.acquire()
+
+    def _backoff(self, customer_id, attempt, ex):
+        retry_after = get_retry_after(ex)
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+        if retry_after:
+            # The next acquire() waits out the pause; the jitter keeps retries from lining up
+            self.customer_bucket(customer_id).pause(retry_after)
+
+        logger.warning(
+            f"Retryable Google Ads error for customer {customer_id} (request_id={getattr(ex, 'request_id', None)}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay + (retry_after or 0):.1f}s"
+        )
+        self._sleep(delay)
+
+    def call(self, customer_id, func, /, *args, **kwargs):
+        """Call func under the rate limits, retrying retryable GoogleAdsExceptions."""
+        from google.ads.googleads.errors import GoogleAdsException
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(customer_id)
+            try:
+                return func(*args, **kwargs)
+            except GoogleAdsException as ex:
+                if attempt >= self.max_retries or not is_retryable_exception(ex):
+                    raise
+                self._backoff(customer_id, attempt, ex)
+
+    def iterate(self, customer_id, func, /, *args, **kwargs):
+        """
+        Iterate a search/search_stream result under the rate limits.
+
+        Failures before the first item are retried; once items have been
+        yielded the error is raised, since a partial stream cannot be resumed.
+        """
+        from google.ads.googleads.errors import GoogleAdsException
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(customer_id)
+            yielded = False
+            try:
+                for item in func(*args, **kwargs):
+                    yielded = True
+                    yield item
+                return
+            except GoogleAdsException as ex:
+                if yielded or attempt >= self.max_retries or not is_retryable_exception(ex):
+                    raise
+                self._backoff(customer_id, attempt, ex)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_request_governor(developer_token=None):
+    """Return the process-wide RequestGovernor for a developer token."""
+    with _governors_lock:
+        if developer_token not in _governors:
+            _governors[developer_token] = RequestGovernor()
+        return _governors[developer_token]
+
+
+class _GovernedService:
+    """
+    Service proxy that sends search and mutate calls through a RequestGovernor.
+
+    Calls, pages, rows and bytes are recorded per customer (see instrumentation).
+    """
+
+    def __init__(self, service, governor):
+        self._service = service
+        self._governor = governor
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+
+        if not callable(attr) or not (name in GOVERNED_METHODS or name.startswith("mutate")):
+            return attr
+
+        governor = self._governor
+        iterate = name in GOVERNED_METHODS
+        metrics = get_metrics()
+
+        def governed(*args, **kwargs):
+            request = kwargs.get("request")
+            customer_id = kwargs.get("customer_id") or getattr(request, "customer_id", None)
+            metrics.increment("api_calls", customer_id=customer_id, method=name)
+            if iterate:
+                return instrument_results(metrics, customer_id, name, governor.iterate(customer_id, attr, *args, **kwargs))
+            with metrics.span("api_call", customer_id=customer_id, method=name):
+                return governor.call(customer_id, attr, *args, **kwargs)
+
+        return governed
+
+
+class GovernedClient:
+    """
+    Wrap a GoogleAdsClient so every search and mutate goes through a RequestGovernor.
+
+    Every other attribute is delegated to the wrapped client.
+    """
+
+    def __init__(self, client, governor=None):
+        self._client = client
+        self.governor = governor or get_request_governor(getattr(client, "developer_token", None))
+
+    def get_service(self, name, version=None):
+        if version:
+            service = self._client.get_service(name, version=version)
+        else:
+            service = self._client.get_service(name)
+        return _GovernedService(service, self.governor)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
 
 
 def get_customer_id():
@@ -58,7 +347,47 @@ def get_customer_id():
     return customer_id.replace("-", "")
 
 
-def handle_google_ads_exception(ex: GoogleAdsException):
+def get_login_customer_id():
+    """Get the manager (MCC) login customer ID from environment."""
+    login_customer_id = os.getenv("GOOGLE_ADS_LOGIN_CUSTOMER_ID")
+    if not login_customer_id:
+        raise ValueError("GOOGLE_ADS_LOGIN_CUSTOMER_ID not set in environment")
+    return login_customer_id.replace("-", "")
+
+
+def list_child_accounts(client, login_customer_id):
+    """
+    List the enabled, non-manager client accounts under a manager account.
+
+    Args:
+        client: Google Ads client
+        login_customer_id: Manager (MCC) customer ID
+
+    Returns:
+        list: Customer IDs (as strings) of the child accounts
+    """
+    ga_service = client.get_service("GoogleAdsService")
+
+    query = """
+        SELECT
+            customer_client.id,
+            customer_client.descriptive_name,
+            customer_client.manager,
+            customer_client.status
+        FROM customer_client
+        WHERE customer_client.manager = FALSE
+            AND customer_client.status = 'ENABLED'
+    """
+
+    customer_ids = []
+    for row in ga_service.search(customer_id=login_customer_id, query=query):
+        customer_ids.append(str(row.customer_client.id))
+
+    logger.info(f"Found {len(customer_ids)} client accounts under {login_customer_id}")
+    return customer_ids
+
+
+def handle_google_ads_exception(ex: "GoogleAdsException"):
     """
     Handle and log Google Ads API exceptions.
 
@@ -0,0 +1,248 @@
+"""
+Run Instrumentation
+Empire Amplify - Monitoring
+
+Timing spans and counters for fetch, evaluate, apply and notify:
+- Spans time client setup, every API call and result page, DataFrame
+  construction, rule evaluation and notifications
+- Counters track API calls, rows and response bytes per customer
+- Metrics are exported in the Prometheus text format, either as a file
+  (node_exporter textfile collector) or from a local HTTP endpoint
+- profile_run() writes a cProfile (or pyinstrument) profile of a run
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from loguru import logger
+
+METRIC_PREFIX = "amplify"
+
+_HELP = {
+    "client_init": "Google Ads client initialization",
+    "api_call": "Google Ads API call (search streams until the last page)",
+    "api_page": "Wait for one search/search_stream result page",
+    "frame_build": "DataFrame construction from fetched rows",
+    "evaluate": "Rule evaluation",
+    "notification": "Notification webhook post",
+    "job": "Scheduled daemon job",
+    "api_calls": "Google Ads API calls",
+    "rows": "Rows received from the Google Ads API",
+    "bytes": "Serialized response bytes received from the Google Ads API",
+    "notifications": "Notification posts by outcome",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _format_labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Thread-safe counters and timing summaries keyed by name and labels."""
+
+    def __init__(self, prefix=METRIC_PREFIX):
+        self.prefix = prefix
+        self._counters = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        """Add value to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration for a span."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            count, total, longest = self._timings.get(key, (0, 0.0, 0.0))
+            self._timings[key] = (count + 1, total + seconds, max(longest, seconds))
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the enclosed block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name, **labels):
+        """Current value of a counter."""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def timing(self, name, **labels):
+        """(count, total seconds, longest seconds) of a span."""
+        with self._lock:
+            return self._timings.get((name, _label_key(labels)), (0, 0.0, 0.0))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Spans become <prefix>_<name>_seconds summaries (_count and _sum) and
+        <prefix>_<name>_seconds_max gauges; counters become <prefix>_<name>_total.
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+
+        families = {}
+
+        def add(metric, kind, help_text, line):
+            if metric not in families:
+                families[metric] = [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            families[metric].append(line)
+
+        for (name, key), (count, total, longest) in timings:
+            metric = f"{self.prefix}_{name}_seconds"
+            labels = _format_labels(key)
+            add(metric, "summary", _HELP.get(name, name), f"{metric}_count{labels} {count}")
+            add(metric, "summary", _HELP.get(name, name), f"{metric}_sum{labels} {total:.6f}")
+            add(f"{metric}_max", "gauge", f"Longest {_HELP.get(name, name)}", f"{metric}_max{labels} {longest:.6f}")
+
+        for (name, key), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            add(metric, "counter", _HELP.get(name, name), f"{metric}{_format_labels(key)} {value}")
+
+        return "".join(line + "\n" for lines in families.values() for line in lines)
+
+    def write_prometheus(self, path):
+        """Write render() to path atomically, so a scraper never reads a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+        logger.debug(f"Metrics written to {path}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serve render() at http://host:port/metrics from a daemon thread.
+
+        Returns:
+            http.server.ThreadingHTTPServer: The running server (call shutdown() to stop)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        logger.info(f"Serving metrics at http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+def message_size(message):
+    """Serialized size of a protobuf or proto-plus message (0 if unknown)."""
+    try:
+        return int(type(message).pb(message).ByteSize())
+    except (AttributeError, TypeError):
+        pass
+    try:
+        return int(message.ByteSize())
+    except (AttributeError, TypeError):
+        return 0
+
+
+def instrument_results(registry, customer_id, method, results):
+    """
+    Yield from a search/search_stream result while timing each page.
+
+    search_stream yields batches (one page each, with .results); search
+    yields rows, which are only counted. The whole iteration is recorded
+    as one api_call span.
+    """
+    labels = {"customer_id": customer_id, "method": method}
+
+    with registry.span("api_call", **labels):
+        waited = time.perf_counter()
+        for item in results:
+            rows = getattr(item, "results", None)
+            if rows is not None:
+                registry.observe("api_page", time.perf_counter() - waited, **labels)
+                registry.increment("rows", len(rows), **labels)
+                registry.increment("bytes", message_size(item), **labels)
+            else:
+                registry.increment("rows", **labels)
+
+            yield item
+            waited = time.perf_counter()
+
+
+@contextmanager
+def profile_run(path):
+    """
+    Profile the enclosed block and write the result to path.
+
+    Paths ending in .html use pyinstrument (if installed); anything else
+    gets a cProfile stats file (view with `python -m pstats PATH` or snakeviz).
+    """
+    if path.endswith(".html"):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("HTML profiles require pyinstrument: pip install pyinstrument")
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            logger.info(f"Profile written to {path}")
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        logger.info(f"Profile written to {path}")
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _default_registry
@@ -0,0 +1,400 @@
+"""
+Keyword and Search-Term Automation
+Empire Amplify - Automation Rules
+
+Rules below campaign level, for accounts with millions of keyword and
+search-term rows:
+- Search terms (search_term_view) matching an ADD_NEGATIVE rule, e.g. spend
+  without conversions, are added to their ad group as exact-match negative
+  keywords
+- Keywords (keyword_view) matching a PAUSE rule, e.g. CPA too high, are paused
+
+Rows are streamed with search_stream into typed column buffers and evaluated
+one chunk at a time with the rule engine, so rule sets use the same YAML
+format (conditions, params, priorities, campaign filters, account overrides)
+as campaign rules. Actions are flushed through
+AdGroupCriterionService.mutate_ad_group_criteria every batch_size actions.
+At most one chunk and one batch are held at a time, so memory does not grow
+with account size. skip_if thresholds are pushed into the query's WHERE
+clause, so rows that can never match are not downloaded.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from loguru import logger
+
+from action_applier import DEFAULT_BATCH_SIZE, apply_keyword_actions_batched
+from google_ads_client import get_customer_id, get_google_ads_client, handle_google_ads_exception
+from instrumentation import get_metrics
+from list_campaigns import DEFAULT_CHUNK_SIZE
+from query_planner import push_down
+from rule_engine import compile_rules
+from typed_columns import iter_column_chunks
+
+# Keyword automation thresholds (see keyword_rules_from_thresholds)
+KEYWORD_RULES = {
+    "min_clicks_for_evaluation": 10,
+    "negative_if_cost_above": 25.0,  # Search term spend without conversions
+    "pause_keyword_if_cpa_above": 150.0,
+    "pause_keyword_if_cost_above": 100.0,  # Keyword spend without conversions
+}
+
+# Per level: FROM resource, the rule action it accepts, the action it emits,
+# identity columns as (column, GAQL field, kind) and fixed WHERE predicates
+LEVELS = {
+    "search_term": {
+        "resource": "search_term_view",
+        "rule_action": "ADD_NEGATIVE",
+        "action": "ADD_NEGATIVE",
+        "columns": [
+            ("campaign_id", "campaign.id", "int"),
+            ("campaign_name", "campaign.name", "str"),
+            ("ad_group_id", "ad_group.id", "int"),
+            ("search_term", "search_term_view.search_term", "str"),
+        ],
+        "where": [
+            "search_term_view.status NOT IN ('EXCLUDED', 'ADDED_EXCLUDED')",
+            "ad_group.status = 'ENABLED'",
+            "campaign.status = 'ENABLED'",
+        ],
+    },
+    "keyword": {
+        "resource": "keyword_view",
+        "rule_action": "PAUSE",
+        "action": "PAUSE_KEYWORD",
+        "columns": [
+            ("campaign_id", "campaign.id", "int"),
+            ("campaign_name", "campaign.name", "str"),
+            ("ad_group_id", "ad_group.id", "int"),
+            ("criterion_id", "ad_group_criterion.criterion_id", "int"),
+            ("keyword_text", "ad_group_criterion.keyword.text", "str"),
+        ],
+        "where": [
+            "ad_group_criterion.status = 'ENABLED'",
+            "ad_group.status = 'ENABLED'",
+            "campaign.status = 'ENABLED'",
+        ],
+    },
+}
+
+_METRIC_FIELDS = [
+    ("impressions", "metrics.impressions", "int"),
+    ("clicks", "metrics.clicks", "int"),
+    ("cost_micros", "metrics.cost_micros", "int"),
+    ("conversions", "metrics.conversions", "float"),
+    ("conversion_value", "metrics.conversions_value", "float"),
+]
+
+# Columns of the action log, shared by both levels
+ACTION_COLUMNS = (
+    "customer_id",
+    "campaign_id",
+    "campaign_name",
+    "ad_group_id",
+    "search_term",
+    "criterion_id",
+    "keyword_text",
+    "action",
+    "rule",
+    "reason",
+    "status",
+    "error",
+)
+
+
+def keyword_rules_from_thresholds(thresholds):
+    """
+    Build the built-in search-term and keyword rule sets from a KEYWORD_RULES-style dict.
+
+    Args:
+        thresholds: Dict with the KEYWORD_RULES keys
+
+    Returns:
+        dict: Level ("search_term", "keyword") -> rule set definition
+    """
+    skip_if = [f"clicks < {thresholds['min_clicks_for_evaluation']}"]
+    return {
+        "search_term": {
+            "skip_if": skip_if,
+            "rules": [
+                {
+                    "name": "negative_wasted_spend",
+                    "priority": 10,
+                    "action": "ADD_NEGATIVE",
+                    "when": ["conversions == 0", "cost > max_cost"],
+                    "params": {"max_cost": thresholds["negative_if_cost_above"]},
+                    "reason": "Spent ${cost:.2f} without conversions",
+                },
+            ],
+        },
+        "keyword": {
+            "skip_if": skip_if,
+            "rules": [
+                {
+                    "name": "pause_keyword_high_cpa",
+                    "priority": 10,
+                    "action": "PAUSE",
+                    "when": ["cpa > max_cpa"],
+                    "params": {"max_cpa": thresholds["pause_keyword_if_cpa_above"]},
+                    "reason": "CPA ${cpa:.2f} > ${max_cpa}",
+                },
+                {
+                    "name": "pause_keyword_wasted_spend",
+                    "priority": 20,
+                    "action": "PAUSE",
+                    "when": ["conversions == 0", "cost > max_cost"],
+                    "params": {"max_cost": thresholds["pause_keyword_if_cost_above"]},
+                    "reason": "Spent ${cost:.2f} without conversions",
+                },
+            ],
+        },
+    }
+
+
+def compile_level_rules(definition, level, customer_id=None):
+    """Compile a level's rule set, accepting only the action that level applies."""
+    return compile_rules(definition, customer_id, actions=(LEVELS[level]["rule_action"],))
+
+
+def build_keyword_query(level, days_back=30, predicates=(), end_date=None):
+    """
+    Build the GAQL query for a level.
+
+    Args:
+        level: "search_term" or "keyword"
+        days_back: Number of days to look back for metrics
+        predicates: Extra GAQL WHERE predicates (e.g. pushed-down skip_if)
+        end_date: Last day of the range (default: today)
+
+    Returns:
+        tuple: (query, column specs in SELECT order)
+    """
+    spec = LEVELS[level]
+    specs = spec["columns"] + _METRIC_FIELDS
+
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=days_back)
+    where = spec["where"] + list(predicates)
+    where.append(f"segments.date BETWEEN '{start_date.strftime('%Y-%m-%d')}' AND '{end_date.strftime('%Y-%m-%d')}'")
+
+    select = ",\n            ".join(field for _, field, _ in specs)
+    conditions = "\n            AND ".join(where)
+    query = f"""
+        SELECT
+            {select}
+        FROM {spec["resource"]}
+        WHERE {conditions}
+    """
+    return query, specs
+
+
+def _chunk_frame(columns):
+    """Chunk DataFrame from typed columns, with cost and CTR derived vectorized."""
+    df = columns.to_frame()
+    df["cost"] = df["cost_micros"] / 1_000_000
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["ctr"] = np.where(df["impressions"] > 0, df["clicks"] / df["impressions"] * 100, 0.0)
+    return df
+
+
+def iter_keyword_chunks(client, customer_id, level, days_back=30, chunk_size=DEFAULT_CHUNK_SIZE, predicates=()):
+    """
+    Stream a level's rows as DataFrames of at most chunk_size rows.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        level: "search_term" or "keyword"
+        days_back: Number of days to look back for metrics
+        chunk_size: Maximum rows per chunk
+        predicates: Extra GAQL WHERE predicates
+
+    Yields:
+        pandas.DataFrame: Identity columns of the level plus impressions,
+        clicks, cost_micros, cost, conversions, conversion_value and ctr
+    """
+    ga_service = client.get_service("GoogleAdsService")
+    query, specs = build_keyword_query(level, days_back=days_back, predicates=predicates)
+
+    for columns in iter_column_chunks(ga_service, customer_id, query, specs, chunk_size):
+        yield _chunk_frame(columns)
+
+
+def evaluate_chunk(df, plan, level):
+    """
+    Evaluate a compiled level rule set over one chunk.
+
+    Args:
+        df: Chunk from iter_keyword_chunks
+        plan: RulePlan from compile_level_rules
+        level: "search_term" or "keyword"
+
+    Returns:
+        list: ADD_NEGATIVE or PAUSE_KEYWORD actions, in chunk row order
+    """
+    frame, matched, rule_indexes, _ = plan.match(df)
+    if not len(matched):
+        return []
+
+    spec = LEVELS[level]
+    identity = [(column, df[column].to_numpy()[matched].tolist()) for column, _, _ in spec["columns"]]
+
+    actions = []
+    for position, (i, index) in enumerate(zip(matched.tolist(), rule_indexes.tolist())):
+        rule = plan.rules[index]
+        action = {column: values[position] for column, values in identity}
+        action.update(action=spec["action"], rule=rule.name, reason=rule.format_reason(frame, i))
+        actions.append(action)
+
+    return actions
+
+
+def run_keyword_rules(
+    client,
+    customer_id,
+    rules=None,
+    levels=tuple(LEVELS),
+    dry_run=True,
+    days_back=30,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    batch_size=DEFAULT_BATCH_SIZE,
+    on_results=None,
+):
+    """
+    Stream search terms and keywords through their rule sets and apply the actions in batches.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to process
+        rules: Dict of level -> rule set definition (default: built from
+            KEYWORD_RULES); levels without a rule set are skipped
+        levels: Levels to process, in order
+        dry_run: If True, only report actions without applying them
+        days_back: Number of days to look back for metrics
+        chunk_size: Rows evaluated at a time
+        batch_size: Actions per mutate request
+        on_results: Optional callback receiving each batch of results (action
+            dicts with "status" and "error"; DRY_RUN on dry run), e.g. to
+            stream them to an action log
+
+    Returns:
+        dict: Level -> {"rows", "chunks", "actions", "applied", "failed"}
+    """
+    rules = rules or keyword_rules_from_thresholds(KEYWORD_RULES)
+    metrics = get_metrics()
+    summary = {}
+
+    for level in levels:
+        if level not in rules:
+            continue
+
+        plan = compile_level_rules(rules[level], level, customer_id)
+        predicates = [predicate for predicate in map(push_down, plan.skip_conditions) if predicate]
+        counts = dict.fromkeys(("rows", "chunks", "actions", "applied", "failed"), 0)
+        pending = []
+
+        def flush(batch):
+            if dry_run:
+                results = [{**action, "status": "DRY_RUN", "error": None} for action in batch]
+            else:
+                results = apply_keyword_actions_batched(client, customer_id, batch, batch_size=batch_size)
+
+            statuses = [result["status"] for result in results]
+            counts["applied"] += statuses.count("APPLIED")
+            counts["failed"] += statuses.count("FAILED")
+            if on_results is not None:
+                on_results([{"customer_id": customer_id, **result} for result in results])
+
+        chunks = iter_keyword_chunks(
+            client, customer_id, level, days_back=days_back, chunk_size=chunk_size, predicates=predicates
+        )
+        for chunk in chunks:
+            with metrics.span("keyword_evaluate", customer_id=customer_id, level=level):
+                actions = evaluate_chunk(chunk, plan, level)
+
+            counts["rows"] += len(chunk)
+            counts["chunks"] += 1
+            counts["actions"] += len(actions)
+            pending.extend(actions)
+
+            while len(pending) >= batch_size:
+                flush(pending[:batch_size])
+                del pending[:batch_size]
+
+        if pending:
+            flush(pending)
+
+        metrics.increment("keyword_rows", counts["rows"], customer_id=customer_id, level=level)
+        metrics.increment("keyword_actions", counts["actions"], customer_id=customer_id, level=level)
+        logger.info(
+            f"{level}: {counts['rows']} rows in {counts['chunks']} chunks, {counts['actions']} actions "
+            f"({counts['applied']} applied, {counts['failed']} failed)"
+        )
+        summary[level] = counts
+
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run keyword and search-term automation rules")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry run)")
+    parser.add_argument("--level", choices=sorted(LEVELS), action="append", help="Level to process (default: both)")
+    parser.add_argument("--days", type=int, default=30, help="Number of days to look back for metrics")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows evaluated at a time")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Actions per mutate request")
+    parser.add_argument(
+        "--rules", metavar="PATH", help="YAML/JSON file with search_term and keyword rule sets (default: KEYWORD_RULES)"
+    )
+    parser.add_argument("--export", metavar="PATH", help="Write the action log (.xlsx, .csv, .csv.gz or .parquet)")
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
+    exporter = None
+    try:
+        rules = None
+        if args.rules:
+            import json
+
+            with open(args.rules) as f:
+                if args.rules.endswith((".yaml", ".yml")):
+                    import yaml
+
+                    rules = yaml.safe_load(f)
+                else:
+                    rules = json.load(f)
+
+        on_results = None
+        if args.export:
+            import pandas as pd
+
+            from exporters import get_exporter
+
+            exporter = get_exporter(args.export, sheet_name="Actions", summary=False)
+
+            def write_results(results):
+                exporter.write_chunk(pd.DataFrame(results, columns=list(ACTION_COLUMNS)))
+
+            on_results = write_results
+
+        run_keyword_rules(
+            get_google_ads_client(),
+            get_customer_id(),
+            rules=rules,
+            levels=args.level or tuple(LEVELS),
+            dry_run=not args.apply,
+            days_back=args.days,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            on_results=on_results,
+        )
+    except GoogleAdsException as ex:
+        handle_google_ads_exception(ex)
+    except Exception as e:
+        logger.error(f"Error: {e}")
+    finally:
+        if exporter is not None:
+            exporter.close()
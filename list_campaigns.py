@@ -5,16 +5,47 @@ Empire Amplify - Campaign Management
 This script retrieves all campaigns and their performance metrics.
 """
 
-from datetime import datetime, timedelta
-
-import pandas as pd
-from google.ads.googleads.errors import GoogleAdsException
 from loguru import logger
 
 from google_ads_client import get_customer_id, get_google_ads_client, handle_google_ads_exception
+from instrumentation import get_metrics
+from metrics_cache import list_campaigns_cached
+from query_planner import COLUMN_FIELDS, plan_campaign_query
+from typed_columns import iter_column_chunks, read_columns
+
+# Rows per DataFrame yielded by iter_campaign_chunks
+DEFAULT_CHUNK_SIZE = 50_000
 
 
-def list_campaigns(client, customer_id, include_metrics=True, days_back=30):
+def build_campaign_query(include_metrics=True, days_back=30, columns=None, predicates=(), statuses=None):
+    """
+    Build the GAQL query used by list_campaigns.
+
+    Args:
+        include_metrics: Whether to select performance metrics
+        days_back: Number of days to look back for metrics
+        columns: Frame columns to select (default: all; see query_planner)
+        predicates: Extra GAQL WHERE predicates
+        statuses: Campaign statuses to fetch (default: everything but REMOVED)
+
+    Returns:
+        str: GAQL query
+    """
+    plan = plan_campaign_query(columns, predicates, statuses, include_metrics=include_metrics)
+    return plan.query(days_back)
+
+
+def list_campaigns(
+    client,
+    customer_id,
+    include_metrics=True,
+    days_back=30,
+    stream=False,
+    cache=None,
+    columns=None,
+    predicates=(),
+    statuses=None,
+):
     """
     List all campaigns with optional performance metrics.
 
@@ -23,49 +54,37 @@ def list_campaigns(client, customer_id, include_metrics=True, days_back=30):
         customer_id: Customer ID to query
         include_metrics: Whether to include performance metrics
         days_back: Number of days to look back for metrics
+        stream: Use search_stream and columnar assembly instead of paged search
+        cache: Optional MetricsCache; only missing or still-mutable days are
+            fetched and the window is aggregated locally, then filtered and
+            projected like the query would have been
+        columns: Frame columns to fetch (default: all); only their fields are
+            selected and decoded (see query_planner)
+        predicates: Extra GAQL WHERE predicates, e.g. pushed-down rule filters
+        statuses: Campaign statuses to fetch (default: everything but REMOVED)
 
     Returns:
         pandas.DataFrame: Campaign data
     """
-    ga_service = client.get_service("GoogleAdsService")
+    import pandas as pd
 
-    # Base query
-    query = """
-        SELECT
-            campaign.id,
-            campaign.name,
-            campaign.status,
-            campaign.advertising_channel_type,
-            campaign.bidding_strategy_type,
-            campaign_budget.amount_micros
-    """
+    plan = plan_campaign_query(columns, predicates, statuses, include_metrics=include_metrics)
 
-    if include_metrics:
-        query += """,
-            metrics.impressions,
-            metrics.clicks,
-            metrics.cost_micros,
-            metrics.conversions,
-            metrics.conversions_value,
-            metrics.ctr,
-            metrics.average_cpc
-        """
-
-    query += f"""
-        FROM campaign
-        WHERE campaign.status != 'REMOVED'
-    """
+    if cache is not None and include_metrics:
+        df = plan.filter(list_campaigns_cached(client, customer_id, cache, days_back=days_back))
+        logger.info(f"Found {len(df)} campaigns")
+        return df
 
-    if include_metrics:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days_back)
-        query += f"""
-            AND segments.date BETWEEN '{start_date.strftime('%Y-%m-%d')}' 
-            AND '{end_date.strftime('%Y-%m-%d')}'
-        """
+    ga_service = client.get_service("GoogleAdsService")
+    query = plan.query(days_back)
 
     logger.info(f"Fetching campaigns for customer {customer_id}")
 
+    if stream:
+        df = _stream_campaigns(ga_service, customer_id, query, include_metrics, columns=plan.columns)
+        logger.info(f"Found {len(df)} campaigns")
+        return df
+
     campaigns = []
     response = ga_service.search(customer_id=customer_id, query=query)
 
@@ -77,6 +96,9 @@ def list_campaigns(client, customer_id, include_metrics=True, days_back=30):
             "channel_type": row.campaign.advertising_channel_type.name,
             "bidding_strategy": row.campaign.bidding_strategy_type.name,
             "daily_budget": row.campaign_budget.amount_micros / 1_000_000,
+            "budget_micros": row.campaign_budget.amount_micros,
+            "budget_resource_name": row.campaign_budget.resource_name,
+            "budget_shared": row.campaign_budget.explicitly_shared,
         }
 
         if include_metrics:
@@ -85,6 +107,7 @@ def list_campaigns(client, customer_id, include_metrics=True, days_back=30):
                     "impressions": row.metrics.impressions,
                     "clicks": row.metrics.clicks,
                     "cost": row.metrics.cost_micros / 1_000_000,
+                    "cost_micros": row.metrics.cost_micros,
                     "conversions": row.metrics.conversions,
                     "conversion_value": row.metrics.conversions_value,
                     "ctr": row.metrics.ctr * 100,
@@ -94,11 +117,129 @@ def list_campaigns(client, customer_id, include_metrics=True, days_back=30):
 
         campaigns.append(campaign_data)
 
-    df = pd.DataFrame(campaigns)
+    with get_metrics().span("frame_build", customer_id=customer_id):
+        df = pd.DataFrame(campaigns)
+    if columns is not None and not df.empty:
+        df = df[list(plan.columns)]
     logger.info(f"Found {len(df)} campaigns")
     return df
 
 
+# Column kind per GAQL field (see typed_columns)
+_FIELD_KINDS = {
+    "campaign.id": "int",
+    "campaign.name": "str",
+    "campaign.status": "enum",
+    "campaign.advertising_channel_type": "enum",
+    "campaign.bidding_strategy_type": "enum",
+    "campaign_budget.amount_micros": "int",
+    "campaign_budget.resource_name": "str",
+    "campaign_budget.explicitly_shared": "bool",
+    "metrics.impressions": "int",
+    "metrics.clicks": "int",
+    "metrics.cost_micros": "int",
+    "metrics.conversions": "float",
+    "metrics.conversions_value": "float",
+    "metrics.ctr": "float",
+    "metrics.average_cpc": "float",
+}
+
+# Frame columns derived from a field with one vectorized operation
+_COLUMN_TRANSFORMS = {
+    "daily_budget": lambda micros: micros / 1_000_000,
+    "cost": lambda micros: micros / 1_000_000,
+    "ctr": lambda ctr: ctr * 100,
+    "avg_cpc": lambda micros: micros / 1_000_000,
+}
+
+
+def campaign_specs(columns):
+    """Typed column specs (see typed_columns) for list_campaigns frame columns."""
+    return [(column, COLUMN_FIELDS[column], _FIELD_KINDS[COLUMN_FIELDS[column]]) for column in columns]
+
+
+def campaign_frame(columns):
+    """
+    Campaign DataFrame from typed columns read with campaign_specs.
+
+    Money stays in int64 micros in the buffers; the currency columns are
+    derived here with one vectorized divide. The DataFrame has the same
+    columns and units as the paged search path.
+    """
+    import pandas as pd
+
+    values = columns.to_columns()
+    for column, transform in _COLUMN_TRANSFORMS.items():
+        if column in values:
+            values[column] = transform(values[column])
+    return pd.DataFrame(values)
+
+
+def _stream_campaigns(ga_service, customer_id, query, include_metrics, columns=None):
+    """
+    Fetch campaigns with search_stream, filling typed column buffers per batch.
+
+    Args:
+        ga_service: GoogleAdsService client
+        customer_id: Customer ID to query
+        query: GAQL query from build_campaign_query
+        include_metrics: Whether the query selected performance metrics
+        columns: Frame columns the query selected (default: all)
+
+    Returns:
+        pandas.DataFrame: Campaign data
+    """
+    columns = columns or plan_campaign_query(include_metrics=include_metrics).columns
+    buffers = read_columns(ga_service, customer_id, query, campaign_specs(columns))
+
+    with get_metrics().span("frame_build", customer_id=customer_id):
+        return campaign_frame(buffers)
+
+
+def iter_campaign_chunks(
+    client,
+    customer_id,
+    include_metrics=True,
+    days_back=30,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    columns=None,
+    predicates=(),
+    statuses=None,
+):
+    """
+    Stream campaigns as DataFrames of at most chunk_size rows.
+
+    Only one chunk is held at a time, so exports of any size run in bounded
+    memory. Rows are decoded a batch slice at a time, as in list_campaigns
+    with stream=True.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        include_metrics: Whether to include performance metrics
+        days_back: Number of days to look back for metrics
+        chunk_size: Maximum rows per chunk
+        columns: Frame columns to fetch (default: all; see query_planner)
+        predicates: Extra GAQL WHERE predicates
+        statuses: Campaign statuses to fetch (default: everything but REMOVED)
+
+    Yields:
+        pandas.DataFrame: Campaign data with the same columns as list_campaigns
+    """
+    ga_service = client.get_service("GoogleAdsService")
+    plan = plan_campaign_query(columns, predicates, statuses, include_metrics=include_metrics)
+
+    for chunk in iter_column_chunks(ga_service, customer_id, plan.query(days_back), campaign_specs(plan.columns), chunk_size):
+        yield campaign_frame(chunk)
+
+
+def _total_spend(df):
+    """Total cost, summed exactly in integer micros when available."""
+    if "cost_micros" in df.columns:
+        return int(df["cost_micros"].sum()) / 1_000_000
+    return df["cost"].sum() if "cost" in df.columns else 0
+
+
 def get_campaign_performance_summary(df):
     """
     Generate a performance summary from campaign data.
@@ -115,15 +256,16 @@ def get_campaign_performance_summary(df):
     summary = {
         "total_campaigns": len(df),
         "active_campaigns": len(df[df["status"] == "ENABLED"]),
-        "total_spend": df["cost"].sum() if "cost" in df.columns else 0,
+        "total_spend": _total_spend(df),
         "total_clicks": df["clicks"].sum() if "clicks" in df.columns else 0,
+        "total_impressions": df["impressions"].sum() if "impressions" in df.columns else 0,
         "total_conversions": df["conversions"].sum() if "conversions" in df.columns else 0,
         "avg_ctr": df["ctr"].mean() if "ctr" in df.columns else 0,
         "avg_cpc": df["avg_cpc"].mean() if "avg_cpc" in df.columns else 0,
     }
 
-    if summary["total_clicks"] > 0:
-        summary["overall_ctr"] = (summary["total_clicks"] / df["impressions"].sum()) * 100
+    if summary["total_clicks"] > 0 and summary["total_impressions"] > 0:
+        summary["overall_ctr"] = (summary["total_clicks"] / summary["total_impressions"]) * 100
 
     if summary["total_conversions"] > 0 and summary["total_spend"] > 0:
         summary["cpa"] = summary["total_spend"] / summary["total_conversions"]
@@ -131,25 +273,76 @@ def get_campaign_performance_summary(df):
     return summary
 
 
+def merge_performance_summaries(summaries):
+    """
+    Combine per-chunk summaries from get_campaign_performance_summary.
+
+    Totals are added, averages are weighted by campaign count and the overall
+    rates are recomputed from the combined totals.
+
+    Args:
+        summaries: Iterable of summary dicts
+
+    Returns:
+        dict: Summary statistics for all chunks together
+    """
+    summaries = [summary for summary in summaries if "error" not in summary]
+    if not summaries:
+        return {"error": "No campaigns found"}
+
+    total_campaigns = sum(summary["total_campaigns"] for summary in summaries)
+    merged = {"total_campaigns": total_campaigns}
+
+    for key in ("active_campaigns", "total_spend", "total_clicks", "total_impressions", "total_conversions"):
+        merged[key] = sum(summary[key] for summary in summaries)
+
+    for key in ("avg_ctr", "avg_cpc"):
+        merged[key] = sum(summary[key] * summary["total_campaigns"] for summary in summaries) / total_campaigns
+
+    if merged["total_clicks"] > 0 and merged["total_impressions"] > 0:
+        merged["overall_ctr"] = (merged["total_clicks"] / merged["total_impressions"]) * 100
+
+    if merged["total_conversions"] > 0 and merged["total_spend"] > 0:
+        merged["cpa"] = merged["total_spend"] / merged["total_conversions"]
+
+    return merged
+
+
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List Google Ads campaigns with performance metrics")
+    parser.add_argument("--days", type=int, default=30, help="Number of days to look back for metrics")
+    parser.add_argument(
+        "--export", metavar="PATH", help="Stream the report to .xlsx, .csv, .csv.gz or .parquet instead of printing it"
+    )
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
     try:
         client = get_google_ads_client()
         customer_id = get_customer_id()
 
-        # Get campaigns with metrics
-        df = list_campaigns(client, customer_id, include_metrics=True, days_back=30)
-
-        if not df.empty:
-            print("\n📊 Campaign Overview:")
-            print(df.to_string(index=False))
-
-            summary = get_campaign_performance_summary(df)
-            print("\n📈 Performance Summary:")
-            for key, value in summary.items():
-                if isinstance(value, float):
-                    print(f"  {key}: {value:.2f}")
-                else:
-                    print(f"  {key}: {value}")
+        if args.export:
+            from exporters import export_campaign_report
+
+            export_campaign_report(client, customer_id, args.export, days_back=args.days)
+        else:
+            # Get campaigns with metrics
+            df = list_campaigns(client, customer_id, include_metrics=True, days_back=args.days, stream=True)
+
+            if not df.empty:
+                print("\n📊 Campaign Overview:")
+                print(df.to_string(index=False))
+
+                summary = get_campaign_performance_summary(df)
+                print("\n📈 Performance Summary:")
+                for key, value in summary.items():
+                    if isinstance(value, float):
+                        print(f"  {key}: {value:.2f}")
+                    else:
+                        print(f"  {key}: {value}")
 
     except GoogleAdsException as ex:
         handle_google_ads_exception(ex)
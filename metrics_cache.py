@@ -0,0 +1,365 @@
+"""
+Incremental Metrics Cache
+Empire Amplify - Campaign Management
+
+Keeps daily campaign metrics (segments.date rows) in a local SQLite file so
+scheduled runs only download days that are missing or still changing:
+- Days older than the conversion-lag lookback are fetched once
+- Recent days (default: last 3) are re-fetched every run
+- Any window is aggregated locally into the list_campaigns shape
+
+Campaign status and budget are not taken from the cached days: a campaign
+that stopped spending would keep the values of its last day with metrics.
+They are read fresh on every run with a small attribute-only query.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from loguru import logger
+
+from query_planner import plan_campaign_query
+from typed_columns import read_columns
+
+# Days (counting back from today) whose metrics can still change through conversion lag
+DEFAULT_MUTABLE_DAYS = 3
+
+DEFAULT_CACHE_PATH = "metrics_cache.sqlite"
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS daily_metrics (
+        customer_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        campaign_id INTEGER NOT NULL,
+        campaign_name TEXT,
+        status TEXT,
+        channel_type TEXT,
+        bidding_strategy TEXT,
+        budget_micros INTEGER,
+        budget_resource_name TEXT,
+        budget_shared INTEGER,
+        impressions INTEGER,
+        clicks INTEGER,
+        cost_micros INTEGER,
+        conversions REAL,
+        conversion_value REAL,
+        PRIMARY KEY (customer_id, date, campaign_id)
+    );
+    CREATE TABLE IF NOT EXISTS fetched_days (
+        customer_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        fetched_at TEXT NOT NULL,
+        PRIMARY KEY (customer_id, date)
+    );
+"""
+
+_COLUMNS = [
+    "customer_id",
+    "date",
+    "campaign_id",
+    "campaign_name",
+    "status",
+    "channel_type",
+    "bidding_strategy",
+    "budget_micros",
+    "budget_resource_name",
+    "budget_shared",
+    "impressions",
+    "clicks",
+    "cost_micros",
+    "conversions",
+    "conversion_value",
+]
+
+# Campaign attributes, as opposed to metrics, of a daily row
+_ATTRIBUTE_COLUMNS = [
+    "campaign_name",
+    "status",
+    "channel_type",
+    "bidding_strategy",
+    "budget_micros",
+    "budget_resource_name",
+    "budget_shared",
+]
+
+
+class MetricsCache:
+    """SQLite store of daily campaign metrics keyed by customer, date and campaign."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, mutable_days=DEFAULT_MUTABLE_DAYS):
+        self.path = path
+        self.mutable_days = mutable_days
+        self._lock = threading.Lock()
+
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        """Open a connection for one transaction; SQLite access is serialized across threads."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def missing_dates(self, customer_id, start_date, end_date, today=None):
+        """
+        Return the dates in [start_date, end_date] that must be fetched.
+
+        A date is missing if it was never fetched or falls inside the mutable
+        lookback window.
+        """
+        today = today or date.today()
+        mutable_from = today - timedelta(days=self.mutable_days)
+
+        with self._connection() as conn:
+            fetched = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT date FROM fetched_days WHERE customer_id = ? AND date BETWEEN ? AND ?",
+                    (customer_id, start_date.isoformat(), end_date.isoformat()),
+                )
+            }
+
+        missing = []
+        day = start_date
+        while day <= end_date:
+            if day.isoformat() not in fetched or day >= mutable_from:
+                missing.append(day)
+            day += timedelta(days=1)
+
+        return missing
+
+    def store(self, customer_id, dates, rows):
+        """
+        Replace the cached rows for the given dates with freshly fetched rows.
+
+        Args:
+            customer_id: Customer ID the rows belong to
+            dates: Dates covered by the fetch (including days with no rows)
+            rows: DataFrame from fetch_daily_metrics
+        """
+        date_keys = [day.isoformat() for day in dates]
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+
+        records = []
+        if not rows.empty:
+            frame = rows.assign(customer_id=customer_id)[_COLUMNS]
+            records = list(frame.itertuples(index=False, name=None))
+
+        with self._connection() as conn:
+            conn.executemany(
+                "DELETE FROM daily_metrics WHERE customer_id = ? AND date = ?",
+                [(customer_id, key) for key in date_keys],
+            )
+            conn.executemany(
+                f"INSERT INTO daily_metrics ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                records,
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO fetched_days (customer_id, date, fetched_at) VALUES (?, ?, ?)",
+                [(customer_id, key, fetched_at) for key in date_keys],
+            )
+
+    def load_daily(self, customer_id, start_date, end_date):
+        """Return cached daily rows for a customer and date range."""
+        import pandas as pd
+
+        with self._connection() as conn:
+            return pd.read_sql_query(
+                "SELECT * FROM daily_metrics WHERE customer_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+                conn,
+                params=(customer_id, start_date.isoformat(), end_date.isoformat()),
+            )
+
+    def aggregate(self, customer_id, start_date, end_date, attributes=None):
+        """
+        Aggregate cached daily rows into one row per campaign.
+
+        Args:
+            customer_id: Customer ID to aggregate
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            attributes: Optional current campaign attributes (see
+                fetch_campaign_attributes) to use instead of the cached ones
+
+        Returns:
+            pandas.DataFrame: Same columns and units as list_campaigns
+        """
+        daily = self.load_daily(customer_id, start_date, end_date)
+        return aggregate_daily_metrics(daily, attributes=attributes)
+
+
+def aggregate_daily_metrics(daily, attributes=None):
+    """
+    Roll daily campaign rows up to one row per campaign.
+
+    Metrics are summed and CTR / average CPC are recomputed from the sums.
+    Campaign attributes (name, status, budget) come from `attributes` when
+    given, dropping campaigns it does not list (e.g. since removed);
+    otherwise from each campaign's latest cached day.
+
+    Args:
+        daily: DataFrame of daily rows (see MetricsCache.load_daily)
+        attributes: Optional DataFrame from fetch_campaign_attributes
+
+    Returns:
+        pandas.DataFrame: Same columns and units as list_campaigns
+    """
+    import pandas as pd
+
+    if daily.empty:
+        return pd.DataFrame()
+
+    grouped = daily.sort_values("date").groupby("campaign_id", sort=False)
+    totals = grouped[["impressions", "clicks", "cost_micros", "conversions", "conversion_value"]].sum()
+    if attributes is None:
+        latest = grouped[_ATTRIBUTE_COLUMNS].last()
+    else:
+        latest = attributes.set_index("campaign_id")[_ATTRIBUTE_COLUMNS]
+        latest = latest.loc[latest.index.intersection(totals.index, sort=False)]
+        totals = totals.loc[latest.index]
+
+    impressions = totals["impressions"].to_numpy(dtype=np.float64)
+    clicks = totals["clicks"].to_numpy(dtype=np.float64)
+    cost_micros = totals["cost_micros"].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ctr = np.where(impressions > 0, clicks / impressions * 100, 0.0)
+        avg_cpc = np.where(clicks > 0, cost_micros / clicks / 1_000_000, 0.0)
+
+    return pd.DataFrame(
+        {
+            "campaign_id": latest.index.to_numpy(dtype=np.int64),
+            "campaign_name": latest["campaign_name"].to_numpy(),
+            "status": pd.Categorical(latest["status"]),
+            "channel_type": pd.Categorical(latest["channel_type"]),
+            "bidding_strategy": pd.Categorical(latest["bidding_strategy"]),
+            "daily_budget": latest["budget_micros"].to_numpy(dtype=np.int64) / 1_000_000,
+            "budget_micros": latest["budget_micros"].to_numpy(dtype=np.int64),
+            "budget_resource_name": latest["budget_resource_name"].to_numpy(),
+            "budget_shared": latest["budget_shared"].to_numpy().astype(bool),
+            "impressions": totals["impressions"].to_numpy(dtype=np.int64),
+            "clicks": totals["clicks"].to_numpy(dtype=np.int64),
+            "cost": cost_micros / 1_000_000,
+            "cost_micros": totals["cost_micros"].to_numpy(dtype=np.int64),
+            "conversions": totals["conversions"].to_numpy(dtype=np.float64),
+            "conversion_value": totals["conversion_value"].to_numpy(dtype=np.float64),
+            "ctr": ctr,
+            "avg_cpc": avg_cpc,
+        }
+    )
+
+
+def _date_runs(dates):
+    """Group sorted dates into (start, end) runs of consecutive days."""
+    runs = []
+    for day in sorted(dates):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [(start, end) for start, end in runs]
+
+
+def fetch_daily_metrics(client, customer_id, start_date, end_date):
+    """
+    Fetch per-day campaign metrics with search_stream.
+
+    Rows are decoded with the list_campaigns column specs (see typed_columns).
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        start_date: First date (inclusive)
+        end_date: Last date (inclusive)
+
+    Returns:
+        pandas.DataFrame: One row per campaign and date, micros kept as int64
+    """
+    from list_campaigns import campaign_frame, campaign_specs
+
+    ga_service = client.get_service("GoogleAdsService")
+    specs = [("date", "segments.date", "str")] + campaign_specs(_COLUMNS[2:])
+
+    select = ",\n            ".join(dict.fromkeys(field for _, field, _ in specs))
+    query = f"""
+        SELECT
+            {select}
+        FROM campaign
+        WHERE campaign.status != 'REMOVED'
+            AND segments.date BETWEEN '{start_date.isoformat()}' AND '{end_date.isoformat()}'
+    """
+
+    return campaign_frame(read_columns(ga_service, customer_id, query, specs))
+
+
+def fetch_campaign_attributes(client, customer_id):
+    """
+    Fetch current campaign attributes without metrics.
+
+    No date segment or metric is selected, so the query returns one small
+    row per campaign whether or not it spent in the cached window.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+
+    Returns:
+        pandas.DataFrame: campaign_id plus the attribute columns of a daily row
+    """
+    from list_campaigns import campaign_frame, campaign_specs
+
+    ga_service = client.get_service("GoogleAdsService")
+    plan = plan_campaign_query(["campaign_id", *_ATTRIBUTE_COLUMNS], include_metrics=False)
+
+    return campaign_frame(read_columns(ga_service, customer_id, plan.query(), campaign_specs(plan.columns)))
+
+
+def refresh_cache(client, customer_id, cache, start_date, end_date, today=None):
+    """
+    Fetch only the missing or still-mutable days of a window into the cache.
+
+    Returns:
+        int: Number of days fetched from the API
+    """
+    missing = cache.missing_dates(customer_id, start_date, end_date, today=today)
+
+    for run_start, run_end in _date_runs(missing):
+        rows = fetch_daily_metrics(client, customer_id, run_start, run_end)
+        run_dates = [run_start + timedelta(days=i) for i in range((run_end - run_start).days + 1)]
+        cache.store(customer_id, run_dates, rows)
+
+    total_days = (end_date - start_date).days + 1
+    logger.info(f"Metrics cache for {customer_id}: fetched {len(missing)}/{total_days} days")
+    return len(missing)
+
+
+def list_campaigns_cached(client, customer_id, cache, days_back=30):
+    """
+    Cached equivalent of list_campaigns(include_metrics=True).
+
+    Metrics come from the cache; status and budget are fetched fresh (see
+    fetch_campaign_attributes).
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        cache: MetricsCache instance
+        days_back: Number of days to look back for metrics
+
+    Returns:
+        pandas.DataFrame: Campaign data aggregated over the window
+    """
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days_back)
+
+    refresh_cache(client, customer_id, cache, start_date, end_date, today=end_date)
+    attributes = fetch_campaign_attributes(client, customer_id)
+    return cache.aggregate(customer_id, start_date, end_date, attributes=attributes)
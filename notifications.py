@@ -0,0 +1,194 @@
+"""
+Notification Dispatcher
+Empire Amplify - Automation Rules
+
+Non-blocking Slack notifications for automation runs:
+- Messages are queued and posted by a background thread
+- One pooled HTTP session, request timeouts, retry with backoff
+- A run's actions are coalesced into one digest (chunked if too long)
+- Pending messages are flushed at process exit
+"""
+
+import atexit
+import os
+import queue
+import random
+import threading
+import time
+
+from loguru import logger
+
+from instrumentation import get_metrics
+
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# Slack truncates long messages; keep each digest chunk well under the limit
+MAX_MESSAGE_CHARS = 3500
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Background-queue Slack webhook sender."""
+
+    def __init__(
+        self,
+        webhook_url=None,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        max_message_chars=MAX_MESSAGE_CHARS,
+    ):
+        self.webhook_url = webhook_url if webhook_url is not None else os.getenv("SLACK_WEBHOOK_URL")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_message_chars = max_message_chars
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+            self._thread = threading.Thread(target=self._worker, args=(session,), name="notification-dispatcher", daemon=True)
+            self._thread.start()
+
+    def send(self, message):
+        """Queue a message; returns immediately."""
+        if not self.webhook_url:
+            return
+
+        self._ensure_worker()
+        self._queue.put(message)
+
+    def send_digest(self, lines, title=None):
+        """
+        Queue a list of lines as one message, or several if it is too long.
+
+        Args:
+            lines: Message lines, e.g. one per applied action
+            title: Optional header repeated on every chunk
+        """
+        if not lines:
+            return
+
+        for chunk in chunk_lines(lines, self.max_message_chars, title=title):
+            self.send(chunk)
+
+    def flush(self):
+        """Block until every queued message has been sent or given up on."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout=30):
+        """Flush pending messages and stop the worker thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+
+        if thread is None or not thread.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _worker(self, session):
+        try:
+            while True:
+                message = self._queue.get()
+                try:
+                    if message is _STOP:
+                        return
+                    self._post(session, message)
+                finally:
+                    self._queue.task_done()
+        finally:
+            session.close()
+
+    def _post(self, session, message):
+        with get_metrics().span("notification"):
+            sent = self._send_with_retries(session, message)
+        get_metrics().increment("notifications", status="sent" if sent else "failed")
+
+    def _send_with_retries(self, session, message):
+        import requests
+
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * (2**attempt) * (0.5 + random.random())
+
+            try:
+                response = session.post(self.webhook_url, json={"text": message}, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if response.status_code < 400:
+                    logger.info("Slack notification sent")
+                    return True
+
+                error = f"HTTP {response.status_code}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+
+                retry_after = response.headers.get("Retry-After")
+                if retry_after:
+                    try:
+                        delay = float(retry_after)
+                    except ValueError:
+                        pass
+
+            if attempt < self.max_retries:
+                time.sleep(delay)
+
+        logger.warning(f"Failed to send Slack notification: {error}")
+        return False
+
+
+def chunk_lines(lines, max_chars, title=None):
+    """
+    Join lines into messages of at most max_chars characters.
+
+    Lines are never split; a single over-long line becomes its own message.
+    """
+    header = f"{title}\n" if title else ""
+    chunks = []
+    current = header
+
+    for line in lines:
+        if current != header and len(current) + len(line) + 1 > max_chars:
+            chunks.append(current.rstrip("\n"))
+            current = header
+        current += f"{line}\n"
+
+    if current != header:
+        chunks.append(current.rstrip("\n"))
+
+    return chunks
+
+
+_default_dispatcher = None
+_default_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Return the process-wide dispatcher (created on first use)."""
+    global _default_dispatcher
+
+    with _default_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = NotificationDispatcher()
+        return _default_dispatcher
@@ -0,0 +1,262 @@
+"""
+Parallel Rule Evaluation
+Empire Amplify - Automation Rules
+
+Evaluates a combined multi-account frame on a process pool:
+- The frame is partitioned by customer_id and its columns are written once
+  to a memory-mapped file in shared memory (/dev/shm where available):
+  numeric columns as raw arrays, categoricals as codes, strings as UTF-8
+  bytes plus offsets. Workers map the file, so no DataFrame is pickled
+- Each task evaluates a contiguous run of accounts, with each account's
+  rule overrides, and (unless disabled) computes its performance summary
+- Actions and summaries are merged in customer order, so the result does
+  not depend on how tasks were scheduled
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from loguru import logger
+
+# Below this many rows per process, evaluating in-process is faster than starting a pool
+MIN_ROWS_PER_PROCESS = 20_000
+
+# Tasks per process; more tasks balance uneven account sizes better
+TASKS_PER_PROCESS = 4
+
+_ALIGNMENT = 64
+
+
+class SharedFrame:
+    """
+    Column data of a DataFrame in one memory-mapped file.
+
+    Args:
+        path: File holding the column buffers
+        spec: Picklable column layout from create()
+        length: Number of rows
+    """
+
+    def __init__(self, path, spec, length):
+        self.path = path
+        self.spec = spec
+        self.length = length
+
+    @classmethod
+    def create(cls, df, directory):
+        """Write every column of df to a new file in directory."""
+        import pandas as pd
+
+        buffers = []
+        spec = []
+        offset = 0
+
+        def add(array):
+            nonlocal offset
+            array = np.ascontiguousarray(array)
+            start = offset
+            buffers.append((start, array))
+            offset = start + array.nbytes
+            offset += -offset % _ALIGNMENT
+            return (start, array.dtype.str, len(array))
+
+        for column in df.columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                spec.append((column, "category", add(series.cat.codes.to_numpy()), list(series.cat.categories)))
+            elif series.dtype.kind in "biuf":
+                spec.append((column, "array", add(series.to_numpy()), None))
+            else:
+                missing = series.isna().to_numpy()
+                values = series.where(~missing, "").astype(str).tolist()
+                text = "".join(values)
+                data = text.encode()
+                # For ASCII text byte offsets equal character offsets, so no per-value encode is needed
+                lengths = map(len, values) if len(data) == len(text) else (len(value.encode()) for value in values)
+                offsets = np.zeros(len(values) + 1, dtype=np.int64)
+                offsets[1:] = np.cumsum(np.fromiter(lengths, dtype=np.int64, count=len(values)))
+                blob = np.frombuffer(data, dtype=np.uint8)
+                spec.append((column, "string", add(blob), (add(offsets), add(missing) if missing.any() else None)))
+
+        path = os.path.join(directory, "frame.bin")
+        with open(path, "wb") as f:
+            f.truncate(max(offset, 1))
+            for start, array in buffers:
+                f.seek(start)
+                f.write(array.tobytes())
+
+        return cls(path, spec, len(df))
+
+    def open(self):
+        """Map the file read-only and return an accessor for row ranges."""
+        return _MappedFrame(self)
+
+
+class _MappedFrame:
+    """Read-only views over a SharedFrame file."""
+
+    def __init__(self, shared):
+        self.spec = shared.spec
+        self.data = np.memmap(shared.path, dtype=np.uint8, mode="r")
+
+    def _view(self, layout):
+        start, dtype, length = layout
+        dtype = np.dtype(dtype)
+        end = start + dtype.itemsize * length
+        return self.data[start:end].view(dtype)
+
+    def rows(self, start, stop):
+        """DataFrame of rows [start, stop); only those rows are copied out of the mapping."""
+        import pandas as pd
+
+        columns = {}
+        for column, kind, layout, extra in self.spec:
+            if kind == "category":
+                codes = self._view(layout)[start:stop]
+                columns[column] = pd.Categorical.from_codes(codes, categories=extra)
+            elif kind == "array":
+                columns[column] = self._view(layout)[start:stop].copy()
+            else:
+                offsets_layout, missing_layout = extra
+                blob = self._view(layout)
+                upper = stop + 1
+                offsets = self._view(offsets_layout)[start:upper]
+                first, last = offsets[0], offsets[-1]
+                raw = blob[first:last].tobytes()
+                text = raw.decode()
+                if len(text) != len(raw):
+                    text = raw
+                bounds = (offsets - first).tolist()
+                values = [text[begin:end] for begin, end in zip(bounds[:-1], bounds[1:])]
+                if text is raw:
+                    values = [value.decode() for value in values]
+                if missing_layout is not None:
+                    missing = self._view(missing_layout)[start:stop]
+                    values = [None if empty else value for value, empty in zip(values, missing)]
+                columns[column] = values
+
+        return pd.DataFrame(columns)
+
+
+def partition_by_customer(df, column="customer_id"):
+    """
+    Order rows by account (in order of first appearance) and find each account's row range.
+
+    Returns:
+        tuple: (reordered DataFrame, list of (customer_id, start, stop))
+    """
+    import pandas as pd
+
+    codes, customers = pd.factorize(df[column], sort=False)
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=len(customers))
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+
+    partitions = [(str(customer), int(bounds[i]), int(bounds[i + 1])) for i, customer in enumerate(customers)]
+    return df.iloc[order].reset_index(drop=True), partitions
+
+
+def _plan_tasks(partitions, processes):
+    """Group consecutive accounts into tasks of roughly equal row counts."""
+    total = sum(stop - start for _, start, stop in partitions)
+    target = max(1, total // max(1, processes * TASKS_PER_PROCESS))
+
+    tasks = []
+    current = []
+    rows = 0
+    for partition in partitions:
+        current.append(partition)
+        rows += partition[2] - partition[1]
+        if rows >= target:
+            tasks.append(current)
+            current = []
+            rows = 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def _evaluate_partition(frame, customer_id, rules, summaries=True):
+    from automation_rules import evaluate_campaigns
+    from list_campaigns import get_campaign_performance_summary
+
+    actions = evaluate_campaigns(frame, rules=rules, customer_id=customer_id)
+    return customer_id, actions, get_campaign_performance_summary(frame) if summaries else None
+
+
+# Per-process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(shared, rules, summaries):
+    _worker["frame"] = shared.open()
+    _worker["rules"] = rules
+    _worker["summaries"] = summaries
+
+
+def _evaluate_task(task):
+    frame = _worker["frame"]
+    return [
+        _evaluate_partition(frame.rows(start, stop), customer_id, _worker["rules"], _worker["summaries"])
+        for customer_id, start, stop in task
+    ]
+
+
+def evaluate_portfolio(df, rules=None, processes=None, column="customer_id", summaries=True):
+    """
+    Evaluate rules and summaries per account over a combined frame.
+
+    Args:
+        df: Campaign frame for many accounts with a customer_id column
+        rules: Rule set definition (default: built from RULES); per-account
+            overrides apply to each partition
+        processes: Worker processes (default: os.cpu_count()); small frames
+            and processes=1 are evaluated in-process
+        column: Column holding the account ID
+        summaries: Also compute performance summaries; callers that only need
+            actions save the work and the transfer back from the workers
+
+    Returns:
+        dict: "actions" (customer_id -> actions), "summaries" (customer_id ->
+        summary) and "summary" (all accounts), each in customer order; only
+        "actions" with summaries=False
+    """
+    from list_campaigns import merge_performance_summaries
+
+    processes = processes or os.cpu_count() or 1
+    df, partitions = partition_by_customer(df, column)
+    frame = df.drop(columns=[column])
+    processes = max(1, min(processes, len(partitions), len(frame) // MIN_ROWS_PER_PROCESS))
+
+    if processes == 1:
+        results = [
+            _evaluate_partition(frame.iloc[start:stop].reset_index(drop=True), customer_id, rules, summaries)
+            for customer_id, start, stop in partitions
+        ]
+    else:
+        directory = tempfile.mkdtemp(prefix="amplify-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        try:
+            shared = SharedFrame.create(frame, directory)
+            tasks = _plan_tasks(partitions, processes)
+            logger.info(f"Evaluating {len(partitions)} accounts ({len(frame)} rows) on {processes} processes")
+
+            with ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_worker, initargs=(shared, rules, summaries)
+            ) as pool:
+                results = [result for task_results in pool.map(_evaluate_task, tasks) for result in task_results]
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    actions = {customer_id: customer_actions for customer_id, customer_actions, _ in results}
+    if not summaries:
+        return {"actions": actions}
+
+    account_summaries = {customer_id: summary for customer_id, _, summary in results}
+    return {
+        "actions": actions,
+        "summaries": account_summaries,
+        "summary": merge_performance_summaries(account_summaries.values()),
+    }
@@ -0,0 +1,277 @@
+"""
+Campaign Query Planner
+Empire Amplify - Campaign Management
+
+Builds the campaign GAQL query from the columns a caller actually reads:
+- SELECT only the fields behind the requested frame columns
+- Push rule-set filters into WHERE: skip_if thresholds on API metrics
+  (e.g. "cost < 50" becomes metrics.cost_micros >= 50000000) and
+  campaign statuses
+- Cache the query template per shape (columns, predicates, statuses), so
+  repeated runs only fill in the date range
+- Apply the same plan locally to frames that did not come from the query
+  (e.g. aggregated from the metrics cache)
+
+rule_projection() derives the columns and predicates from a rule set, so
+rule runs download and decode only what the rules and apply path need.
+"""
+
+import operator
+import re
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+from loguru import logger
+
+# Frame columns in list_campaigns order, with the GAQL field each is read from
+COLUMN_FIELDS = {
+    "campaign_id": "campaign.id",
+    "campaign_name": "campaign.name",
+    "status": "campaign.status",
+    "channel_type": "campaign.advertising_channel_type",
+    "bidding_strategy": "campaign.bidding_strategy_type",
+    "daily_budget": "campaign_budget.amount_micros",
+    "budget_micros": "campaign_budget.amount_micros",
+    "budget_resource_name": "campaign_budget.resource_name",
+    "budget_shared": "campaign_budget.explicitly_shared",
+    "impressions": "metrics.impressions",
+    "clicks": "metrics.clicks",
+    "cost": "metrics.cost_micros",
+    "cost_micros": "metrics.cost_micros",
+    "conversions": "metrics.conversions",
+    "conversion_value": "metrics.conversions_value",
+    "ctr": "metrics.ctr",
+    "avg_cpc": "metrics.average_cpc",
+}
+
+ALL_COLUMNS = tuple(COLUMN_FIELDS)
+METRIC_COLUMNS = tuple(column for column, field in COLUMN_FIELDS.items() if field.startswith("metrics."))
+
+# Frame value = GAQL value / scale, for columns whose predicates can run server-side
+PREDICATE_SCALES = {
+    "daily_budget": 1_000_000,
+    "budget_micros": 1,
+    "impressions": 1,
+    "clicks": 1,
+    "cost": 1_000_000,
+    "cost_micros": 1,
+    "conversions": 1,
+    "conversion_value": 1,
+    "ctr": 0.01,
+    "avg_cpc": 1_000_000,
+}
+
+# Columns derived metrics (see rule_engine.DERIVED_METRICS) are computed from
+DERIVED_COLUMNS = {"cpa": ("cost", "conversions"), "roas": ("conversion_value", "cost")}
+
+# Columns the apply path reads besides the rule conditions
+# (paused filter, budget index for INCREASE_BUDGET, action names)
+APPLY_COLUMNS = ("campaign_id", "campaign_name", "status", "budget_resource_name", "budget_shared")
+
+# INT64 fields; predicates on them need integer literals
+_INTEGER_FIELDS = {"campaign_budget.amount_micros", "metrics.impressions", "metrics.clicks", "metrics.cost_micros"}
+
+_NEGATED = {">": "<=", ">=": "<", "<": ">=", "<=": ">", "==": "!=", "!=": "="}
+
+_OPERATORS = {"=": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# "<field> <operator> <literal>", the shape push_down() produces
+_SIMPLE_PREDICATE = re.compile(r"^\s*([a-z_.]+)\s*(!=|>=|<=|=|>|<)\s*('[^']*'|-?[\d.]+(?:e[-+]?\d+)?)\s*$")
+
+_PLAN_CACHE = {}
+_PLAN_CACHE_LOCK = threading.Lock()
+
+
+class CampaignQueryPlan:
+    """
+    A campaign query for one shape of columns and filters.
+
+    Args:
+        columns: Frame columns to fetch, in list_campaigns order
+        predicates: GAQL WHERE predicates (strings), ANDed
+        statuses: Campaign statuses to fetch (None: everything but REMOVED)
+        include_metrics: Whether the query covers a date range of metrics
+    """
+
+    def __init__(self, columns, predicates=(), statuses=None, include_metrics=True):
+        self.columns = columns
+        self.predicates = predicates
+        self.statuses = statuses
+        self.include_metrics = include_metrics
+        self.fields = tuple(dict.fromkeys(COLUMN_FIELDS[column] for column in columns))
+
+        if statuses:
+            where = [f"campaign.status IN ({', '.join(repr(str(status)) for status in statuses)})"]
+        else:
+            where = ["campaign.status != 'REMOVED'"]
+        where += list(predicates)
+        if include_metrics:
+            where.append("segments.date BETWEEN '{start}' AND '{end}'")
+
+        select = ",\n            ".join(self.fields)
+        conditions = "\n            AND ".join(where)
+        self.template = f"""
+        SELECT
+            {select}
+        FROM campaign
+        WHERE {conditions}
+    """
+
+    def query(self, days_back=30, end_date=None):
+        """GAQL query for the last days_back days."""
+        if not self.include_metrics:
+            return self.template
+        end_date = end_date or datetime.now()
+        start_date = end_date - timedelta(days=days_back)
+        return self.template.format(start=start_date.strftime("%Y-%m-%d"), end=end_date.strftime("%Y-%m-%d"))
+
+    def filter(self, df):
+        """
+        Apply the plan's statuses, predicates and columns to a local frame.
+
+        Gives a frame built without the query (e.g. from the metrics cache)
+        the rows and columns the query would have returned. Metric predicates
+        compare the frame's window totals, as GAQL does over the date range.
+
+        Args:
+            df: Frame with list_campaigns columns
+
+        Returns:
+            pandas.DataFrame: Matching rows, projected to the plan's columns
+
+        Raises:
+            ValueError: If a predicate is not a simple comparison on a
+                planned field and cannot be applied locally
+        """
+        if df.empty:
+            return df
+
+        mask = np.ones(len(df), dtype=bool)
+        statuses = self.statuses or ()
+        if statuses:
+            mask &= df["status"].astype(str).isin([str(status) for status in statuses]).to_numpy()
+        else:
+            mask &= (df["status"].astype(str) != "REMOVED").to_numpy()
+        for predicate in self.predicates:
+            mask &= _local_predicate(df, predicate)
+
+        return df.loc[mask, list(self.columns)].reset_index(drop=True)
+
+
+def _local_predicate(df, predicate):
+    """Boolean mask of the rows of df that satisfy a GAQL predicate."""
+    match = _SIMPLE_PREDICATE.match(predicate)
+    field = match and match.group(1)
+    # Prefer a column in the field's own units, e.g. cost_micros over cost
+    columns = sorted(
+        (column for column, column_field in COLUMN_FIELDS.items() if column_field == field and column in df.columns),
+        key=lambda column: PREDICATE_SCALES.get(column, 1) != 1,
+    )
+    if not columns:
+        raise ValueError(f"Cannot apply predicate to a local frame: {predicate}")
+
+    column = columns[0]
+    literal = match.group(3)
+    if literal.startswith("'"):
+        values, literal = df[column].astype(str).to_numpy(), literal[1:-1]
+    else:
+        values, literal = df[column].to_numpy(dtype=np.float64) * PREDICATE_SCALES.get(column, 1), float(literal)
+    return np.asarray(_OPERATORS[match.group(2)](values, literal), dtype=bool)
+
+
+def plan_campaign_query(columns=None, predicates=(), statuses=None, include_metrics=True):
+    """
+    Plan (or reuse the cached plan of) a campaign query.
+
+    Args:
+        columns: Frame columns to fetch (default: all); campaign_id is always fetched
+        predicates: GAQL WHERE predicates, e.g. from rule_projection()
+        statuses: Campaign statuses to fetch (default: everything but REMOVED)
+        include_metrics: Whether to select metrics over a date range
+
+    Returns:
+        CampaignQueryPlan: Plan for this shape
+    """
+    requested = set(columns or ALL_COLUMNS) | {"campaign_id"}
+    unknown = requested - set(COLUMN_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown campaign columns: {sorted(unknown)}")
+    if not include_metrics:
+        requested -= set(METRIC_COLUMNS)
+        if predicates:
+            raise ValueError("Metric predicates need include_metrics=True")
+
+    shape = (
+        tuple(column for column in ALL_COLUMNS if column in requested),
+        tuple(predicates),
+        tuple(statuses) if statuses else None,
+        include_metrics,
+    )
+
+    with _PLAN_CACHE_LOCK:
+        plan = _PLAN_CACHE.get(shape)
+        if plan is None:
+            plan = CampaignQueryPlan(*shape)
+            _PLAN_CACHE[shape] = plan
+            logger.debug(f"Planned campaign query: {len(plan.fields)} fields, {len(plan.predicates)} pushed-down predicates")
+
+    return plan
+
+
+def push_down(condition):
+    """
+    GAQL predicate keeping the rows a skip_if condition does not skip.
+
+    Args:
+        condition: (metric, operator, value) from rule_engine.parse_condition
+
+    Returns:
+        str: Predicate, or None if the condition cannot be filtered
+        server-side (it is still applied locally by the rule engine)
+    """
+    metric, op, value = condition
+    scale = PREDICATE_SCALES.get(metric)
+    if scale is None:
+        return None
+
+    field = COLUMN_FIELDS[metric]
+    value = value * scale
+    if field in _INTEGER_FIELDS:
+        if abs(value - round(value)) > 1e-6:
+            return None
+        literal = str(int(round(value)))
+    else:
+        literal = repr(float(value))
+    return f"{field} {_NEGATED[op]} {literal}"
+
+
+def rule_projection(definition, customer_id=None):
+    """
+    Columns, predicates and statuses a rule run needs for one account.
+
+    Args:
+        definition: Rule set definition
+        customer_id: Account whose overrides apply, if any
+
+    Returns:
+        tuple: (columns, predicates, statuses) for plan_campaign_query
+    """
+    from rule_engine import compile_rules
+
+    plan = compile_rules(definition, customer_id)
+    metrics = {metric for metric, _, _ in plan.skip_conditions}
+
+    for rule in plan.rules:
+        metrics.update(metric for metric, _, _ in rule.conditions)
+        metrics.update(field for field in rule.reason_fields if field not in rule.params)
+        if rule.action == "INCREASE_BUDGET":
+            metrics.add("daily_budget")
+
+    columns = set(APPLY_COLUMNS)
+    for metric in metrics:
+        columns.update(DERIVED_COLUMNS.get(metric, (metric,)))
+    columns &= set(COLUMN_FIELDS)
+
+    predicates = [predicate for predicate in map(push_down, plan.skip_conditions) if predicate]
+    return columns, predicates, plan.statuses
@@ -0,0 +1,292 @@
+"""
+Segmented Performance Reporting
+Empire Amplify - Campaign Management
+
+Fetches segmented performance data once per account and serves rollups
+locally, without going back to the API:
+- Levels: campaign, ad group, keyword
+- Segments: date, device, ad network
+- Compact typed frames: categorical dimensions, int64 micros, datetime64 dates
+- Precomputed rollups (campaign x day, account x week, ...) plus cached
+  ad-hoc rollups by any dimensions and time grain
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from loguru import logger
+
+from typed_columns import read_columns
+
+# Metric columns shared by every level (stored as sums; rates are derived)
+METRIC_COLUMNS = ("impressions", "clicks", "cost_micros", "conversions", "conversion_value")
+
+SEGMENT_FIELDS = {
+    "date": ("segments.date", "date"),
+    "device": ("segments.device", "enum"),
+    "ad_network_type": ("segments.ad_network_type", "enum"),
+}
+
+# Per level: FROM resource and (column, GAQL field, kind) for its dimensions
+LEVELS = {
+    "campaign": (
+        "campaign",
+        [
+            ("campaign_id", "campaign.id", "int"),
+            ("campaign_name", "campaign.name", "category"),
+        ],
+    ),
+    "ad_group": (
+        "ad_group",
+        [
+            ("campaign_id", "campaign.id", "int"),
+            ("ad_group_id", "ad_group.id", "int"),
+            ("ad_group_name", "ad_group.name", "category"),
+        ],
+    ),
+    "keyword": (
+        "keyword_view",
+        [
+            ("campaign_id", "campaign.id", "int"),
+            ("ad_group_id", "ad_group.id", "int"),
+            ("criterion_id", "ad_group_criterion.criterion_id", "int"),
+            ("keyword_text", "ad_group_criterion.keyword.text", "category"),
+            ("match_type", "ad_group_criterion.keyword.match_type", "enum"),
+        ],
+    ),
+}
+
+_METRIC_FIELDS = [
+    ("impressions", "metrics.impressions", "int"),
+    ("clicks", "metrics.clicks", "int"),
+    ("cost_micros", "metrics.cost_micros", "int"),
+    ("conversions", "metrics.conversions", "float"),
+    ("conversion_value", "metrics.conversions_value", "float"),
+]
+
+# Rollups built up front by SegmentedReport.precompute()
+STANDARD_ROLLUPS = {
+    "campaign_day": (("campaign_id",), "day"),
+    "campaign_week": (("campaign_id",), "week"),
+    "account_day": (("customer_id",), "day"),
+    "account_week": (("customer_id",), "week"),
+    "campaign_device": (("campaign_id", "device"), None),
+    "account_network": (("customer_id", "ad_network_type"), None),
+}
+
+
+def build_report_query(level="campaign", segments=("date", "device", "ad_network_type"), days_back=30):
+    """
+    Build the GAQL query for a segmented report.
+
+    Args:
+        level: "campaign", "ad_group" or "keyword"
+        segments: Segment names from SEGMENT_FIELDS
+        days_back: Number of days to look back
+
+    Returns:
+        tuple: (query, column specs in SELECT order)
+    """
+    resource, dimensions = LEVELS[level]
+    specs = list(dimensions) + [(name, SEGMENT_FIELDS[name][0], SEGMENT_FIELDS[name][1]) for name in segments]
+    specs += _METRIC_FIELDS
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days_back)
+
+    query = f"""
+        SELECT
+            {', '.join(field for _, field, _ in specs)}
+        FROM {resource}
+        WHERE segments.date BETWEEN '{start_date.strftime('%Y-%m-%d')}' AND '{end_date.strftime('%Y-%m-%d')}'
+    """
+
+    if level in ("ad_group", "keyword"):
+        query += "    AND ad_group.status != 'REMOVED'\n"
+
+    return query, specs
+
+
+def fetch_segmented_report(
+    client, customer_id, level="campaign", segments=("date", "device", "ad_network_type"), days_back=30
+):
+    """
+    Stream a segmented report into a compact typed DataFrame.
+
+    Args:
+        client: Google Ads client
+        customer_id: Customer ID to query
+        level: "campaign", "ad_group" or "keyword"
+        segments: Segment names from SEGMENT_FIELDS
+        days_back: Number of days to look back
+
+    Returns:
+        pandas.DataFrame: One row per entity and segment combination, with
+        categorical dimensions and int64 micros
+    """
+    import pandas as pd
+
+    ga_service = client.get_service("GoogleAdsService")
+    query, specs = build_report_query(level=level, segments=segments, days_back=days_back)
+
+    columns = read_columns(ga_service, customer_id, query, specs)
+    rows = len(columns)
+
+    frame = {"customer_id": pd.Categorical([str(customer_id)] * rows), **columns.to_columns()}
+
+    logger.info(f"Fetched {rows} {level} rows for customer {customer_id}")
+    return pd.DataFrame(frame)
+
+
+def add_derived_metrics(df):
+    """Add cost, CTR, average CPC, CPA and ROAS computed from summed columns."""
+    impressions = df["impressions"].to_numpy(dtype=np.float64)
+    clicks = df["clicks"].to_numpy(dtype=np.float64)
+    cost = df["cost_micros"].to_numpy(dtype=np.float64) / 1_000_000
+    conversions = df["conversions"].to_numpy(dtype=np.float64)
+    conversion_value = df["conversion_value"].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["cost"] = cost
+        df["ctr"] = np.where(impressions > 0, clicks / impressions * 100, 0.0)
+        df["avg_cpc"] = np.where(clicks > 0, cost / clicks, 0.0)
+        df["cpa"] = np.where(conversions > 0, cost / conversions, np.nan)
+        df["roas"] = np.where(cost > 0, conversion_value / cost, np.nan)
+
+    return df
+
+
+class SegmentedReport:
+    """
+    Segmented report frame with cached rollups.
+
+    Args:
+        frame: DataFrame from fetch_segmented_report (one or more accounts)
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._rollups = {}
+
+    @classmethod
+    def fetch(cls, client, customer_ids, level="campaign", segments=("date", "device", "ad_network_type"), days_back=30):
+        """Fetch one report per account and combine them."""
+        import pandas as pd
+        from pandas.api.types import union_categoricals
+
+        frames = [fetch_segmented_report(client, customer_id, level, segments, days_back) for customer_id in customer_ids]
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+
+        if len(frames) == 1:
+            return cls(frames[0])
+
+        # Keep dimension columns categorical across accounts
+        combined = pd.concat(frames, ignore_index=True)
+        for column in frames[0].columns:
+            if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+                combined[column] = union_categoricals([frame[column] for frame in frames])
+
+        return cls(combined)
+
+    def _time_key(self, grain):
+        dates = self.frame["date"].to_numpy(dtype="datetime64[D]")
+        if grain == "day":
+            return dates
+        if grain == "week":
+            # Weeks start on Monday (1970-01-01 was a Thursday)
+            days = dates.astype(np.int64)
+            return (days - (days + 3) % 7).astype("datetime64[D]")
+        if grain == "month":
+            return dates.astype("datetime64[M]").astype("datetime64[D]")
+        raise ValueError(f"Unknown time grain: {grain}")
+
+    def rollup(self, by, grain=None):
+        """
+        Aggregate metrics by dimensions and an optional time grain.
+
+        Results are cached, so repeated rollups are served from memory.
+
+        Args:
+            by: Dimension columns, e.g. ("campaign_id",) or ("customer_id", "device")
+            grain: None, "day", "week" or "month" (needs the date segment)
+
+        Returns:
+            pandas.DataFrame: Summed metrics plus derived rates
+        """
+        key = (tuple(by), grain)
+        if key in self._rollups:
+            return self._rollups[key]
+
+        keys = [self.frame[column] for column in by]
+        names = list(by)
+        if grain:
+            keys.append(self._time_key(grain))
+            names.append(grain)
+
+        grouped = self.frame[list(METRIC_COLUMNS)].groupby(keys, observed=True, sort=True).sum()
+        grouped.index.names = names
+        result = add_derived_metrics(grouped.reset_index())
+
+        self._rollups[key] = result
+        return result
+
+    def precompute(self, rollups=None):
+        """Build the standard rollups (or the given name -> (by, grain) mapping) up front."""
+        rollups = rollups or STANDARD_ROLLUPS
+        for by, grain in rollups.values():
+            if all(column in self.frame.columns for column in by) and (grain is None or "date" in self.frame.columns):
+                self.rollup(by, grain)
+        return self
+
+    def get(self, name):
+        """Return a standard rollup by name, e.g. "campaign_day" or "account_week"."""
+        by, grain = STANDARD_ROLLUPS[name]
+        return self.rollup(by, grain)
+
+    def totals(self):
+        """Account-wide totals and rates, like get_campaign_performance_summary."""
+        sums = {column: self.frame[column].sum() for column in METRIC_COLUMNS}
+        cost = sums["cost_micros"] / 1_000_000
+
+        return {
+            "total_spend": cost,
+            "total_impressions": int(sums["impressions"]),
+            "total_clicks": int(sums["clicks"]),
+            "total_conversions": float(sums["conversions"]),
+            "overall_ctr": sums["clicks"] / sums["impressions"] * 100 if sums["impressions"] else 0.0,
+            "cpa": cost / sums["conversions"] if sums["conversions"] else None,
+            "roas": sums["conversion_value"] / cost if cost else None,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from google_ads_client import get_customer_id, get_google_ads_client, handle_google_ads_exception
+
+    parser = argparse.ArgumentParser(description="Segmented performance report with local rollups")
+    parser.add_argument("--level", choices=sorted(LEVELS), default="campaign", help="Report level")
+    parser.add_argument("--days", type=int, default=30, help="Number of days to look back")
+    parser.add_argument("--rollup", choices=sorted(STANDARD_ROLLUPS), default="campaign_day", help="Rollup to print")
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
+    try:
+        client = get_google_ads_client()
+        report = SegmentedReport.fetch(client, [get_customer_id()], level=args.level, days_back=args.days).precompute()
+
+        print(f"\n📊 {args.rollup}:")
+        print(report.get(args.rollup).to_string(index=False))
+
+        print("\n📈 Totals:")
+        for key, value in report.totals().items():
+            if isinstance(value, float):
+                print(f"  {key}: {value:.2f}")
+            else:
+                print(f"  {key}: {value}")
+
+    except GoogleAdsException as ex:
+        handle_google_ads_exception(ex)
+    except Exception as e:
+        logger.error(f"Error: {e}")
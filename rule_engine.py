@@ -0,0 +1,466 @@
+"""
+Declarative Automation Rules
+Empire Amplify - Automation Rules
+
+Rules are defined in YAML or JSON instead of code:
+- Conditions over metric columns, e.g. "cpa > max_cpa", with named params
+- Priorities (lowest first; the first matching rule wins per campaign)
+- PAUSE and INCREASE_BUDGET actions
+- Campaign name include/exclude filters (case-insensitive "contains")
+- Campaign status filter (statuses: [ENABLED])
+- Per-account overrides of params, filters and enabled state
+
+Definitions are compiled once into vectorized column predicates and the
+compiled plans are cached, so a whole rule set is evaluated over a frame
+with array operations instead of per-row branching.
+
+Example (see rules.example.yaml):
+
+    skip_if: ["cost < 50"]
+    rules:
+      - name: pause_high_cpa
+        priority: 10
+        action: PAUSE
+        when: ["cpa > max_cpa"]
+        params: {max_cpa: 100}
+        reason: "CPA ${cpa:.2f} > ${max_cpa}"
+    accounts:
+      "1234567890":
+        rules:
+          pause_high_cpa: {params: {max_cpa: 150}}
+"""
+
+import json
+import operator
+import re
+import threading
+from string import Formatter
+
+import numpy as np
+from loguru import logger
+
+ACTIONS = ("PAUSE", "INCREASE_BUDGET")
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_CONDITION = re.compile(r"^\s*([A-Za-z_]\w*)\s*(>=|<=|==|!=|>|<)\s*(\S+)\s*$")
+
+_PLAN_CACHE = {}
+_PLAN_CACHE_LOCK = threading.Lock()
+
+
+class RuleDefinitionError(ValueError):
+    """Raised when a rule definition cannot be compiled."""
+
+
+def _metric_column(df, column):
+    """Return a metric column as a float64 array, or zeros if the column is missing."""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.float64)
+    return df[column].to_numpy(dtype=np.float64)
+
+
+def _cpa(frame):
+    conversions = frame.metric("conversions")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(conversions > 0, frame.metric("cost") / conversions, np.nan)
+
+
+def _roas(frame):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return frame.metric("conversion_value") / frame.metric("cost")
+
+
+# Metrics computed from other columns when the frame does not carry them
+DERIVED_METRICS = {"cpa": _cpa, "roas": _roas}
+
+
+class _FrameColumns:
+    """Per-evaluation cache of metric arrays, condition masks and name filters."""
+
+    def __init__(self, df):
+        self.df = df
+        self._metrics = {}
+        self._masks = {}
+        self._names = {}
+
+    def metric(self, name):
+        if name not in self._metrics:
+            if name not in self.df.columns and name in DERIVED_METRICS:
+                self._metrics[name] = DERIVED_METRICS[name](self)
+            else:
+                self._metrics[name] = _metric_column(self.df, name)
+        return self._metrics[name]
+
+    def condition(self, condition):
+        if condition not in self._masks:
+            metric, op, value = condition
+            with np.errstate(invalid="ignore"):
+                self._masks[condition] = OPERATORS[op](self.metric(metric), value)
+        return self._masks[condition]
+
+    def name_filter(self, include, exclude):
+        key = (include, exclude)
+        if key not in self._names:
+            self._names[key] = _name_mask(self.df, include, exclude)
+        return self._names[key]
+
+
+def _name_mask(df, include, exclude):
+    """Vectorized campaign name filter; None means no filtering."""
+    if not include and not exclude:
+        return None
+
+    import pandas as pd
+
+    names = df["campaign_name"] if "campaign_name" in df.columns else pd.Series([""] * len(df))
+    mask = np.ones(len(df), dtype=bool)
+
+    if include:
+        pattern = "|".join(re.escape(text) for text in include)
+        mask &= names.str.contains(pattern, case=False, regex=True, na=False).to_numpy(dtype=bool)
+    if exclude:
+        pattern = "|".join(re.escape(text) for text in exclude)
+        mask &= ~names.str.contains(pattern, case=False, regex=True, na=False).to_numpy(dtype=bool)
+
+    return mask
+
+
+def parse_condition(text, params=None):
+    """
+    Parse a condition such as "cpa > 100" or "cpa > max_cpa".
+
+    Args:
+        text: "<metric> <op> <number or param name>"
+        params: Named values the right-hand side may refer to
+
+    Returns:
+        tuple: (metric, operator, float value)
+    """
+    match = _CONDITION.match(str(text))
+    if not match:
+        raise RuleDefinitionError(f"Invalid condition: {text!r}")
+
+    metric, op, operand = match.groups()
+    params = params or {}
+
+    if operand in params:
+        value = params[operand]
+    else:
+        try:
+            value = float(operand)
+        except ValueError:
+            raise RuleDefinitionError(f"Unknown param {operand!r} in condition {text!r}")
+
+    return metric, op, float(value)
+
+
+def _filters(spec):
+    spec = spec or {}
+    include = tuple(str(text) for text in spec.get("include") or ())
+    exclude = tuple(str(text) for text in spec.get("exclude") or ())
+    return include, exclude
+
+
+class CompiledRule:
+    """One rule with its conditions parsed and params resolved."""
+
+    def __init__(self, definition, actions=ACTIONS):
+        self.name = definition.get("name")
+        if not self.name:
+            raise RuleDefinitionError(f"Rule without a name: {definition}")
+
+        self.action = str(definition.get("action", "")).upper()
+        if self.action not in actions:
+            raise RuleDefinitionError(f"Rule {self.name}: unknown action {definition.get('action')!r}")
+
+        self.priority = definition.get("priority", 100)
+        self.params = dict(definition.get("params") or {})
+        self.conditions = tuple(parse_condition(text, self.params) for text in definition.get("when") or ())
+        self.include, self.exclude = _filters(definition.get("campaigns"))
+        self.reason = definition.get("reason") or f"Rule {self.name}"
+        self.reason_fields = [field for _, field, _, _ in Formatter().parse(self.reason) if field]
+
+        if self.action == "INCREASE_BUDGET":
+            for param in ("percent", "max_budget"):
+                if param not in self.params:
+                    raise RuleDefinitionError(f"Rule {self.name}: INCREASE_BUDGET needs params.{param}")
+
+    def mask(self, frame, candidates):
+        """Campaigns (within candidates) this rule matches."""
+        mask = candidates.copy()
+
+        names = frame.name_filter(self.include, self.exclude)
+        if names is not None:
+            mask &= names
+
+        for condition in self.conditions:
+            if not mask.any():
+                break
+            mask &= frame.condition(condition)
+
+        return mask
+
+    def format_reason(self, frame, i):
+        values = dict(self.params)
+        for field in self.reason_fields:
+            if field not in values:
+                values[field] = frame.metric(field)[i]
+        return self.reason.format(**values)
+
+
+class RulePlan:
+    """
+    A compiled rule set, ready to evaluate campaign frames.
+
+    Args:
+        definition: Rule set dict (see module docstring)
+        customer_id: Account whose overrides to apply, if any
+        actions: Actions the rules may use (keyword_automation compiles
+            keyword and search-term rule sets with their own)
+    """
+
+    def __init__(self, definition, customer_id=None, actions=ACTIONS):
+        definition = resolve_account_overrides(definition, customer_id)
+
+        self.skip_conditions = tuple(parse_condition(text) for text in definition.get("skip_if") or ())
+        self.include, self.exclude = _filters(definition.get("campaigns"))
+        statuses = definition.get("statuses")
+        self.statuses = tuple(str(status).upper() for status in statuses) if statuses else None
+
+        rules = [CompiledRule(rule, actions) for rule in definition.get("rules") or () if rule.get("enabled", True)]
+        # Stable sort: rules with equal priority keep their file order
+        self.rules = sorted(rules, key=lambda rule: rule.priority)
+
+    def match(self, df):
+        """
+        Find the winning rule of every row.
+
+        Args:
+            df: DataFrame with metric columns
+
+        Returns:
+            tuple: (column cache for format_reason, positions of matched rows,
+            rule index per matched row, new budgets by INCREASE_BUDGET rule index)
+        """
+        frame = _FrameColumns(df)
+        if df.empty or not self.rules:
+            return frame, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), {}
+
+        candidates = np.ones(len(df), dtype=bool)
+
+        for condition in self.skip_conditions:
+            candidates &= ~frame.condition(condition)
+
+        names = frame.name_filter(self.include, self.exclude)
+        if names is not None:
+            candidates &= names
+
+        if self.statuses and "status" in df.columns:
+            candidates &= df["status"].isin(self.statuses).to_numpy(dtype=bool)
+
+        assigned = np.full(len(df), -1, dtype=np.int32)
+        new_budgets = {}
+
+        for index, rule in enumerate(self.rules):
+            if not candidates.any():
+                break
+
+            mask = rule.mask(frame, candidates)
+
+            if rule.action == "INCREASE_BUDGET":
+                current_budget = frame.metric("daily_budget")
+                new_budget = np.minimum(current_budget * (1 + rule.params["percent"] / 100), rule.params["max_budget"])
+                mask &= new_budget > current_budget
+                new_budgets[index] = new_budget
+
+            assigned[mask] = index
+            candidates &= ~mask
+
+        matched = np.flatnonzero(assigned >= 0)
+        return frame, matched, assigned[matched], new_budgets
+
+    def evaluate(self, df):
+        """
+        Evaluate the rule set over a campaign frame.
+
+        Args:
+            df: DataFrame with campaign metrics
+
+        Returns:
+            list: Recommended actions, in frame row order
+        """
+        frame, matched, rule_indexes, new_budgets = self.match(df)
+        if not len(matched):
+            return []
+
+        campaign_ids = df["campaign_id"].to_numpy()[matched].tolist()
+        campaign_names = df["campaign_name"].to_numpy()[matched].tolist()
+        current_budget = frame.metric("daily_budget") if new_budgets else None
+
+        actions = []
+        for i, index, campaign_id, campaign_name in zip(matched.tolist(), rule_indexes.tolist(), campaign_ids, campaign_names):
+            rule = self.rules[index]
+
+            action = {
+                "campaign_id": campaign_id,
+                "campaign_name": campaign_name,
+                "action": rule.action,
+                "reason": rule.format_reason(frame, i),
+            }
+            if rule.action == "INCREASE_BUDGET":
+                action["current_budget"] = float(current_budget[i])
+                action["new_budget"] = float(new_budgets[index][i])
+
+            actions.append(action)
+
+        return actions
+
+
+def resolve_account_overrides(definition, customer_id=None):
+    """
+    Merge an account's overrides into a rule set.
+
+    Account entries may replace skip_if, statuses and campaigns, and override
+    rules by name: params are merged, any other key (when, priority,
+    campaigns, enabled, ...) replaces the rule's value.
+
+    Args:
+        definition: Rule set dict
+        customer_id: Account to resolve for
+
+    Returns:
+        dict: Rule set without the accounts section
+    """
+    resolved = {key: value for key, value in definition.items() if key != "accounts"}
+    override = (definition.get("accounts") or {}).get(str(customer_id)) if customer_id is not None else None
+    if not override:
+        return resolved
+
+    for key in ("skip_if", "statuses", "campaigns"):
+        if key in override:
+            resolved[key] = override[key]
+
+    rule_overrides = override.get("rules") or {}
+    unknown = set(rule_overrides) - {rule.get("name") for rule in definition.get("rules") or ()}
+    if unknown:
+        raise RuleDefinitionError(f"Account {customer_id} overrides unknown rules: {sorted(unknown)}")
+
+    rules = []
+    for rule in definition.get("rules") or ():
+        changes = rule_overrides.get(rule.get("name"))
+        if changes:
+            rule = {**rule, **{key: value for key, value in changes.items() if key != "params"}}
+            rule["params"] = {**(rule.get("params") or {}), **(changes.get("params") or {})}
+        rules.append(rule)
+
+    resolved["rules"] = rules
+    return resolved
+
+
+def compile_rules(definition, customer_id=None, actions=ACTIONS):
+    """
+    Compile a rule set, reusing a cached plan for identical definitions.
+
+    Accounts without overrides share one plan.
+
+    Args:
+        definition: Rule set dict
+        customer_id: Account whose overrides to apply, if any
+        actions: Actions the rules may use
+
+    Returns:
+        RulePlan: Compiled plan
+    """
+    has_override = customer_id is not None and str(customer_id) in (definition.get("accounts") or {})
+    key = (json.dumps(definition, sort_keys=True, default=str), str(customer_id) if has_override else None, tuple(actions))
+
+    with _PLAN_CACHE_LOCK:
+        plan = _PLAN_CACHE.get(key)
+        if plan is None:
+            plan = RulePlan(definition, customer_id if has_override else None, actions)
+            _PLAN_CACHE[key] = plan
+            logger.debug(f"Compiled {len(plan.rules)} rules (account override: {has_override})")
+
+    return plan
+
+
+def load_rules(path):
+    """
+    Load a rule set from a YAML or JSON file.
+
+    Args:
+        path: .yaml, .yml or .json file
+
+    Returns:
+        dict: Rule set definition
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            definition = yaml.safe_load(f)
+        else:
+            definition = json.load(f)
+
+    if not isinstance(definition, dict) or not isinstance(definition.get("rules"), list):
+        raise RuleDefinitionError(f"{path}: expected a mapping with a 'rules' list")
+
+    # Fail fast on malformed rules and overrides
+    RulePlan(definition)
+    for customer_id in definition.get("accounts") or {}:
+        RulePlan(definition, customer_id)
+
+    return definition
+
+
+def rules_from_thresholds(thresholds):
+    """
+    Build the built-in rule set from a RULES-style thresholds dict.
+
+    Args:
+        thresholds: Dict with the automation_rules.RULES keys
+
+    Returns:
+        dict: Rule set definition
+    """
+    return {
+        "skip_if": [f"cost < {thresholds['min_spend_for_evaluation']}"],
+        "rules": [
+            {
+                "name": "pause_high_cpa",
+                "priority": 10,
+                "action": "PAUSE",
+                "when": ["cpa > max_cpa"],
+                "params": {"max_cpa": thresholds["pause_if_cpa_above"]},
+                "reason": "CPA ${cpa:.2f} > ${max_cpa}",
+            },
+            {
+                "name": "pause_low_ctr",
+                "priority": 20,
+                "action": "PAUSE",
+                "when": ["ctr < min_ctr"],
+                "params": {"min_ctr": thresholds["pause_if_ctr_below"]},
+                "reason": "CTR {ctr:.2f}% < {min_ctr}%",
+            },
+            {
+                "name": "increase_budget_high_roas",
+                "priority": 30,
+                "action": "INCREASE_BUDGET",
+                "when": ["conversions > 0", "conversion_value > 0", "roas > min_roas"],
+                "params": {
+                    "min_roas": thresholds["increase_budget_if_roas_above"],
+                    "percent": thresholds["budget_increase_percent"],
+                    "max_budget": thresholds["max_daily_budget"],
+                },
+                "reason": "ROAS {roas:.2f}x > {min_roas}x",
+            },
+        ],
+    }
@@ -0,0 +1,293 @@
+"""
+Automation Scheduler Daemon
+Empire Amplify - Automation Rules
+
+Long-running process that keeps one warm Google Ads client (with cached
+service stubs) and runs jobs on configurable cadences:
+- Rule evaluation (default: every 15 minutes)
+- Intraday budget pacing, if enabled (default: every 15 minutes)
+- Campaign performance report (default: daily at 06:00)
+
+A job that is still running when its next tick comes due is skipped, and
+SIGINT/SIGTERM stop the daemon once running jobs have finished.
+"""
+
+import signal
+import threading
+
+import schedule
+from loguru import logger
+
+from automation_rules import DEFAULT_MAX_WORKERS, run_automation_rules, run_automation_rules_for_accounts
+from budget_pacing import ProfileStore, run_pacing_for_accounts
+from change_detection import CampaignSnapshots
+from google_ads_client import (
+    CachedServiceClient,
+    get_customer_id,
+    get_google_ads_client,
+    get_login_customer_id,
+    handle_google_ads_exception,
+    list_child_accounts,
+)
+from instrumentation import get_metrics
+from list_campaigns import get_campaign_performance_summary, list_campaigns
+from metrics_cache import MetricsCache
+from notifications import get_dispatcher
+
+DEFAULT_RULES_EVERY_MINUTES = 15
+DEFAULT_PACING_EVERY_MINUTES = 15
+DEFAULT_REPORT_AT = "06:00"
+
+
+class ScheduledJob:
+    """Runs a function on a worker thread, skipping ticks while a previous run is in progress."""
+
+    def __init__(self, name, func, on_finish=None):
+        self.name = name
+        self.func = func
+        self.on_finish = on_finish
+        self._running = threading.Lock()
+        self._thread = None
+
+    def __call__(self):
+        if not self._running.acquire(blocking=False):
+            logger.warning(f"Skipping {self.name}: previous run still in progress")
+            return False
+
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        from google.ads.googleads.errors import GoogleAdsException
+
+        try:
+            logger.info(f"Starting job: {self.name}")
+            with get_metrics().span("job", job=self.name):
+                self.func()
+            logger.info(f"Finished job: {self.name}")
+        except GoogleAdsException as ex:
+            handle_google_ads_exception(ex)
+        except Exception as e:
+            logger.error(f"Job {self.name} failed: {e}")
+        finally:
+            self._running.release()
+            if self.on_finish is not None:
+                self.on_finish()
+
+    def wait(self, timeout=None):
+        """Wait for the current run, if any, to finish."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+class AutomationDaemon:
+    """Scheduler loop around a single warm Google Ads client."""
+
+    def __init__(
+        self,
+        client=None,
+        dry_run=True,
+        all_accounts=False,
+        max_workers=DEFAULT_MAX_WORKERS,
+        cache_path=None,
+        rules_path=None,
+        anomalies=False,
+        ledger_path=None,
+        snapshot_path=None,
+        metrics_path=None,
+        metrics_port=None,
+        rules_every_minutes=DEFAULT_RULES_EVERY_MINUTES,
+        report_at=DEFAULT_REPORT_AT,
+        pacing_path=None,
+        pacing_every_minutes=DEFAULT_PACING_EVERY_MINUTES,
+    ):
+        self.client = CachedServiceClient(client or get_google_ads_client())
+        self.dry_run = dry_run
+        self.all_accounts = all_accounts
+        self.max_workers = max_workers
+        # One cache instance, so every job serializes on the same SQLite lock
+        self.cache = MetricsCache(cache_path) if cache_path else None
+        # Re-read on every run so rule edits apply without a restart
+        self.rules_path = rules_path
+        self.anomalies = anomalies
+        self.ledger_path = ledger_path
+        # Latest snapshots stay in memory, so diff mode reads the file once
+        self.snapshots = CampaignSnapshots(snapshot_path) if snapshot_path else None
+        self.metrics_path = metrics_path
+        self.metrics_port = metrics_port
+        # Hourly profiles stay in memory between pacing runs
+        self.pacing_store = ProfileStore(pacing_path) if pacing_path else None
+
+        self.scheduler = schedule.Scheduler()
+        self.stop_event = threading.Event()
+
+        self.rules_job = ScheduledJob("rules", self.run_rules, on_finish=self.write_metrics)
+        self.report_job = ScheduledJob("report", self.run_report, on_finish=self.write_metrics)
+        self.pacing_job = ScheduledJob("pacing", self.run_pacing, on_finish=self.write_metrics)
+
+        self.scheduler.every(rules_every_minutes).minutes.do(self.rules_job)
+        if self.pacing_store is not None:
+            self.scheduler.every(pacing_every_minutes).minutes.do(self.pacing_job)
+        if report_at:
+            self.scheduler.every().day.at(report_at).do(self.report_job)
+
+    def _customer_ids(self):
+        if self.all_accounts:
+            return list_child_accounts(self.client, get_login_customer_id())
+        return [get_customer_id()]
+
+    def run_rules(self):
+        """Evaluate (and optionally apply) automation rules."""
+        if self.all_accounts:
+            run_automation_rules_for_accounts(
+                dry_run=self.dry_run,
+                max_workers=self.max_workers,
+                client=self.client,
+                cache=self.cache,
+                rules_path=self.rules_path,
+                anomalies=self.anomalies,
+                ledger_path=self.ledger_path,
+                snapshots=self.snapshots,
+            )
+        else:
+            run_automation_rules(
+                dry_run=self.dry_run,
+                cache=self.cache,
+                client=self.client,
+                rules_path=self.rules_path,
+                anomalies=self.anomalies,
+                ledger_path=self.ledger_path,
+                snapshots=self.snapshots,
+            )
+
+    def run_pacing(self):
+        """Project today's spend and apply budget pacing actions."""
+        run_pacing_for_accounts(
+            dry_run=self.dry_run,
+            customer_ids=self._customer_ids(),
+            max_workers=self.max_workers,
+            client=self.client,
+            ledger_path=self.ledger_path,
+            store=self.pacing_store,
+        )
+
+    def run_report(self):
+        """Log a 30-day performance summary per account."""
+        for customer_id in self._customer_ids():
+            df = list_campaigns(self.client, customer_id, include_metrics=True, days_back=30, stream=True, cache=self.cache)
+            summary = get_campaign_performance_summary(df)
+
+            logger.info(f"📈 Performance Summary for {customer_id}:")
+            for key, value in summary.items():
+                if isinstance(value, float):
+                    logger.info(f"  {key}: {value:.2f}")
+                else:
+                    logger.info(f"  {key}: {value}")
+
+    def write_metrics(self):
+        """Refresh the Prometheus text file, if configured."""
+        if self.metrics_path:
+            try:
+                get_metrics().write_prometheus(self.metrics_path)
+            except OSError as e:
+                logger.warning(f"Could not write metrics to {self.metrics_path}: {e}")
+
+    def stop(self, *args):
+        """Request shutdown; running jobs are allowed to finish."""
+        logger.info("Shutdown requested")
+        self.stop_event.set()
+
+    def run(self, poll_seconds=1.0, run_immediately=True):
+        """
+        Run the scheduler loop until stop() or SIGINT/SIGTERM.
+
+        Args:
+            poll_seconds: How often pending jobs are checked
+            run_immediately: Run the rules job once at startup
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        logger.info(f"Automation daemon started (dry_run={self.dry_run}, all_accounts={self.all_accounts})")
+
+        server = get_metrics().serve(self.metrics_port) if self.metrics_port else None
+
+        if run_immediately:
+            self.rules_job()
+
+        while not self.stop_event.is_set():
+            self.scheduler.run_pending()
+            self.stop_event.wait(poll_seconds)
+
+        logger.info("Waiting for running jobs to finish")
+        self.rules_job.wait()
+        self.report_job.wait()
+        self.pacing_job.wait()
+        get_dispatcher().close()
+        if server is not None:
+            server.shutdown()
+        logger.info("Automation daemon stopped")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run Google Ads automation on a schedule")
+    parser.add_argument("--apply", action="store_true", help="Apply changes (default is dry run)")
+    parser.add_argument(
+        "--all-accounts", action="store_true", help="Run for every client account under GOOGLE_ADS_LOGIN_CUSTOMER_ID"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Accounts processed concurrently with --all-accounts"
+    )
+    parser.add_argument("--cache", metavar="PATH", help="SQLite metrics cache; only fetch missing or recent days")
+    parser.add_argument("--rules", metavar="PATH", help="YAML/JSON rule set, re-read on every run")
+    parser.add_argument("--anomalies", action="store_true", help="Alert on anomalies in daily metric series")
+    parser.add_argument("--ledger", metavar="PATH", help="SQLite action ledger; skip duplicates and enforce cooldowns")
+    parser.add_argument(
+        "--snapshots", metavar="PATH", help="SQLite campaign snapshots; only evaluate campaigns whose metrics changed"
+    )
+    parser.add_argument("--metrics", metavar="PATH", help="Prometheus text file refreshed after every job")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="Serve Prometheus metrics on localhost:PORT")
+    parser.add_argument(
+        "--rules-every", type=int, default=DEFAULT_RULES_EVERY_MINUTES, metavar="MINUTES", help="Rule evaluation cadence"
+    )
+    parser.add_argument("--pacing", metavar="PATH", help="Run intraday budget pacing with this SQLite profile store")
+    parser.add_argument(
+        "--pacing-every",
+        type=int,
+        default=DEFAULT_PACING_EVERY_MINUTES,
+        metavar="MINUTES",
+        help="Budget pacing cadence",
+    )
+    parser.add_argument(
+        "--report-at", default=DEFAULT_REPORT_AT, metavar="HH:MM", help="Daily report time (empty string disables)"
+    )
+    args = parser.parse_args()
+
+    from google.ads.googleads.errors import GoogleAdsException
+
+    try:
+        AutomationDaemon(
+            dry_run=not args.apply,
+            all_accounts=args.all_accounts,
+            max_workers=args.max_workers,
+            cache_path=args.cache,
+            rules_path=args.rules,
+            anomalies=args.anomalies,
+            ledger_path=args.ledger,
+            snapshot_path=args.snapshots,
+            metrics_path=args.metrics,
+            metrics_port=args.metrics_port,
+            rules_every_minutes=args.rules_every,
+            report_at=args.report_at,
+            pacing_path=args.pacing,
+            pacing_every_minutes=args.pacing_every,
+        ).run()
+    except GoogleAdsException as ex:
+        handle_google_ads_exception(ex)
+    except Exception as e:
+        logger.error(f"Error: {e}")
@@ -0,0 +1,154 @@
+"""
+Tests for the batched action applier
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _pause(campaign_id):
+    return {"campaign_id": campaign_id, "campaign_name": f"Campaign {campaign_id}", "action": "PAUSE", "reason": "CPA"}
+
+
+def _increase(campaign_id, **extra):
+    return {
+        "campaign_id": campaign_id,
+        "campaign_name": f"Campaign {campaign_id}",
+        "action": "INCREASE_BUDGET",
+        "reason": "ROAS",
+        "current_budget": 100.0,
+        "new_budget": 120.0,
+        **extra,
+    }
+
+
+@pytest.fixture
+def client():
+    """Mock client whose mutate responses report no partial failures."""
+    client = MagicMock()
+    client.get_type.side_effect = lambda name: MagicMock()
+    ok = SimpleNamespace(partial_failure_error=None)
+    client.get_service.return_value.mutate_campaigns.return_value = ok
+    client.get_service.return_value.mutate_campaign_budgets.return_value = ok
+    return client
+
+
+class TestApplyActionsBatched:
+    """Test batching and per-operation result mapping."""
+
+    def test_pause_actions_are_batched(self, client):
+        """Test PAUSE operations are grouped into batch_size mutate requests."""
+        from action_applier import apply_actions_batched
+
+        with patch("action_applier.build_pause_operation", side_effect=lambda c, cid, camp: camp):
+            results = apply_actions_batched(client, "123", [_pause(str(i)) for i in range(5)], batch_size=2)
+
+        calls = client.get_service.return_value.mutate_campaigns.call_args_list
+        assert [len(call.kwargs["request"].operations) for call in calls] == [2, 2, 1]
+        assert all(call.kwargs["request"].partial_failure for call in calls)
+        assert [r["status"] for r in results] == ["APPLIED"] * 5
+
+    def test_partial_failures_map_back_to_actions(self, client):
+        """Test a failed operation index marks only its own action as failed."""
+        from action_applier import apply_actions_batched
+
+        actions = [_pause("1"), _pause("2"), _pause("3")]
+        with patch("action_applier.build_pause_operation", side_effect=lambda c, cid, camp: camp), patch(
+            "action_applier.get_partial_failure_errors", return_value={1: "Campaign is removed"}
+        ):
+            results = apply_actions_batched(client, "123", actions)
+
+        assert [r["status"] for r in results] == ["APPLIED", "FAILED", "APPLIED"]
+        assert results[1]["error"] == "Campaign is removed"
+
+    def test_budget_actions_use_known_resource_names(self, client):
+        """Test budget operations skip the lookup when the resource name is already known."""
+        from action_applier import apply_actions_batched
+
+        actions = [_increase("1", budget_resource_name="customers/123/campaignBudgets/9"), _pause("2")]
+        with patch("action_applier.build_pause_operation", side_effect=lambda c, cid, camp: camp):
+            results = apply_actions_batched(client, "123", actions)
+
+        client.get_service.return_value.search.assert_not_called()
+        request = client.get_service.return_value.mutate_campaign_budgets.call_args.kwargs["request"]
+        assert request.operations[0].update.resource_name == "customers/123/campaignBudgets/9"
+        assert [r["status"] for r in results] == ["APPLIED", "APPLIED"]
+
+    def test_missing_budget_is_reported(self, client):
+        """Test a budget action whose budget cannot be resolved fails without a mutate."""
+        from action_applier import apply_actions_batched
+
+        client.get_service.return_value.search.return_value = []
+        results = apply_actions_batched(client, "123", [_increase("7")])
+
+        assert results[0]["status"] == "FAILED"
+        client.get_service.return_value.mutate_campaign_budgets.assert_not_called()
+
+
+class TestBudgetIndex:
+    """Test the campaign -> budget index and shared budget handling."""
+
+    def test_build_budget_index(self):
+        """Test the index is keyed by string campaign ID and keeps the shared flag."""
+        import pandas as pd
+
+        from action_applier import build_budget_index
+
+        df = pd.DataFrame(
+            {
+                "campaign_id": [1, 2],
+                "budget_resource_name": ["customers/1/campaignBudgets/10", "customers/1/campaignBudgets/10"],
+                "budget_shared": [True, True],
+            }
+        )
+
+        index = build_budget_index(df)
+
+        assert index["1"] == {"resource_name": "customers/1/campaignBudgets/10", "shared": True}
+        assert set(index) == {"1", "2"}
+
+    def test_shared_budget_is_updated_once(self, client):
+        """Test campaigns sharing a budget produce one operation and need no lookups."""
+        from action_applier import apply_actions_batched
+
+        shared = {"resource_name": "customers/123/campaignBudgets/5", "shared": True}
+        budget_index = {"1": shared, "2": shared, "3": {"resource_name": "customers/123/campaignBudgets/6", "shared": False}}
+        actions = [_increase("1"), _increase("2", new_budget=150.0), _increase("3")]
+
+        results = apply_actions_batched(client, "123", actions, budget_index=budget_index)
+
+        client.get_service.return_value.search.assert_not_called()
+        operations = client.get_service.return_value.mutate_campaign_budgets.call_args.kwargs["request"].operations
+        assert len(operations) == 2
+        assert operations[0].update.amount_micros == 150_000_000
+        assert [r["status"] for r in results] == ["APPLIED"] * 3
+
+    def test_keyword_actions_share_criterion_batches(self, client):
+        """Test negatives and keyword pauses are ad group criterion operations in the same requests."""
+        from action_applier import apply_keyword_actions_batched
+
+        client.get_service.return_value.mutate_ad_group_criteria.return_value = SimpleNamespace(partial_failure_error=None)
+        client.get_service.return_value.ad_group_path.side_effect = lambda c, a: f"customers/{c}/adGroups/{a}"
+        actions = [
+            {"ad_group_id": 10, "search_term": "free shoes", "action": "ADD_NEGATIVE"},
+            {"ad_group_id": 10, "criterion_id": 7, "action": "PAUSE_KEYWORD"},
+            {"ad_group_id": 20, "search_term": "cheap shoes", "action": "ADD_NEGATIVE"},
+        ]
+
+        results = apply_keyword_actions_batched(client, "123", actions, batch_size=2)
+
+        calls = client.get_service.return_value.mutate_ad_group_criteria.call_args_list
+        assert [len(call.kwargs["request"].operations) for call in calls] == [2, 1]
+        negative = calls[0].kwargs["request"].operations[0].create
+        assert (negative.ad_group, negative.negative, negative.keyword.text) == (
+            "customers/123/adGroups/10",
+            True,
+            "free shoes",
+        )
+        assert calls[0].kwargs["request"].operations[1].update.status == client.enums.AdGroupCriterionStatusEnum.PAUSED
+        assert [r["status"] for r in results] == ["APPLIED"] * 3
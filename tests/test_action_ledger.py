@@ -0,0 +1,215 @@
+"""
+Tests for the SQLite action ledger
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+NOW = datetime(2026, 3, 30, 12, 0, 0)
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    from action_ledger import ActionLedger
+
+    return ActionLedger(str(tmp_path / "ledger.sqlite"))
+
+
+def _pause(campaign_id=1):
+    return {"campaign_id": campaign_id, "campaign_name": f"Campaign {campaign_id}", "action": "PAUSE", "reason": "CPA"}
+
+
+def _budget(campaign_id=2, new_budget=120.0):
+    return {
+        "campaign_id": campaign_id,
+        "campaign_name": f"Campaign {campaign_id}",
+        "action": "INCREASE_BUDGET",
+        "reason": "ROAS",
+        "current_budget": 100.0,
+        "new_budget": new_budget,
+    }
+
+
+def _record(ledger, actions, status="APPLIED", when=NOW):
+    run_id = ledger.begin("123", actions, now=when)
+    ledger.complete(run_id, "123", [{**action, "status": status, "error": None} for action in actions], now=when)
+
+
+def _fake_apply(client, customer_id, actions, **kwargs):
+    return [
+        {**action, "status": "NOTIFIED" if action["action"] == "ALERT" else "APPLIED", "error": None} for action in actions
+    ]
+
+
+class TestActionLedger:
+    """Test duplicate, cooldown and resume handling."""
+
+    def test_hash_ignores_reason_text(self):
+        """Test metric values in the reason do not make an action new."""
+        from action_ledger import action_hash
+
+        assert action_hash("123", _pause()) == action_hash("123", {**_pause(), "reason": "CPA $250.00"})
+        assert action_hash("123", _budget()) != action_hash("123", _budget(new_budget=144.0))
+        assert action_hash("123", _pause()) != action_hash("456", _pause())
+
+    def test_recent_duplicates_are_skipped(self, ledger):
+        """Test an identical action applied within the dedupe window is skipped."""
+        _record(ledger, [_pause()], when=NOW - timedelta(hours=2))
+
+        to_apply, skipped = ledger.filter("123", [_pause(), _pause(campaign_id=5)], now=NOW)
+
+        assert [a["campaign_id"] for a in to_apply] == [5]
+        assert skipped[0]["status"] == "SKIPPED"
+        assert skipped[0]["error"].startswith("Duplicate")
+
+    def test_budget_cooldown(self, ledger):
+        """Test a budget raised yesterday is not raised again, but is after the cooldown."""
+        _record(ledger, [_budget()], when=NOW - timedelta(days=1))
+
+        to_apply, skipped = ledger.filter("123", [_budget(new_budget=144.0)], now=NOW)
+        assert to_apply == []
+        assert skipped[0]["error"].startswith("Cooldown until")
+
+        to_apply, _ = ledger.filter("123", [_budget(new_budget=144.0)], now=NOW + timedelta(days=3))
+        assert len(to_apply) == 1
+
+    def test_failed_actions_are_retried(self, ledger):
+        """Test only APPLIED/NOTIFIED outcomes count as done."""
+        _record(ledger, [_pause()], status="FAILED", when=NOW - timedelta(hours=1))
+
+        to_apply, skipped = ledger.filter("123", [_pause()], now=NOW)
+
+        assert len(to_apply) == 1 and skipped == []
+
+    def test_interrupted_run_is_recovered(self, ledger):
+        """Test PENDING rows from a crashed run are marked INTERRUPTED and re-applied."""
+        ledger.begin("123", [_pause(), _budget()], now=NOW - timedelta(hours=1))
+
+        assert ledger.recover("123", now=NOW) == 2
+        assert ledger.recover("123", now=NOW) == 0
+        assert {row["status"] for row in ledger.history("123")} == {"INTERRUPTED"}
+
+        to_apply, _ = ledger.filter("123", [_pause(), _budget()], now=NOW)
+        assert len(to_apply) == 2
+
+    def test_overlapping_runs_keep_each_others_pending_rows(self, tmp_path):
+        """Test a second run sharing the file, dry or not, leaves an in-flight run's rows for its complete()."""
+        import automation_rules
+        from action_ledger import ActionLedger
+
+        path = str(tmp_path / "ledger.sqlite")
+        first, second = ActionLedger(path), ActionLedger(path)
+        run_id = first.begin("123", [_pause()])
+
+        with (
+            patch.object(automation_rules, "apply_actions_batched", side_effect=_fake_apply),
+            patch.object(automation_rules, "get_dispatcher", return_value=MagicMock()),
+        ):
+            automation_rules.apply_actions(MagicMock(), "123", [_pause(5)], dry_run=True, ledger=second)
+            assert [row["status"] for row in second.history("123")] == ["PENDING"]
+
+            automation_rules.apply_actions(MagicMock(), "123", [_pause(5)], dry_run=False, ledger=second)
+
+        first.complete(run_id, "123", [{**_pause(), "status": "APPLIED", "error": None}])
+
+        assert [(row["campaign_id"], row["status"]) for row in second.history("123")] == [("5", "APPLIED"), ("1", "APPLIED")]
+        to_apply, skipped = second.filter("123", [_pause()])
+        assert to_apply == [] and skipped[0]["error"].startswith("Duplicate")
+
+    def test_claim_skips_actions_in_flight_elsewhere(self, tmp_path):
+        """Test a claim sees another run's live PENDING rows, and a blocked campaign holds back its shared budget."""
+        from action_ledger import ActionLedger
+
+        path = str(tmp_path / "ledger.sqlite")
+        rules_run, pacing_run = ActionLedger(path), ActionLedger(path)
+        shared = {"budget_resource_name": "customers/123/campaignBudgets/9"}
+
+        rules_run.claim("123", [_budget(campaign_id=2, new_budget=120.0)], now=NOW)
+        _, to_apply, skipped = pacing_run.claim(
+            "123", [{**_budget(2, 150.0), **shared}, {**_budget(3, 150.0), **shared}, _pause(4)], now=NOW
+        )
+
+        assert [a["campaign_id"] for a in to_apply] == [4]
+        assert [(r["campaign_id"], r["error"].split(" ")[0]) for r in skipped] == [(2, "In"), (3, "Shared")]
+        assert [row["campaign_id"] for row in pacing_run.history("123")] == ["4", "2"]
+
+        # Once the other run is older than stale_minutes its rows no longer block
+        group = [{**_budget(2, 150.0), **shared}, {**_budget(3, 150.0), **shared}]
+        assert pacing_run.claim("123", group, now=NOW + timedelta(minutes=10))[1] == []
+        assert len(pacing_run.claim("123", group, now=NOW + timedelta(hours=1))[1]) == 2
+
+    def test_shared_budget_is_keyed_on_the_budget(self, tmp_path):
+        """Test a budget raised through one campaign is in flight and cooling down for the others sharing it."""
+        import sqlite3
+
+        from action_ledger import ActionLedger
+
+        path = str(tmp_path / "ledger.sqlite")
+        # A ledger written before budget raises recorded their budget
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE actions (id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, action_hash TEXT NOT NULL, "
+            "customer_id TEXT NOT NULL, campaign_id TEXT NOT NULL, action TEXT NOT NULL, reason TEXT, new_budget REAL, "
+            "status TEXT NOT NULL, error TEXT, created_at TEXT NOT NULL, completed_at TEXT)"
+        )
+        conn.close()
+
+        rules_run, pacing_run = ActionLedger(path), ActionLedger(path)
+        shared = {"budget_resource_name": "customers/123/campaignBudgets/9"}
+
+        run_id, _, _ = rules_run.claim("123", [{**_budget(2, 120.0), **shared}], now=NOW)
+        _, to_apply, skipped = pacing_run.claim("123", [{**_budget(3, 150.0), **shared}], now=NOW)
+        assert to_apply == [] and skipped[0]["error"].startswith("In progress")
+
+        rules_run.complete(run_id, "123", [{**_budget(2, 120.0), **shared, "status": "APPLIED"}], now=NOW)
+        to_apply, skipped = pacing_run.filter("123", [{**_budget(3, 150.0), **shared}], now=NOW + timedelta(hours=1))
+        assert to_apply == [] and skipped[0]["error"].startswith("Cooldown")
+        assert rules_run.history("123")[0]["budget_resource_name"] == shared["budget_resource_name"]
+
+    def test_apply_actions_skips_done_work(self, ledger):
+        """Test a second run applies and notifies nothing already done."""
+        import automation_rules
+
+        client = MagicMock()
+        dispatcher = MagicMock()
+        actions = [_pause(), {"campaign_id": 3, "campaign_name": "Spiky", "action": "ALERT", "reason": "Cost spike"}]
+
+        with (
+            patch.object(automation_rules, "apply_actions_batched", side_effect=_fake_apply) as applier,
+            patch.object(automation_rules, "get_dispatcher", return_value=dispatcher),
+        ):
+            first = automation_rules.apply_actions(client, "123", actions, dry_run=False, ledger=ledger)
+            second = automation_rules.apply_actions(client, "123", actions, dry_run=False, ledger=ledger)
+
+        assert [r["status"] for r in first] == ["APPLIED", "NOTIFIED"]
+        assert [r["status"] for r in second] == ["SKIPPED", "SKIPPED"]
+        assert applier.call_args_list[1].args[2] == []
+        assert dispatcher.send_digest.call_args.args[0] == []
+        assert [row["status"] for row in ledger.history("123")] == ["NOTIFIED", "APPLIED"]
+
+    def test_already_paused_campaigns_are_not_paused(self):
+        """Test PAUSE actions are dropped for campaigns whose status is PAUSED."""
+        import pandas as pd
+
+        import automation_rules
+
+        df = pd.DataFrame(
+            {
+                "campaign_id": [1, 2],
+                "campaign_name": ["Paused", "Enabled"],
+                "status": ["PAUSED", "ENABLED"],
+                "cost": [500.0, 500.0],
+                "conversions": [1, 1],
+                "ctr": [3.0, 3.0],
+            }
+        )
+
+        with patch.object(automation_rules, "list_campaigns", return_value=df):
+            actions = automation_rules.run_account_rules(MagicMock(), "123", dry_run=True)
+
+        assert [a["campaign_id"] for a in actions] == [2]
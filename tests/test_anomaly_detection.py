@@ -0,0 +1,173 @@
+"""
+Tests for anomaly detection over daily metric series
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+END = date(2026, 3, 30)
+
+
+def _daily(days=29, campaigns=3, spike=None, seed=0):
+    """Daily rows with steady noisy metrics; spike = (campaign_id, metric, factor) on the last day."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for offset in range(days):
+        day = END - timedelta(days=days - 1 - offset)
+        for campaign_id in range(1, campaigns + 1):
+            clicks = int(rng.normal(100, 5))
+            cost_micros = int(rng.normal(200, 10) * 1_000_000)
+            if spike and offset == days - 1 and spike[0] == campaign_id:
+                if spike[1] == "cost":
+                    cost_micros = int(cost_micros * spike[2])
+                elif spike[1] == "clicks":
+                    clicks = int(clicks * spike[2])
+            rows.append(
+                {
+                    "date": day.isoformat(),
+                    "campaign_id": campaign_id,
+                    "campaign_name": f"Campaign {campaign_id}",
+                    "impressions": 10_000,
+                    "clicks": clicks,
+                    "cost_micros": cost_micros,
+                    "conversions": 10.0,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+class TestAnomalyDetection:
+    """Test vectorized baselines and the alert path."""
+
+    def test_matrices_fill_missing_days(self):
+        """Test days without rows are zero activity and CPA is NaN without conversions."""
+        from anomaly_detection import build_daily_matrices
+
+        daily = _daily(days=3, campaigns=2)
+        daily = daily[~((daily["campaign_id"] == 2) & (daily["date"] == END.isoformat()))]
+
+        campaign_ids, names, days, matrices = build_daily_matrices(daily)
+
+        assert campaign_ids.tolist() == [1, 2]
+        assert names.tolist() == ["Campaign 1", "Campaign 2"]
+        assert len(days) == 3
+        assert matrices["cost"][1, -1] == 0
+        assert np.isnan(matrices["cpa"][1, -1])
+
+    def test_requested_window_zero_fills_a_missing_last_day(self):
+        """Test a last day with no rows at all is scored as zero activity instead of dropping off the axis."""
+        from anomaly_detection import build_daily_matrices, detect_anomalies
+
+        daily = _daily()
+        daily = daily[daily["date"] != END.isoformat()]
+        start = END - timedelta(days=28)
+
+        _, _, days, matrices = build_daily_matrices(daily, start_date=start, end_date=END)
+        assert len(days) == 29 and days[-1] == np.datetime64(END)
+        assert not matrices["cost"][:, -1].any()
+
+        anomalies = detect_anomalies(daily, metrics={"cost": "down"}, start_date=start, end_date=END)
+        assert sorted(anomalies["campaign_id"]) == [1, 2, 3]
+        assert (anomalies["date"] == np.datetime64(END)).all()
+
+    @pytest.mark.parametrize("method", ["zscore", "ewma", "seasonal"])
+    def test_cost_spike_is_flagged(self, method):
+        """Test every method flags a tripled spend day and nothing else."""
+        from anomaly_detection import detect_anomalies
+
+        anomalies = detect_anomalies(_daily(spike=(2, "cost", 3.0)), method=method)
+
+        cost = anomalies[anomalies["metric"] == "cost"]
+        assert cost["campaign_id"].tolist() == [2]
+        assert cost["zscore"].iloc[0] > 3
+        assert str(cost["date"].iloc[0])[:10] == END.isoformat()
+        assert set(anomalies["campaign_id"]) == {2}
+
+    def test_steady_series_have_no_anomalies(self):
+        """Test normal noise is not flagged."""
+        from anomaly_detection import detect_anomalies
+
+        assert detect_anomalies(_daily(campaigns=50)).empty
+
+    def test_direction_filter(self):
+        """Test a click drop is flagged but CPA going down is not."""
+        from anomaly_detection import detect_anomalies
+
+        anomalies = detect_anomalies(_daily(spike=(1, "clicks", 0.2)))
+
+        assert ("clicks" in anomalies["metric"].tolist()) and ("ctr" in anomalies["metric"].tolist())
+        assert "cpa" not in anomalies["metric"].tolist()
+
+    def test_short_history_is_skipped(self):
+        """Test series shorter than the minimum baseline are not scored."""
+        from anomaly_detection import detect_anomalies
+
+        assert detect_anomalies(_daily(days=3, spike=(1, "cost", 10.0))).empty
+
+    def test_anomalies_become_alert_actions(self):
+        """Test alerts carry a readable reason and are marked NOTIFIED without a mutate."""
+        from action_applier import apply_actions_batched
+        from anomaly_detection import anomalies_to_actions, detect_anomalies
+
+        actions = anomalies_to_actions(detect_anomalies(_daily(spike=(2, "cost", 3.0))))
+
+        assert actions[0]["action"] == "ALERT"
+        assert actions[0]["reason"].startswith("Cost $")
+        assert "above expected" in actions[0]["reason"]
+
+        client = MagicMock()
+        results = apply_actions_batched(client, "123", actions)
+
+        assert [result["status"] for result in results] == ["NOTIFIED"] * len(actions)
+        client.get_service.return_value.mutate_campaigns.assert_not_called()
+
+    def test_run_account_rules_adds_alerts(self, sample_df):
+        """Test anomaly alerts join the rule actions and the notification digest."""
+        import automation_rules
+
+        alert = {"campaign_id": 9, "campaign_name": "Spiky", "action": "ALERT", "reason": "Cost spike"}
+        dispatcher = MagicMock()
+
+        with (
+            patch.object(automation_rules, "list_campaigns", return_value=sample_df),
+            patch.object(automation_rules, "find_anomaly_actions", return_value=[alert]),
+            patch.object(automation_rules, "get_dispatcher", return_value=dispatcher),
+        ):
+            results = automation_rules.run_account_rules(MagicMock(), "123", dry_run=False, anomalies=True)
+
+        assert results[-1]["status"] == "NOTIFIED"
+        digest = dispatcher.send_digest.call_args.args[0]
+        assert "⚠️ Anomaly: Spiky - Cost spike" in digest
+
+    def test_thousands_of_series_scan_quickly(self):
+        """Test scoring is vectorized across campaigns (smoke check on size, not timing)."""
+        from anomaly_detection import detect_anomalies
+
+        daily = _daily(days=29, campaigns=2000)
+        anomalies = detect_anomalies(daily, method="ewma")
+
+        assert len(anomalies) < 50
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame(
+        [
+            {
+                "campaign_id": 1,
+                "campaign_name": "Steady",
+                "cost": 100.0,
+                "conversions": 5,
+                "conversion_value": 200.0,
+                "ctr": 3.0,
+                "daily_budget": 50.0,
+            }
+        ]
+    )
@@ -6,8 +6,11 @@ Run with: pytest tests/ -v
 """
 
 import os
+from datetime import timedelta
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -86,6 +89,83 @@ class TestAutomationRules:
         if 0.1 < ctr_threshold:
             assert any(a["action"] == "PAUSE" for a in actions)
 
+    def test_evaluate_campaigns_matches_row_loop(self):
+        """Test vectorized evaluation returns the same actions as the original row-by-row loop."""
+        from automation_rules import evaluate_campaigns
+
+        rng = np.random.default_rng(42)
+        n = 2000
+        df = pd.DataFrame(
+            {
+                "campaign_id": [str(i) for i in range(n)],
+                "campaign_name": [f"Campaign {i}" for i in range(n)],
+                "cost": rng.uniform(0, 1000, n).round(2),
+                "conversions": rng.choice([0, 0.5, 1, 2, 5, 20], n),
+                "conversion_value": rng.choice([0, 50, 500, 5000], n).astype(float),
+                "ctr": rng.uniform(0, 3, n),
+                "daily_budget": rng.choice([10, 100, 450, 500, 800], n).astype(float),
+            }
+        )
+
+        assert evaluate_campaigns(df) == _evaluate_campaigns_row_loop(df)
+
+    def test_evaluate_campaigns_budget_increase(self):
+        """Test high-ROAS campaigns get a capped budget increase."""
+        from automation_rules import RULES, evaluate_campaigns
+
+        df = pd.DataFrame(
+            [
+                {
+                    "campaign_id": "789",
+                    "campaign_name": "High ROAS",
+                    "cost": 100.0,
+                    "conversions": 10,
+                    "conversion_value": 1000.0,
+                    "ctr": 5.0,
+                    "daily_budget": 450.0,
+                }
+            ]
+        )
+
+        actions = evaluate_campaigns(df)
+
+        assert len(actions) == 1
+        assert actions[0]["action"] == "INCREASE_BUDGET"
+        assert actions[0]["new_budget"] == RULES["max_daily_budget"]
+
+
+class TestMultiAccount:
+    """Test multi-account (MCC) fan-out."""
+
+    def test_failures_are_isolated_per_account(self, sample_campaign_df):
+        """Test one failing account does not stop the others and results keep account order."""
+        import automation_rules
+
+        def fake_list_campaigns(client, customer_id, **kwargs):
+            if customer_id == "222":
+                raise RuntimeError("boom")
+            return sample_campaign_df
+
+        with patch.object(automation_rules, "list_campaigns", side_effect=fake_list_campaigns):
+            result = automation_rules.run_automation_rules_for_accounts(
+                dry_run=True, customer_ids=["111", "222", "333"], max_workers=2, client=MagicMock()
+            )
+
+        assert result["failed"] == {"222": "boom"}
+        assert [a["customer_id"] for a in result["actions"]] == ["111", "333"]
+        assert all(a["campaign_name"] == "Generic Campaign" for a in result["actions"])
+
+    def test_list_child_accounts(self, mock_google_ads_client):
+        """Test child accounts are returned as string IDs."""
+        from google_ads_client import list_child_accounts
+
+        mock_google_ads_client.get_service.return_value.search.return_value = [
+            SimpleNamespace(customer_client=SimpleNamespace(id=111)),
+            SimpleNamespace(customer_client=SimpleNamespace(id=222)),
+        ]
+
+        assert list_child_accounts(mock_google_ads_client, "999") == ["111", "222"]
+
 
 class TestListCampaigns:
     """Test campaign listing functionality."""
@@ -116,6 +196,75 @@ class TestListCampaigns:
         assert summary["total_spend"] == 300
         assert summary["total_conversions"] == 15
 
+    def test_stream_matches_paged_search(self):
+        """Test search_stream columnar assembly returns the same data as paged search."""
+        from list_campaigns import list_campaigns
+
+        rows = [_fake_campaign_row(i) for i in range(5)]
+        client = MagicMock()
+        ga_service = client.get_service.return_value
+        ga_service.search.return_value = rows
+        ga_service.search_stream.return_value = [SimpleNamespace(results=rows[:3]), SimpleNamespace(results=rows[3:])]
+
+        paged = list_campaigns(client, "123", include_metrics=True)
+        streamed = list_campaigns(client, "123", include_metrics=True, stream=True)
+
+        assert list(streamed.columns) == list(paged.columns)
+        assert str(streamed["status"].dtype) == "category"
+        pd.testing.assert_frame_equal(streamed.astype(paged.dtypes.to_dict()), paged, check_dtype=False)
+
+    def test_stream_decodes_raw_protobuf_rows(self):
+        """Test SDK stream batches are decoded from the raw protobuf with exact micros and enum names."""
+        import importlib
+
+        from google.ads.googleads.client import _DEFAULT_VERSION
+
+        from list_campaigns import list_campaigns
+
+        services = importlib.import_module(f"google.ads.googleads.{_DEFAULT_VERSION}.services.types.google_ads_service")
+        enums = importlib.import_module(f"google.ads.googleads.{_DEFAULT_VERSION}.enums.types.campaign_status")
+
+        rows = []
+        for i in range(3):
+            row = services.GoogleAdsRow()
+            row.campaign.id = 1000 + i
+            row.campaign.name = f"Campaign {i}"
+            row.campaign.status = (
+                enums.CampaignStatusEnum.CampaignStatus.PAUSED if i else enums.CampaignStatusEnum.CampaignStatus.ENABLED
+            )
+            row.campaign_budget.amount_micros = 12_340_000
+            row.metrics.cost_micros = 100_000_001 * (i + 1)
+            rows.append(row)
+
+        client = MagicMock()
+        client.get_service.return_value.search_stream.return_value = [services.SearchGoogleAdsStreamResponse(results=rows)]
+
+        df = list_campaigns(client, "123", include_metrics=True, stream=True)
+
+        assert df["status"].tolist() == ["ENABLED", "PAUSED", "PAUSED"]
+        assert df["channel_type"].tolist() == ["UNSPECIFIED"] * 3
+        assert df["budget_micros"].dtype == np.int64 and df["daily_budget"].iloc[0] == 12.34
+        assert df["cost_micros"].tolist() == [100_000_001, 200_000_002, 300_000_003]
+
+    def test_summary_spend_is_exact_in_micros(self):
+        """Test total spend is summed in integer micros, not floats."""
+        from list_campaigns import get_campaign_performance_summary
+
+        df = pd.DataFrame({"status": ["ENABLED"] * 10, "cost": [0.1] * 10, "cost_micros": [100_000] * 10})
+
+        assert get_campaign_performance_summary(df)["total_spend"] == 1.0
+
+    def test_stream_empty_result(self):
+        """Test streaming fetch with no rows returns an empty frame."""
+        from list_campaigns import list_campaigns
+
+        client = MagicMock()
+        client.get_service.return_value.search_stream.return_value = [SimpleNamespace(results=[])]
+
+        df = list_campaigns(client, "123", include_metrics=False, stream=True)
+
+        assert df.empty
+
 
 class TestGoogleAdsClient:
     """Test client configuration."""
@@ -142,6 +291,86 @@ class TestGoogleAdsClient:
                 get_customer_id()
 
 
+def _google_ads_exception(field, name, retry_seconds=None):
+    """Build a GoogleAdsException carrying one error code."""
+    from google.ads.googleads.errors import GoogleAdsException
+
+    details = None
+    if retry_seconds:
+        details = SimpleNamespace(quota_error_details=SimpleNamespace(retry_delay=timedelta(seconds=retry_seconds)))
+
+    error = SimpleNamespace(error_code=SimpleNamespace(**{field: SimpleNamespace(name=name)}), details=details)
+    return GoogleAdsException(None, None, SimpleNamespace(errors=[error]), "req-1")
+
+
+class TestRequestGovernor:
+    """Test rate limiting and retries around Google Ads calls."""
+
+    def test_token_bucket_waits_when_empty(self):
+        """Test acquire sleeps for the refill time once the burst is used up."""
+        from google_ads_client import TokenBucket
+
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            bucket.acquire()
+
+        assert sleeps == [pytest.approx(0.5)]
+
+    def test_retries_quota_errors_then_succeeds(self):
+        """Test RESOURCE_EXHAUSTED is retried, honouring the server retry delay."""
+        from google_ads_client import RequestGovernor
+
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        governor = RequestGovernor(developer_qps=1000, customer_qps=1000, clock=lambda: now[0], sleep=sleep)
+        func = Mock(side_effect=[_google_ads_exception("quota_error", "RESOURCE_EXHAUSTED", retry_seconds=30), "ok"])
+
+        assert governor.call("123", func) == "ok"
+        assert func.call_count == 2
+        assert sum(sleeps) >= 30
+
+    def test_non_retryable_errors_raise_immediately(self):
+        """Test errors such as authorization failures are not retried."""
+        from google.ads.googleads.errors import GoogleAdsException
+
+        from google_ads_client import RequestGovernor
+
+        governor = RequestGovernor(sleep=lambda seconds: None)
+        func = Mock(side_effect=_google_ads_exception("authorization_error", "USER_PERMISSION_DENIED"))
+
+        with pytest.raises(GoogleAdsException):
+            governor.call("123", func)
+        assert func.call_count == 1
+
+    def test_governed_client_routes_search_and_mutate(self):
+        """Test search streams are retried before the first row and mutates go through the governor."""
+        from google_ads_client import GovernedClient, RequestGovernor
+
+        raw_client = MagicMock()
+        service = raw_client.get_service.return_value
+        service.search_stream.side_effect = [_google_ads_exception("internal_error", "TRANSIENT_ERROR"), iter(["batch"])]
+        service.mutate_campaigns.return_value = "mutated"
+
+        client = GovernedClient(raw_client, RequestGovernor(sleep=lambda seconds: None))
+        ga_service = client.get_service("GoogleAdsService")
+
+        assert list(ga_service.search_stream(customer_id="123", query="SELECT")) == ["batch"]
+        assert ga_service.mutate_campaigns(customer_id="123", operations=[]) == "mutated"
+        assert service.search_stream.call_count == 2
+
+
 # Fixtures for reusable test data
 @pytest.fixture
 def sample_campaign_df():
@@ -181,3 +410,83 @@ def mock_google_ads_client():
     mock_service = MagicMock()
     mock_client.get_service.return_value = mock_service
     return mock_client
+
+
+def _fake_campaign_row(i):
+    """Build a GoogleAdsRow-like object for a campaign query."""
+    return SimpleNamespace(
+        campaign=SimpleNamespace(
+            id=1000 + i,
+            name=f"Campaign {i}",
+            status=SimpleNamespace(name="ENABLED" if i % 2 else "PAUSED"),
+            advertising_channel_type=SimpleNamespace(name="SEARCH"),
+            bidding_strategy_type=SimpleNamespace(name="TARGET_CPA"),
+        ),
+        campaign_budget=SimpleNamespace(
+            amount_micros=(i + 1) * 10_000_000,
+            resource_name=f"customers/123/campaignBudgets/{i // 2}",
+            explicitly_shared=i < 2,
+        ),
+        metrics=SimpleNamespace(
+            impressions=1000 * (i + 1),
+            clicks=20 * (i + 1),
+            cost_micros=(i + 1) * 55_500_000,
+            conversions=float(i),
+            conversions_value=float(i * 120),
+            ctr=0.02,
+            average_cpc=2_775_000.0,
+        ),
+    )
+
+
+def _evaluate_campaigns_row_loop(df):
+    """Original iterrows implementation of evaluate_campaigns, kept as a parity reference."""
+    from automation_rules import RULES
+
+    actions = []
+    for _, campaign in df.iterrows():
+        if campaign.get("cost", 0) < RULES["min_spend_for_evaluation"]:
+            continue
+
+        if campaign.get("conversions", 0) > 0:
+            cpa = campaign["cost"] / campaign["conversions"]
+            if cpa > RULES["pause_if_cpa_above"]:
+                actions.append(
+                    {
+                        "campaign_id": campaign["campaign_id"],
+                        "campaign_name": campaign["campaign_name"],
+                        "action": "PAUSE",
+                        "reason": f"CPA ${cpa:.2f} > ${RULES['pause_if_cpa_above']}",
+                    }
+                )
+                continue
+
+        if campaign.get("ctr", 0) < RULES["pause_if_ctr_below"]:
+            actions.append(
+                {
+                    "campaign_id": campaign["campaign_id"],
+                    "campaign_name": campaign["campaign_name"],
+                    "action": "PAUSE",
+                    "reason": f"CTR {campaign['ctr']:.2f}% < {RULES['pause_if_ctr_below']}%",
+                }
+            )
+            continue
+
+        if campaign.get("conversions", 0) > 0 and campaign.get("conversion_value", 0) > 0:
+            roas = campaign["conversion_value"] / campaign["cost"]
+            if roas > RULES["increase_budget_if_roas_above"]:
+                current_budget = campaign.get("daily_budget", 0)
+                new_budget = min(current_budget * (1 + RULES["budget_increase_percent"] / 100), RULES["max_daily_budget"])
+                if new_budget > current_budget:
+                    actions.append(
+                        {
+                            "campaign_id": campaign["campaign_id"],
+                            "campaign_name": campaign["campaign_name"],
+                            "action": "INCREASE_BUDGET",
+                            "reason": f"ROAS {roas:.2f}x > {RULES['increase_budget_if_roas_above']}x",
+                            "current_budget": current_budget,
+                            "new_budget": new_budget,
+                        }
+                    )
+
+    return actions
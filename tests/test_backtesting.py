@@ -0,0 +1,142 @@
+"""
+Tests for rule threshold backtesting
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _daily(n_campaigns, n_days, seed=3):
+    rng = np.random.default_rng(seed)
+    start = date(2026, 1, 1)
+    n = n_campaigns * n_days
+    clicks = rng.integers(0, 40, n)
+    return pd.DataFrame(
+        {
+            "date": [(start + timedelta(days=day)).isoformat() for day in range(n_days) for _ in range(n_campaigns)],
+            "campaign_id": np.tile(np.arange(1, n_campaigns + 1), n_days),
+            "campaign_name": np.tile([f"Campaign {i}" for i in range(1, n_campaigns + 1)], n_days),
+            "status": "ENABLED",
+            "channel_type": "SEARCH",
+            "bidding_strategy": "MANUAL_CPC",
+            "budget_micros": np.tile(rng.integers(10, 600, n_campaigns) * 1_000_000, n_days),
+            "budget_resource_name": "customers/1/campaignBudgets/1",
+            "budget_shared": False,
+            "impressions": clicks * rng.integers(10, 400, n),
+            "clicks": clicks,
+            "cost_micros": rng.integers(0, 30_000_000, n),
+            "conversions": rng.integers(0, 3, n).astype(float),
+            "conversion_value": rng.uniform(0, 120, n).round(2),
+        }
+    )
+
+
+@pytest.fixture
+def daily():
+    return _daily(200, 30)
+
+
+class TestBacktestGrid:
+    """Test the threshold grid replay."""
+
+    def test_single_run_matches_evaluate_campaigns(self):
+        """Test one simulated run makes the same decisions as evaluating the aggregated window."""
+        from automation_rules import RULES, evaluate_campaigns
+        from backtesting import backtest_grid
+        from metrics_cache import aggregate_daily_metrics
+        from rule_engine import rules_from_thresholds
+
+        daily = _daily(300, 15)
+        window = daily[daily["date"] < "2026-01-15"]
+        actions = evaluate_campaigns(aggregate_daily_metrics(window), rules=rules_from_thresholds(RULES))
+        pauses = [a for a in actions if a["action"] == "PAUSE"]
+        increases = [a for a in actions if a["action"] == "INCREASE_BUDGET"]
+        last_day = daily[daily["date"] == "2026-01-15"].set_index("campaign_id")
+
+        result = backtest_grid(daily, {}).iloc[0]
+
+        assert pauses and increases
+        assert result["pauses"] == len(pauses)
+        assert result["budget_increases"] == result["budget_campaigns"] == len(increases)
+        assert result["budget_added"] == pytest.approx(sum(a["new_budget"] - a["current_budget"] for a in increases))
+        assert result["paused_spend"] == pytest.approx(
+            last_day.loc[[a["campaign_id"] for a in pauses], "cost_micros"].sum() / 1_000_000
+        )
+
+    def test_grid_covers_every_combination(self, daily):
+        """Test one row per combination, in grid order, with monotonic pause counts."""
+        from backtesting import GRID_PARAMS, backtest_grid
+
+        grid = {
+            "pause_if_cpa_above": [25, 50, 100, 200],
+            "pause_if_ctr_below": [0.1, 0.5],
+            "increase_budget_if_roas_above": [1.0, 3.0],
+            "budget_increase_percent": [10, 20, 30],
+            "min_spend_for_evaluation": [50, 100],
+        }
+        results = backtest_grid(daily, grid)
+
+        assert len(results) == 4 * 2 * 2 * 3 * 2
+        assert list(results.columns[: len(GRID_PARAMS)]) == list(GRID_PARAMS)
+        assert results["pause_if_cpa_above"].iloc[:12].tolist() == [25.0] * 12
+
+        by_cpa = results.groupby(["min_spend_for_evaluation", "pause_if_ctr_below", "pause_if_cpa_above"])["pauses"].first()
+        for _, pauses in by_cpa.groupby(level=[0, 1]):
+            assert pauses.is_monotonic_decreasing
+
+        by_percent = results.groupby("budget_increase_percent")["budget_added"].sum()
+        assert by_percent.is_monotonic_increasing
+
+    def test_pause_is_sticky(self):
+        """Test a paused campaign gets no later decisions and its remaining spend is attributed."""
+        from backtesting import backtest_grid
+
+        daily = _daily(1, 20)
+        daily["cost_micros"] = 100_000_000
+        daily["conversions"] = 1.0
+        daily["conversion_value"] = 500.0
+        daily["budget_micros"] = 100_000_000
+
+        # CPA $100: paused on the first run; ROAS 5x would otherwise raise the budget every run
+        paused, raised = backtest_grid(daily, {"pause_if_cpa_above": [50, 150], "pause_if_ctr_below": 0}).itertuples()
+
+        assert (paused.pauses, paused.budget_increases, paused.paused_spend) == (1, 0, 600.0)
+        assert paused.paused_conversions == 6
+        assert (raised.pauses, raised.budget_increases, raised.budget_campaigns) == (0, 6, 1)
+        assert raised.budget_added == pytest.approx(6 * 20.0)
+        assert raised.budget_spend == 600.0
+
+    def test_short_history_and_unknown_params(self, daily):
+        """Test histories no longer than the lookback and unknown grid keys are rejected."""
+        from backtesting import backtest_grid
+
+        with pytest.raises(ValueError, match="more than 14 days"):
+            backtest_grid(_daily(5, 14), {})
+        with pytest.raises(ValueError, match="Unknown grid params"):
+            backtest_grid(daily, {"pause_if_cpa": [1]})
+
+    def test_requested_history_keeps_days_without_rows(self):
+        """Test trailing days no campaign had rows for still get simulated runs."""
+        from backtesting import BacktestHistory
+
+        daily = _daily(5, 20)
+        daily = daily[daily["date"] < "2026-01-19"]
+
+        assert BacktestHistory(daily).n_runs == 4
+        history = BacktestHistory(daily, start_date=date(2026, 1, 1), end_date=date(2026, 1, 20))
+        assert history.n_runs == 6
+        assert history.run_days[-1] == np.datetime64("2026-01-20")
+
+    def test_parse_grid_values(self):
+        """Test value lists and inclusive ranges."""
+        from backtesting import parse_grid_values
+
+        assert parse_grid_values("0.3,0.5") == [0.3, 0.5]
+        assert parse_grid_values("50:100:25") == [50.0, 75.0, 100.0]
+        assert parse_grid_values("0.1:0.3:0.1") == [0.1, 0.2, 0.3]
@@ -0,0 +1,54 @@
+"""
+Smoke tests for the offline benchmark suite
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import json
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+
+class TestFakeGoogleAds:
+    """Test the synthetic API works with the real fetch and apply code."""
+
+    def test_list_campaigns_paths_agree(self):
+        """Test paged and streamed fetches return the same generated campaigns."""
+        from list_campaigns import list_campaigns
+
+        client = FakeGoogleAdsClient(campaigns_per_account=250)
+        customer_id = client.accounts[0]
+
+        paged = list_campaigns(client, customer_id)
+        streamed = list_campaigns(client, customer_id, stream=True)
+
+        assert len(paged) == len(streamed) == 250
+        assert paged["cost"].sum() == streamed["cost"].sum()
+
+    def test_lists_child_accounts(self):
+        """Test customer_client queries return the generated accounts."""
+        from google_ads_client import list_child_accounts
+
+        client = FakeGoogleAdsClient(accounts=3, campaigns_per_account=10)
+
+        assert list_child_accounts(client, "999") == client.accounts
+
+
+class TestRunBenchmarks:
+    """Test the benchmark runner end to end at a tiny scale."""
+
+    def test_run_scale_and_save(self, tmp_path):
+        """Test every stage reports throughput and results are saved as JSON."""
+        from benchmarks.run_benchmarks import run_scale, save_results
+
+        results = run_scale(300, accounts=2)
+        path = save_results(results, {"campaigns": [300]}, output=str(tmp_path / "bench.json"))
+
+        stages = [r["stage"] for r in results]
+        assert "evaluate_campaigns" in stages and "run_rules_all_accounts" in stages
+        assert all(r["seconds"] >= 0 for r in results)
+
+        with open(path) as f:
+            saved = json.load(f)
+        assert saved["results"] == results
@@ -0,0 +1,172 @@
+"""
+Tests for intraday budget pacing
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+
+def _frame(**columns):
+    n = len(columns["projected"])
+    frame = {
+        "campaign_id": list(range(1, n + 1)),
+        "campaign_name": [f"Campaign {i}" for i in range(1, n + 1)],
+        "budget_resource_name": [f"customers/1/campaignBudgets/{i}" for i in range(1, n + 1)],
+        "budget_shared": False,
+        "budget": 100.0,
+        "spent": 50.0,
+        "expected_share": 0.5,
+        "history_cost": 1000.0,
+        "history_value": 5000.0,
+    }
+    frame.update(columns)
+    return pd.DataFrame(frame)
+
+
+class TestProjection:
+    """Test the spend-curve fit."""
+
+    def test_on_profile_spend_projects_the_daily_total(self):
+        """Test a day spending exactly along its profile projects that day's total, partial hour included."""
+        from budget_pacing import project_spend
+
+        shares = np.array([np.full(24, 1 / 24), np.linspace(1, 3, 24) / np.linspace(1, 3, 24).sum()])
+        daily = np.array([[2400.0], [900.0]])
+        hour_costs = shares * daily
+        hour_costs[:, 13:] = 0
+        hour_costs[:, 12] *= 0.5
+
+        projected, expected = project_spend(shares, hour_costs, hour=12, fraction=0.5)
+
+        assert projected == pytest.approx(daily[:, 0])
+        assert expected[0] == pytest.approx(12.5 / 24)
+
+    def test_no_spend_projects_zero(self):
+        """Test campaigns without spend today project zero, also at midnight."""
+        from budget_pacing import project_spend
+
+        shares = np.full((2, 24), 1 / 24)
+        projected, expected = project_spend(shares, np.zeros((2, 24)), hour=0, fraction=0.0)
+
+        assert projected.tolist() == [0.0, 0.0]
+        assert expected.tolist() == [0.0, 0.0]
+
+
+class TestEvaluatePacing:
+    """Test pacing decisions."""
+
+    def test_increase_alert_and_skips(self):
+        """Test exhausting budgets with good ROAS are raised, underspenders alerted, the rest left alone."""
+        from budget_pacing import evaluate_pacing
+
+        frame = _frame(
+            projected=[130.0, 130.0, 30.0, 80.0, 130.0],
+            history_value=[5000.0, 1000.0, 5000.0, 5000.0, 5000.0],
+            expected_share=[0.5, 0.5, 0.5, 0.5, 0.05],
+        )
+
+        actions = evaluate_pacing(frame, day=date(2026, 10, 17))
+
+        assert [(a["campaign_id"], a["action"]) for a in actions] == [(1, "INCREASE_BUDGET"), (3, "ALERT")]
+        assert actions[0]["current_budget"] == 100.0
+        assert actions[0]["new_budget"] == 143.0
+        assert actions[0]["budget_resource_name"] == "customers/1/campaignBudgets/1"
+        assert actions[1]["reason"] == "On pace to spend $30.00 of $100.00 (30%)"
+        assert (actions[1]["metric"], actions[1]["date"]) == ("pacing", "2026-10-17")
+
+    def test_increases_are_capped_by_the_days_starting_budget(self):
+        """Test repeated runs cannot raise a budget past the daily cap or max_daily_budget."""
+        from budget_pacing import evaluate_pacing
+
+        frame = _frame(projected=[400.0, 600.0], budget=[140.0, 450.0])
+        base = {"customers/1/campaignBudgets/1": 100.0, "customers/1/campaignBudgets/2": 450.0}
+
+        actions = evaluate_pacing(frame, base_budgets=base)
+
+        assert [(a["campaign_id"], a["new_budget"]) for a in actions] == [(1, 150.0), (2, 500.0)]
+        assert evaluate_pacing(frame.assign(budget=[150.0, 500.0]), base_budgets=base) == []
+
+    def test_shared_budget_is_paced_as_one(self):
+        """Test campaigns on a shared budget are summed against it and share the new amount."""
+        from budget_pacing import evaluate_pacing
+
+        shared = "customers/1/campaignBudgets/9"
+        frame = _frame(projected=[60.0, 50.0, 20.0], budget_resource_name=[shared, shared, "customers/1/campaignBudgets/3"])
+
+        actions = evaluate_pacing(frame)
+
+        assert [(a["campaign_id"], a["action"]) for a in actions] == [
+            (1, "INCREASE_BUDGET"),
+            (2, "INCREASE_BUDGET"),
+            (3, "ALERT"),
+        ]
+        assert actions[0]["new_budget"] == actions[1]["new_budget"] == 121.0
+        assert actions[0]["reason"].startswith("Shared budget on pace to spend $110.00 of $100.00")
+
+
+class TestProfileStore:
+    """Test cached profiles and daily starting budgets."""
+
+    def test_profiles_are_fetched_once_per_day(self, tmp_path):
+        """Test profiles round-trip through SQLite and are only refetched on a new day."""
+        from budget_pacing import ProfileStore
+
+        client = FakeGoogleAdsClient(campaigns_per_account=50)
+        customer_id = client.accounts[0]
+        path = str(tmp_path / "pacing.sqlite")
+        now = datetime.now()
+
+        fetched = ProfileStore(path).get(client, customer_id, now=now)
+        loaded = ProfileStore(path).get(client, customer_id, now=now)
+
+        assert len([call for call in client.calls if call["method"] == "search_stream"]) == 1
+        pd.testing.assert_frame_equal(loaded.campaigns, fetched.campaigns)
+        np.testing.assert_allclose(loaded.shares, fetched.shares)
+        assert loaded.time_zone == "America/New_York"
+        assert loaded.shares.sum(axis=1) == pytest.approx(np.ones(50))
+
+        ProfileStore(path).get(client, customer_id, now=now + timedelta(days=1))
+        assert len([call for call in client.calls if call["method"] == "search_stream"]) == 2
+
+    def test_base_budgets_keep_the_first_amount(self, tmp_path):
+        """Test the day's starting budget is the first amount seen that day."""
+        from budget_pacing import ProfileStore
+
+        store = ProfileStore(str(tmp_path / "pacing.sqlite"))
+        day = date(2026, 10, 17)
+
+        assert store.base_budgets("1", day, {"b/1": 100_000_000}) == {"b/1": 100_000_000}
+        assert store.base_budgets("1", day, {"b/1": 150_000_000, "b/2": 10}) == {"b/1": 100_000_000, "b/2": 10}
+        assert store.base_budgets("1", date(2026, 10, 18), {"b/1": 150_000_000}) == {"b/1": 150_000_000}
+
+
+class TestRunPacing:
+    """Test a pacing run against the synthetic API."""
+
+    def test_run_applies_budget_increases(self, tmp_path):
+        """Test one run fetches only today's hours once profiles are cached and applies increases in one batch."""
+        from budget_pacing import ProfileStore, run_pacing
+
+        client = FakeGoogleAdsClient(campaigns_per_account=300, today_hour=15)
+        customer_id = client.accounts[0]
+        store = ProfileStore(str(tmp_path / "pacing.sqlite"))
+        now = datetime(2026, 10, 17, 15, 0)
+
+        store.get(client, customer_id)
+        client.calls.clear()
+        actions = run_pacing(client, customer_id, store, dry_run=False, now=now, lag_minutes=0)
+
+        increases = [action for action in actions if action["action"] == "INCREASE_BUDGET"]
+        budgets = {action["budget_resource_name"] for action in increases}
+        methods = [call["method"] for call in client.calls]
+        assert increases and all(a["new_budget"] > a["current_budget"] for a in increases)
+        assert methods == ["search_stream", "mutate_campaign_budgets"]
+        assert client.calls[-1]["operations"] == len(budgets)
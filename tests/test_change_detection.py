@@ -0,0 +1,124 @@
+"""
+Tests for change-detection (diff) evaluation
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    from change_detection import CampaignSnapshots
+
+    return CampaignSnapshots(str(tmp_path / "snapshots.sqlite"))
+
+
+@pytest.fixture
+def campaigns_df():
+    return pd.DataFrame(
+        {
+            "campaign_id": [1, 2, 3],
+            "campaign_name": ["High CPA", "Good", "Low CTR"],
+            "status": pd.Categorical(["ENABLED", "ENABLED", "ENABLED"]),
+            "cost": [500.0, 200.0, 100.0],
+            "conversions": [2, 10, 5],
+            "conversion_value": [0.0, 400.0, 100.0],
+            "ctr": [3.0, 3.0, 0.2],
+            "daily_budget": [50.0, 50.0, 50.0],
+        }
+    )
+
+
+def _evaluate(calls):
+    from automation_rules import evaluate_campaigns
+
+    def evaluate(frame):
+        calls.append(frame["campaign_id"].tolist())
+        return evaluate_campaigns(frame)
+
+    return evaluate
+
+
+class TestChangeDetection:
+    """Test that only changed campaigns are evaluated and decisions are reused."""
+
+    def test_row_hashes_track_metric_columns(self, campaigns_df):
+        """Test hashes change with metrics but not with columns rules do not read."""
+        from change_detection import row_hashes
+
+        hashes = row_hashes(campaigns_df)
+        moved = campaigns_df.assign(cost=[500.0, 201.0, 100.0])
+        other = campaigns_df.assign(channel_type="SEARCH")
+
+        assert (row_hashes(moved) != hashes).tolist() == [False, True, False]
+        assert (row_hashes(other) == hashes).all()
+
+    def test_unchanged_campaigns_reuse_decisions(self, snapshots, campaigns_df):
+        """Test a second run evaluates nothing and returns the same actions."""
+        calls = []
+
+        first, reused = snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+        assert reused == []
+        assert [a["campaign_id"] for a in first] == [1, 3]
+
+        second, reused = snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+        assert second == []
+        assert reused == first
+        assert calls == [[1, 2, 3]]
+
+    def test_only_changed_and_new_campaigns_are_evaluated(self, snapshots, campaigns_df):
+        """Test moved metrics and new campaigns are evaluated; stale decisions are dropped."""
+        calls = []
+        snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+
+        updated = pd.concat(
+            [
+                campaigns_df.assign(ctr=[3.0, 3.0, 0.9]),
+                pd.DataFrame([{**campaigns_df.iloc[0].to_dict(), "campaign_id": 4, "campaign_name": "New"}]),
+            ],
+            ignore_index=True,
+        )
+        actions, reused = snapshots.evaluate_changed("123", updated, _evaluate(calls), {"rules": []})
+
+        assert calls[-1] == [3, 4]
+        assert [a["campaign_id"] for a in actions] == [4]
+        assert [a["campaign_id"] for a in reused] == [1]
+
+    def test_snapshot_survives_restart(self, snapshots, campaigns_df):
+        """Test a new process reads decisions back from the SQLite file."""
+        from change_detection import CampaignSnapshots
+
+        calls = []
+        first, _ = snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+
+        restarted = CampaignSnapshots(snapshots.path)
+        actions, reused = restarted.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+
+        assert actions == []
+        assert reused == first
+        assert len(calls) == 1
+
+    def test_rule_change_reevaluates_everything(self, snapshots, campaigns_df):
+        """Test snapshots made with another rule set are ignored."""
+        calls = []
+        snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": []})
+        snapshots.evaluate_changed("123", campaigns_df, _evaluate(calls), {"rules": [{"name": "edited"}]})
+
+        assert calls == [[1, 2, 3], [1, 2, 3]]
+
+    def test_run_account_rules_diff_mode(self, snapshots, campaigns_df):
+        """Test repeated runs keep recommending the same actions from the snapshot."""
+        import automation_rules
+
+        with patch.object(automation_rules, "list_campaigns", return_value=campaigns_df):
+            first = automation_rules.run_account_rules(MagicMock(), "123", snapshots=snapshots)
+            with patch.object(automation_rules, "evaluate_campaigns") as evaluate_campaigns:
+                second = automation_rules.run_account_rules(MagicMock(), "123", snapshots=snapshots)
+
+        evaluate_campaigns.assert_not_called()
+        assert second == first
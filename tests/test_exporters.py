@@ -0,0 +1,172 @@
+"""
+Tests for streaming report exports
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def client():
+    from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+    return FakeGoogleAdsClient(accounts=1, campaigns_per_account=250)
+
+
+class TestCampaignChunks:
+    """Test chunked fetching and summary merging."""
+
+    def test_chunks_match_full_stream(self, client):
+        """Test concatenated chunks hold the same rows as a full streamed fetch."""
+        from list_campaigns import iter_campaign_chunks, list_campaigns
+
+        customer_id = client.accounts[0]
+        chunks = list(iter_campaign_chunks(client, customer_id, chunk_size=100))
+        full = list_campaigns(client, customer_id, stream=True)
+
+        assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+        combined = pd.concat(chunks, ignore_index=True)
+        assert combined["campaign_id"].tolist() == full["campaign_id"].tolist()
+        assert combined["cost"].sum() == pytest.approx(full["cost"].sum())
+
+    def test_chunks_follow_the_query_plan(self, client):
+        """Test chunks are cut from whole stream batches and carry only the planned columns."""
+        from list_campaigns import iter_campaign_chunks, list_campaigns
+
+        customer_id = client.accounts[0]
+        chunks = list(
+            iter_campaign_chunks(client, customer_id, chunk_size=30, columns={"cost", "status"}, statuses=["PAUSED"])
+        )
+        full = list_campaigns(client, customer_id, stream=True, columns={"cost", "status"}, statuses=["PAUSED"])
+
+        assert {len(chunk) for chunk in chunks[:-1]} == {30} and 0 < len(chunks[-1]) <= 30
+        assert all(list(chunk.columns) == ["campaign_id", "status", "cost"] for chunk in chunks)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+
+    def test_merged_summary_matches_full_summary(self, client):
+        """Test merging per-chunk summaries gives the whole-frame summary."""
+        from list_campaigns import (
+            get_campaign_performance_summary,
+            iter_campaign_chunks,
+            list_campaigns,
+            merge_performance_summaries,
+        )
+
+        customer_id = client.accounts[0]
+        merged = merge_performance_summaries(
+            get_campaign_performance_summary(chunk) for chunk in iter_campaign_chunks(client, customer_id, chunk_size=70)
+        )
+        full = get_campaign_performance_summary(list_campaigns(client, customer_id, stream=True))
+
+        assert merged.keys() == full.keys()
+        for key, value in full.items():
+            assert merged[key] == pytest.approx(value)
+
+    def test_merge_of_nothing_reports_error(self):
+        """Test an empty export gets the same summary as an empty frame."""
+        from list_campaigns import merge_performance_summaries
+
+        assert merge_performance_summaries([]) == {"error": "No campaigns found"}
+
+
+class TestExporters:
+    """Test XLSX, gzip CSV and Parquet writers."""
+
+    def test_xlsx_campaign_report(self, client, tmp_path):
+        """Test the workbook has a formatted summary tab followed by the data."""
+        from openpyxl import load_workbook
+
+        from exporters import export_campaign_report
+
+        path = str(tmp_path / "campaigns.xlsx")
+        rows = export_campaign_report(client, client.accounts[0], path, chunk_size=100)
+
+        workbook = load_workbook(path, read_only=True)
+        assert workbook.sheetnames == ["Summary", "Campaigns"]
+
+        data = list(workbook["Campaigns"].values)
+        assert rows == 250
+        assert len(data) == 251
+        assert data[0][0] == "campaign_id"
+
+        summary = {metric: value for metric, value in list(workbook["Summary"].values)[1:]}
+        assert summary["total_campaigns"] == 250
+        assert summary["total_spend"] > 0
+
+    def test_xlsx_uses_constant_memory(self, tmp_path):
+        """Test the workbook is opened in constant_memory mode."""
+        from exporters import XlsxExporter
+
+        exporter = XlsxExporter(str(tmp_path / "out.xlsx"))
+        try:
+            assert exporter.workbook.constant_memory
+        finally:
+            exporter.close()
+
+    def test_xlsx_rolls_over_to_new_sheet(self, tmp_path, monkeypatch):
+        """Test rows past the worksheet limit continue on a new sheet."""
+        from openpyxl import load_workbook
+
+        import exporters
+
+        monkeypatch.setattr(exporters, "XLSX_MAX_ROWS", 4)
+        path = str(tmp_path / "out.xlsx")
+        chunk = pd.DataFrame({"campaign_id": range(5), "status": ["ENABLED"] * 5})
+        exporters.export_frames(path, [chunk], summary=False)
+
+        workbook = load_workbook(path, read_only=True)
+        assert workbook.sheetnames == ["Campaigns", "Campaigns 2"]
+        assert len(list(workbook["Campaigns"].values)) == 4
+        assert len(list(workbook["Campaigns 2"].values)) == 3
+
+    def test_gzip_csv_writes_header_once(self, client, tmp_path):
+        """Test chunks are appended under a single header, with a summary CSV alongside."""
+        from exporters import export_campaign_report
+
+        path = str(tmp_path / "campaigns.csv.gz")
+        export_campaign_report(client, client.accounts[0], path, chunk_size=100)
+
+        df = pd.read_csv(path)
+        assert len(df) == 250
+        assert df["campaign_id"].is_unique
+
+        summary = pd.read_csv(tmp_path / "campaigns.summary.csv")
+        assert summary.set_index("metric").loc["total_campaigns", "value"] == 250
+
+    def test_parquet_row_groups(self, client, tmp_path):
+        """Test each chunk is written as a Parquet row group."""
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        from exporters import export_campaign_report
+
+        path = str(tmp_path / "campaigns.parquet")
+        export_campaign_report(client, client.accounts[0], path, chunk_size=100)
+
+        assert pq.ParquetFile(path).num_row_groups == 3
+        assert len(pd.read_parquet(path)) == 250
+
+    def test_action_log_keeps_all_columns(self, tmp_path):
+        """Test actions with different fields share one header."""
+        from exporters import export_action_log
+
+        actions = [
+            {"campaign_id": "1", "action": "PAUSE", "reason": "CPA too high"},
+            {"campaign_id": "2", "action": "INCREASE_BUDGET", "reason": "ROAS", "new_budget": 120.0},
+        ]
+        path = str(tmp_path / "actions.csv")
+
+        assert export_action_log(path, actions, chunk_size=1) == 2
+
+        df = pd.read_csv(path)
+        assert list(df.columns) == ["campaign_id", "action", "reason", "new_budget"]
+        assert df["new_budget"].isna().tolist() == [True, False]
+
+    def test_unsupported_extension(self, tmp_path):
+        """Test unknown formats are rejected."""
+        from exporters import get_exporter
+
+        with pytest.raises(ValueError):
+            get_exporter(str(tmp_path / "report.json"))
@@ -0,0 +1,128 @@
+"""
+Tests for run instrumentation
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import pstats
+import urllib.request
+
+import pytest
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+
+@pytest.fixture
+def metrics():
+    from instrumentation import get_metrics
+
+    registry = get_metrics()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+class TestMetricsRegistry:
+    """Test spans, counters and the Prometheus output."""
+
+    def test_spans_and_counters(self):
+        """Test spans record count, total and longest duration per label set."""
+        from instrumentation import MetricsRegistry
+
+        registry = MetricsRegistry()
+        registry.observe("evaluate", 0.5, customer_id="1")
+        registry.observe("evaluate", 1.5, customer_id="1")
+        with registry.span("evaluate", customer_id="2"):
+            pass
+        registry.increment("rows", 10, customer_id="1")
+        registry.increment("rows", 5, customer_id="1")
+
+        assert registry.timing("evaluate", customer_id="1") == (2, 2.0, 1.5)
+        assert registry.timing("evaluate", customer_id="2")[0] == 1
+        assert registry.counter("rows", customer_id="1") == 15
+
+    def test_span_records_failures(self):
+        """Test a block that raises is still timed."""
+        from instrumentation import MetricsRegistry
+
+        registry = MetricsRegistry()
+        with pytest.raises(ValueError):
+            with registry.span("api_call", method="search"):
+                raise ValueError("boom")
+
+        assert registry.timing("api_call", method="search")[0] == 1
+
+    def test_prometheus_text(self, tmp_path):
+        """Test the text format has one HELP/TYPE header per family and escaped labels."""
+        from instrumentation import MetricsRegistry
+
+        registry = MetricsRegistry()
+        registry.observe("api_call", 0.25, customer_id="1", method="search_stream")
+        registry.observe("api_call", 0.75, customer_id="2", method="search_stream")
+        registry.increment("notifications", status='say "hi"')
+
+        path = tmp_path / "amplify.prom"
+        registry.write_prometheus(str(path))
+        text = path.read_text()
+
+        assert text.count("# TYPE amplify_api_call_seconds summary") == 1
+        assert 'amplify_api_call_seconds_sum{customer_id="2",method="search_stream"} 0.750000' in text
+        assert "# TYPE amplify_api_call_seconds_max gauge" in text
+        assert 'amplify_notifications_total{status="say \\"hi\\""} 1' in text
+
+    def test_metrics_endpoint(self):
+        """Test the local endpoint serves the current metrics."""
+        from instrumentation import MetricsRegistry
+
+        registry = MetricsRegistry()
+        registry.increment("api_calls", customer_id="1", method="search")
+        server = registry.serve(0)
+        try:
+            port = server.server_address[1]
+            body = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+        finally:
+            server.shutdown()
+
+        assert 'amplify_api_calls_total{customer_id="1",method="search"} 1' in body
+
+
+class TestRunInstrumentation:
+    """Test the fetch/evaluate path records spans and counters."""
+
+    def test_governed_fetch_counts_pages_rows_and_calls(self, metrics):
+        """Test search_stream pages, rows and frame construction are recorded per customer."""
+        from google_ads_client import GovernedClient, RequestGovernor
+        from list_campaigns import list_campaigns
+
+        client = GovernedClient(FakeGoogleAdsClient(campaigns_per_account=25_000), RequestGovernor())
+        customer_id = client.accounts[0]
+
+        df = list_campaigns(client, customer_id, stream=True)
+
+        labels = {"customer_id": customer_id, "method": "search_stream"}
+        assert metrics.counter("api_calls", **labels) == 1
+        assert metrics.counter("rows", **labels) == len(df) == 25_000
+        assert metrics.timing("api_page", **labels)[0] == 3
+        assert metrics.timing("api_call", **labels)[0] == 1
+        assert metrics.timing("frame_build", customer_id=customer_id)[0] == 1
+
+    def test_evaluate_is_timed(self, metrics):
+        """Test evaluate_campaigns records an evaluate span per customer."""
+        import pandas as pd
+
+        from automation_rules import evaluate_campaigns
+
+        evaluate_campaigns(pd.DataFrame({"campaign_id": [1], "campaign_name": ["A"], "cost": [10.0]}), customer_id="7")
+
+        assert metrics.timing("evaluate", customer_id="7")[0] == 1
+
+    def test_profile_run_writes_cprofile_stats(self, tmp_path):
+        """Test profile_run dumps stats that pstats can load."""
+        from instrumentation import profile_run
+
+        path = tmp_path / "run.prof"
+        with profile_run(str(path)):
+            sum(range(1000))
+
+        assert pstats.Stats(str(path)).total_calls > 0
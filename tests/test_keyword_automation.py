@@ -0,0 +1,138 @@
+"""
+Tests for keyword and search-term automation
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+
+def _search_terms():
+    return pd.DataFrame(
+        {
+            "campaign_id": [1, 1, 2, 3],
+            "campaign_name": ["Brand", "Brand", "Generic", "Generic"],
+            "ad_group_id": [10, 10, 20, 30],
+            "search_term": ["free shoes", "brand shoes", "cheap shoes", "shoes"],
+            "clicks": [40, 40, 5, 50],
+            "impressions": [1000, 1000, 100, 1000],
+            "cost": [60.0, 80.0, 90.0, 20.0],
+            "conversions": [0.0, 2.0, 0.0, 0.0],
+            "conversion_value": [0.0, 150.0, 0.0, 0.0],
+        }
+    )
+
+
+class TestKeywordRules:
+    """Test level rule sets and per-chunk evaluation."""
+
+    def test_search_term_negatives(self):
+        """Test only converting-free terms above the spend threshold and click minimum become negatives."""
+        from keyword_automation import KEYWORD_RULES, compile_level_rules, evaluate_chunk, keyword_rules_from_thresholds
+
+        rules = keyword_rules_from_thresholds(KEYWORD_RULES)
+        plan = compile_level_rules(rules["search_term"], "search_term")
+
+        actions = evaluate_chunk(_search_terms(), plan, "search_term")
+
+        assert actions == [
+            {
+                "campaign_id": 1,
+                "campaign_name": "Brand",
+                "ad_group_id": 10,
+                "search_term": "free shoes",
+                "action": "ADD_NEGATIVE",
+                "rule": "negative_wasted_spend",
+                "reason": "Spent $60.00 without conversions",
+            }
+        ]
+
+    def test_keyword_pauses_and_level_actions(self):
+        """Test keyword rules emit PAUSE_KEYWORD and a level only accepts its own rule action."""
+        from keyword_automation import KEYWORD_RULES, compile_level_rules, evaluate_chunk, keyword_rules_from_thresholds
+        from rule_engine import RuleDefinitionError
+
+        keywords = _search_terms().rename(columns={"search_term": "keyword_text"})
+        keywords["criterion_id"] = [101, 102, 103, 104]
+        keywords.loc[1, "cost"] = 400.0  # CPA $200
+        rules = keyword_rules_from_thresholds(KEYWORD_RULES)
+
+        actions = evaluate_chunk(keywords, compile_level_rules(rules["keyword"], "keyword"), "keyword")
+
+        assert [(a["criterion_id"], a["action"], a["rule"]) for a in actions] == [
+            (102, "PAUSE_KEYWORD", "pause_keyword_high_cpa")
+        ]
+        with pytest.raises(RuleDefinitionError, match="unknown action"):
+            compile_level_rules(rules["keyword"], "search_term")
+
+    def test_skip_if_is_pushed_down(self):
+        """Test skip_if thresholds become WHERE predicates next to the level's fixed filters."""
+        from keyword_automation import build_keyword_query
+        from query_planner import push_down
+
+        query, specs = build_keyword_query("search_term", predicates=[push_down(("clicks", "<", 10.0))])
+
+        assert "FROM search_term_view" in query
+        assert "metrics.clicks >= 10" in query
+        assert "search_term_view.status NOT IN ('EXCLUDED', 'ADDED_EXCLUDED')" in query
+        assert [column for column, _, _ in specs][:4] == ["campaign_id", "campaign_name", "ad_group_id", "search_term"]
+
+
+class TestStreaming:
+    """Test bounded chunks and batched mutations against the synthetic API."""
+
+    def test_chunks_are_bounded_and_complete(self):
+        """Test chunks never exceed chunk_size, also across stream batches, and cover every row once."""
+        from keyword_automation import iter_keyword_chunks
+
+        client = FakeGoogleAdsClient(campaigns_per_account=20, keywords_per_account=23_500)
+        customer_id = client.accounts[0]
+
+        chunks = list(iter_keyword_chunks(client, customer_id, "keyword", chunk_size=3_000))
+        whole = list(iter_keyword_chunks(client, customer_id, "keyword", chunk_size=100_000))
+
+        assert [len(chunk) for chunk in chunks] == [3_000] * 7 + [2_500]
+        assert len(whole) == 1
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole[0])
+        assert whole[0]["criterion_id"].is_unique
+
+    def test_run_applies_in_batches(self):
+        """Test results do not depend on the chunk size and mutations go out batch_size at a time."""
+        from keyword_automation import run_keyword_rules
+
+        client = FakeGoogleAdsClient(campaigns_per_account=20, keywords_per_account=12_000, search_terms_per_account=12_000)
+        customer_id = client.accounts[0]
+        logged = []
+
+        summary = run_keyword_rules(
+            client, customer_id, dry_run=False, chunk_size=1_000, batch_size=200, on_results=logged.extend
+        )
+        reference = run_keyword_rules(client, customer_id, dry_run=True, chunk_size=50_000)
+
+        assert {level: counts["actions"] for level, counts in summary.items()} == {
+            level: counts["actions"] for level, counts in reference.items()
+        }
+        assert summary["search_term"]["chunks"] == 12 and summary["search_term"]["actions"] > 0
+        assert summary["search_term"]["applied"] == summary["search_term"]["actions"]
+
+        mutates = [call["operations"] for call in client.calls if call["method"] == "mutate_ad_group_criteria"]
+        assert max(mutates) == 200
+        assert sum(mutates) == len(logged) == summary["search_term"]["actions"] + summary["keyword"]["actions"]
+        assert {result["status"] for result in logged} == {"APPLIED"}
+        assert {result["customer_id"] for result in logged} == {customer_id}
+
+    def test_dry_run_sends_no_mutations(self):
+        """Test dry runs report DRY_RUN results without mutate calls."""
+        from keyword_automation import run_keyword_rules
+
+        client = FakeGoogleAdsClient(campaigns_per_account=20, search_terms_per_account=5_000)
+        logged = []
+
+        run_keyword_rules(client, client.accounts[0], levels=("search_term",), on_results=logged.extend)
+
+        assert logged and {result["status"] for result in logged} == {"DRY_RUN"}
+        assert not [call for call in client.calls if call["method"].startswith("mutate")]
@@ -0,0 +1,145 @@
+"""
+Tests for the incremental metrics cache
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+TODAY = date(2026, 3, 31)
+
+
+def _daily_rows(days, campaign_ids=(1, 2)):
+    """Daily rows shaped like fetch_daily_metrics output."""
+    rows = []
+    for day in days:
+        for campaign_id in campaign_ids:
+            rows.append(
+                {
+                    "date": day.isoformat(),
+                    "campaign_id": campaign_id,
+                    "campaign_name": f"Campaign {campaign_id}",
+                    "status": "ENABLED",
+                    "channel_type": "SEARCH",
+                    "bidding_strategy": "TARGET_CPA",
+                    "budget_micros": 50_000_000,
+                    "budget_resource_name": f"customers/1/campaignBudgets/{campaign_id}",
+                    "budget_shared": 0,
+                    "impressions": 1000,
+                    "clicks": 10,
+                    "cost_micros": 25_000_000,
+                    "conversions": 1.0,
+                    "conversion_value": 80.0,
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def _fake_fetch(client, customer_id, start_date, end_date):
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    return _daily_rows(days)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from metrics_cache import MetricsCache
+
+    return MetricsCache(str(tmp_path / "metrics.sqlite"), mutable_days=3)
+
+
+class TestMetricsCache:
+    """Test incremental fetching and local aggregation."""
+
+    def test_missing_dates_on_empty_cache(self, cache):
+        """Test every day of the window is missing before the first fetch."""
+        start = TODAY - timedelta(days=13)
+        assert len(cache.missing_dates("1", start, TODAY, today=TODAY)) == 14
+
+    def test_second_refresh_only_fetches_mutable_days(self, cache):
+        """Test a repeat run only re-fetches the conversion-lag lookback."""
+        from metrics_cache import refresh_cache
+
+        start = TODAY - timedelta(days=13)
+        with patch("metrics_cache.fetch_daily_metrics", side_effect=_fake_fetch) as fetch:
+            assert refresh_cache(MagicMock(), "1", cache, start, TODAY, today=TODAY) == 14
+            assert refresh_cache(MagicMock(), "1", cache, start, TODAY, today=TODAY) == 4
+
+        last_call = fetch.call_args_list[-1]
+        assert last_call.args[2:] == (TODAY - timedelta(days=3), TODAY)
+
+    def test_aggregate_matches_list_campaigns_units(self, cache):
+        """Test cached days roll up to summed metrics with CTR and CPC recomputed."""
+        start = TODAY - timedelta(days=6)
+        days = [start + timedelta(days=i) for i in range(7)]
+        cache.store("1", days, _daily_rows(days))
+
+        df = cache.aggregate("1", start, TODAY)
+
+        assert len(df) == 2
+        row = df[df["campaign_id"] == 1].iloc[0]
+        assert row["cost"] == pytest.approx(175.0)
+        assert row["clicks"] == 70
+        assert row["ctr"] == pytest.approx(1.0)
+        assert row["avg_cpc"] == pytest.approx(2.5)
+        assert row["daily_budget"] == pytest.approx(50.0)
+        assert row["budget_resource_name"] == "customers/1/campaignBudgets/1"
+
+    def test_store_replaces_refetched_days(self, cache):
+        """Test re-storing a day replaces its rows instead of duplicating them."""
+        cache.store("1", [TODAY], _daily_rows([TODAY]))
+        cache.store("1", [TODAY], _daily_rows([TODAY], campaign_ids=(1,)))
+
+        assert len(cache.load_daily("1", TODAY, TODAY)) == 1
+
+    def test_status_and_budget_come_from_current_attributes(self, cache):
+        """Test a campaign that stopped spending reports its current status and budget, not its last cached day's."""
+        from metrics_cache import list_campaigns_cached
+
+        today = date.today()
+        start = today - timedelta(days=30)
+        days = [start + timedelta(days=i) for i in range(25)]
+        cache.store("1", days, _daily_rows(days))
+        attributes = _daily_rows([today], campaign_ids=(1,)).drop(columns=["date"])
+        attributes[["status", "budget_micros"]] = ["PAUSED", 80_000_000]
+
+        with patch("metrics_cache.fetch_daily_metrics", return_value=_daily_rows([])), patch(
+            "metrics_cache.fetch_campaign_attributes", return_value=attributes
+        ):
+            df = list_campaigns_cached(MagicMock(), "1", cache, days_back=30)
+
+        assert df["campaign_id"].tolist() == [1]
+        row = df.iloc[0]
+        assert (row["status"], row["daily_budget"], row["budget_micros"]) == ("PAUSED", 80.0, 80_000_000)
+        assert row["cost"] == pytest.approx(625.0)
+
+    def test_fetched_rows_round_trip_through_the_cache(self, cache):
+        """Test daily rows and attributes decoded from the stream store and aggregate like the fetched frame."""
+        from benchmarks.fake_google_ads import FakeGoogleAdsClient
+        from metrics_cache import fetch_campaign_attributes, fetch_daily_metrics
+
+        client = FakeGoogleAdsClient(campaigns_per_account=20)
+        customer_id = client.accounts[0]
+        rows = fetch_daily_metrics(client, customer_id, TODAY - timedelta(days=1), TODAY)
+        attributes = fetch_campaign_attributes(client, customer_id)
+
+        cache.store(customer_id, [TODAY - timedelta(days=1), TODAY], rows)
+        df = cache.aggregate(customer_id, TODAY - timedelta(days=1), TODAY, attributes=attributes)
+
+        assert len(rows) == 40 and rows["budget_micros"].dtype == "int64"
+        assert list(attributes.columns) == [
+            "campaign_id",
+            "campaign_name",
+            "status",
+            "channel_type",
+            "bidding_strategy",
+            "budget_micros",
+            "budget_resource_name",
+            "budget_shared",
+        ]
+        assert df["cost_micros"].sum() == rows["cost_micros"].sum()
+        assert df["status"].astype(str).tolist() == attributes["status"].astype(str).tolist()
@@ -0,0 +1,123 @@
+"""
+Tests for the notification dispatcher
+Empire Amplify
+
+Uses a local stub webhook server instead of Slack.
+
+Run with: pytest tests/ -v
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubWebhook:
+    """Local HTTP server that records posted JSON bodies."""
+
+    def __init__(self, fail_first=0, status=500):
+        self.messages = []
+        self.attempts = 0
+        self.fail_first = fail_first
+        self.status = status
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stub.attempts += 1
+                if stub.attempts <= stub.fail_first:
+                    self.send_response(stub.status)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                stub.messages.append(json.loads(body)["text"])
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def webhook():
+    stub = StubWebhook()
+    yield stub
+    stub.stop()
+
+
+class TestNotificationDispatcher:
+    """Test queued delivery, retries and digests."""
+
+    def test_messages_are_delivered_on_close(self, webhook):
+        """Test queued messages are flushed when the dispatcher closes."""
+        from notifications import NotificationDispatcher
+
+        dispatcher = NotificationDispatcher(webhook_url=webhook.url)
+        dispatcher.send("first")
+        dispatcher.send("second")
+        dispatcher.close()
+
+        assert webhook.messages == ["first", "second"]
+
+    def test_retries_server_errors(self):
+        """Test 5xx responses are retried with backoff until they succeed."""
+        from notifications import NotificationDispatcher
+
+        stub = StubWebhook(fail_first=2)
+        try:
+            dispatcher = NotificationDispatcher(webhook_url=stub.url, backoff=0.01)
+            dispatcher.send("hello")
+            dispatcher.flush()
+        finally:
+            stub.stop()
+
+        assert stub.attempts == 3
+        assert stub.messages == ["hello"]
+
+    def test_client_errors_are_not_retried(self):
+        """Test a 4xx response (other than 429) is given up on immediately."""
+        from notifications import NotificationDispatcher
+
+        stub = StubWebhook(fail_first=5, status=404)
+        try:
+            dispatcher = NotificationDispatcher(webhook_url=stub.url, backoff=0.01)
+            dispatcher.send("hello")
+            dispatcher.flush()
+        finally:
+            stub.stop()
+
+        assert stub.attempts == 1
+
+    def test_digest_is_chunked(self, webhook):
+        """Test a long digest is split into messages under the size limit, each with the title."""
+        from notifications import NotificationDispatcher
+
+        dispatcher = NotificationDispatcher(webhook_url=webhook.url, max_message_chars=100)
+        dispatcher.send_digest([f"Paused campaign {i:03d}" for i in range(12)], title="Run digest")
+        dispatcher.close()
+
+        assert len(webhook.messages) > 1
+        assert all(len(message) <= 100 and message.startswith("Run digest") for message in webhook.messages)
+        assert sum(message.count("Paused campaign") for message in webhook.messages) == 12
+
+    def test_no_webhook_configured(self):
+        """Test sending without a webhook URL is a no-op."""
+        from notifications import NotificationDispatcher
+
+        dispatcher = NotificationDispatcher(webhook_url="")
+        dispatcher.send("ignored")
+        dispatcher.close()
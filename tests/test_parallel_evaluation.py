@@ -0,0 +1,128 @@
+"""
+Tests for multiprocess portfolio evaluation
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def portfolio_df():
+    rng = np.random.default_rng(7)
+    n = 3_000
+    customers = np.repeat(["333", "111", "222"], n // 3)
+    return pd.DataFrame(
+        {
+            "customer_id": rng.permutation(customers),
+            "campaign_id": np.arange(n),
+            "campaign_name": [f"Campaign {i}" for i in range(n)],
+            "status": pd.Categorical(rng.choice(["ENABLED", "PAUSED"], n)),
+            "cost": rng.uniform(0, 1000, n).round(2),
+            "conversions": rng.integers(0, 20, n),
+            "conversion_value": rng.uniform(0, 3000, n).round(2),
+            "clicks": rng.integers(0, 500, n),
+            "impressions": rng.integers(500, 50_000, n),
+            "ctr": rng.uniform(0, 5, n),
+            "daily_budget": rng.uniform(10, 400, n).round(2),
+        }
+    )
+
+
+@pytest.fixture
+def rules():
+    from automation_rules import RULES
+    from rule_engine import rules_from_thresholds
+
+    definition = rules_from_thresholds(RULES)
+    definition["accounts"] = {"222": {"rules": {"pause_high_cpa": {"params": {"max_cpa": 10.0}}}}}
+    return definition
+
+
+class TestSharedFrame:
+    """Test the memory-mapped column layout round-trips a frame."""
+
+    def test_round_trip(self, tmp_path, portfolio_df):
+        """Test numeric, categorical, string and missing values survive a row range."""
+        from parallel_evaluation import SharedFrame
+
+        portfolio_df.loc[::50, "campaign_name"] = None
+        shared = SharedFrame.create(portfolio_df, str(tmp_path))
+        rows = shared.open().rows(40, 120)
+        expected = portfolio_df.iloc[40:120].reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(rows, expected, check_categorical=False)
+        assert rows["campaign_name"].isna().sum() == 2
+
+
+class TestEvaluatePortfolio:
+    """Test partitioned evaluation matches per-account evaluation."""
+
+    def test_partition_keeps_first_appearance_order(self, portfolio_df):
+        """Test accounts are ordered by first appearance and rows keep their order within an account."""
+        from parallel_evaluation import partition_by_customer
+
+        ordered, partitions = partition_by_customer(portfolio_df)
+
+        assert [customer_id for customer_id, _, _ in partitions] == list(dict.fromkeys(portfolio_df["customer_id"]))
+        for customer_id, start, stop in partitions:
+            ids = portfolio_df.loc[portfolio_df["customer_id"] == customer_id, "campaign_id"].tolist()
+            assert ordered["campaign_id"].iloc[start:stop].tolist() == ids
+
+    def test_processes_match_in_process(self, portfolio_df, rules):
+        """Test the process pool returns the same actions and summaries as evaluating each account."""
+        import parallel_evaluation
+        from automation_rules import evaluate_campaigns
+
+        with patch.object(parallel_evaluation, "MIN_ROWS_PER_PROCESS", 100):
+            parallel = parallel_evaluation.evaluate_portfolio(portfolio_df, rules=rules, processes=2)
+        serial = parallel_evaluation.evaluate_portfolio(portfolio_df, rules=rules, processes=1)
+
+        assert list(parallel["actions"]) == list(dict.fromkeys(portfolio_df["customer_id"]))
+        assert parallel["actions"] == serial["actions"]
+        assert parallel["summary"] == pytest.approx(serial["summary"])
+
+        account = portfolio_df[portfolio_df["customer_id"] == "222"].drop(columns=["customer_id"]).reset_index(drop=True)
+        assert parallel["actions"]["222"] == evaluate_campaigns(account, rules=rules, customer_id="222")
+
+    def test_actions_only(self, portfolio_df, rules):
+        """Test summaries=False skips the summaries in the workers and returns the same actions."""
+        import parallel_evaluation
+
+        with patch("list_campaigns.get_campaign_performance_summary") as summary:
+            actions_only = parallel_evaluation.evaluate_portfolio(portfolio_df, rules=rules, processes=1, summaries=False)
+        with patch.object(parallel_evaluation, "MIN_ROWS_PER_PROCESS", 100):
+            parallel = parallel_evaluation.evaluate_portfolio(portfolio_df, rules=rules, processes=2, summaries=False)
+
+        summary.assert_not_called()
+        assert list(actions_only) == list(parallel) == ["actions"]
+        assert parallel["actions"] == actions_only["actions"]
+
+    def test_run_for_accounts_with_processes(self, portfolio_df):
+        """Test multi-account runs evaluate fetched frames together and keep failure isolation."""
+        import automation_rules
+
+        frames = {
+            customer_id: frame.drop(columns=["customer_id"]).reset_index(drop=True)
+            for customer_id, frame in portfolio_df.groupby("customer_id")
+        }
+
+        def fake_list_campaigns(client, customer_id, **kwargs):
+            if customer_id == "222":
+                raise RuntimeError("boom")
+            return frames[customer_id]
+
+        with patch.object(automation_rules, "list_campaigns", side_effect=fake_list_campaigns):
+            serial = automation_rules.run_automation_rules_for_accounts(customer_ids=["111", "222", "333"], client=MagicMock())
+            parallel = automation_rules.run_automation_rules_for_accounts(
+                customer_ids=["111", "222", "333"], client=MagicMock(), processes=2
+            )
+
+        assert parallel["failed"] == {"222": "boom"}
+        assert parallel["actions"] == serial["actions"]
+        assert {action["customer_id"] for action in parallel["actions"]} == {"111", "333"}
@@ -0,0 +1,113 @@
+"""
+Tests for the campaign query planner
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from datetime import datetime
+
+from benchmarks.fake_google_ads import FakeGoogleAdsClient
+
+
+class TestQueryPlanner:
+    """Test projection, predicate pushdown and plan caching."""
+
+    def test_default_plan_selects_every_column(self):
+        """Test the default query keeps the full list_campaigns field list and filters."""
+        from query_planner import COLUMN_FIELDS, plan_campaign_query
+
+        plan = plan_campaign_query()
+        query = plan.query(days_back=14, end_date=datetime(2026, 3, 15))
+
+        assert plan.fields == tuple(dict.fromkeys(COLUMN_FIELDS.values()))
+        assert "campaign.status != 'REMOVED'" in query
+        assert "segments.date BETWEEN '2026-03-01' AND '2026-03-15'" in query
+        assert "metrics." not in plan_campaign_query(include_metrics=False).query()
+
+    def test_plans_are_cached_per_shape(self):
+        """Test equal shapes share one plan regardless of column order."""
+        from query_planner import plan_campaign_query
+
+        plan = plan_campaign_query(["cost", "campaign_name"], ["metrics.clicks > 0"])
+
+        assert plan_campaign_query(["campaign_name", "cost"], ["metrics.clicks > 0"]) is plan
+        assert plan_campaign_query(["campaign_name", "cost"]) is not plan
+        assert plan.columns == ("campaign_id", "campaign_name", "cost")
+        assert plan.fields == ("campaign.id", "campaign.name", "metrics.cost_micros")
+
+    def test_builtin_rules_projection(self):
+        """Test the built-in rules select only what they read and push min spend down."""
+        from automation_rules import RULES
+        from query_planner import rule_projection
+        from rule_engine import rules_from_thresholds
+
+        columns, predicates, statuses = rule_projection(rules_from_thresholds(RULES))
+
+        assert {"cost", "conversions", "conversion_value", "ctr", "daily_budget", "status"} <= columns
+        assert not {"channel_type", "bidding_strategy", "impressions", "clicks", "avg_cpc"} & columns
+        assert predicates == ["metrics.cost_micros >= 50000000"]
+        assert statuses is None
+
+    def test_pushdown_per_account(self):
+        """Test account overrides, statuses and unpushable conditions."""
+        from query_planner import plan_campaign_query, push_down, rule_projection
+
+        definition = {
+            "skip_if": ["cost < 50", "cpa > 500"],
+            "statuses": ["ENABLED"],
+            "rules": [{"name": "low_ctr", "action": "PAUSE", "when": ["ctr < 0.5"], "reason": "ROAS {roas:.2f}"}],
+            "accounts": {"42": {"skip_if": ["clicks <= 10", "impressions < 99.5", "ctr == 0"]}},
+        }
+
+        columns, predicates, statuses = rule_projection(definition)
+        assert predicates == ["metrics.cost_micros >= 50000000"]
+        assert {"cost", "conversions", "conversion_value", "ctr"} <= columns
+
+        _, predicates, _ = rule_projection(definition, "42")
+        assert predicates == ["metrics.clicks > 10", "metrics.ctr != 0.0"]
+        assert push_down(("avg_cpc", ">", 1.5)) == "metrics.average_cpc <= 1500000.0"
+
+        query = plan_campaign_query(columns, predicates, statuses).query()
+        assert "campaign.status IN ('ENABLED')" in query
+        assert "AND metrics.clicks > 10" in query
+
+    def test_list_campaigns_decodes_projected_columns(self):
+        """Test streamed and paged fetches return only the requested columns, in the usual order."""
+        from list_campaigns import list_campaigns
+
+        client = FakeGoogleAdsClient(campaigns_per_account=50)
+        customer_id = client.accounts[0]
+        full = list_campaigns(client, customer_id, stream=True)
+
+        for stream in (True, False):
+            df = list_campaigns(client, customer_id, stream=stream, columns={"cost", "status", "daily_budget"})
+
+            assert list(df.columns) == ["campaign_id", "status", "daily_budget", "cost"]
+            assert df["cost"].tolist() == full["cost"].tolist()
+            assert df["status"].tolist() == full["status"].tolist()
+
+    def test_cached_frames_are_filtered_like_the_query(self, tmp_path):
+        """Test list_campaigns with a metrics cache applies statuses, predicates and columns locally."""
+        import pytest
+
+        from list_campaigns import list_campaigns
+        from metrics_cache import MetricsCache
+        from query_planner import plan_campaign_query, push_down
+
+        client = FakeGoogleAdsClient(campaigns_per_account=200)
+        customer_id = client.accounts[0]
+        cache = MetricsCache(str(tmp_path / "metrics.sqlite"))
+        full = list_campaigns(client, customer_id, cache=cache)
+        predicates = [push_down(("cost", "<", 300.0)), push_down(("clicks", "<=", 10))]
+
+        df = list_campaigns(
+            client, customer_id, cache=cache, columns={"cost", "clicks"}, statuses=["PAUSED"], predicates=predicates
+        )
+
+        expected = full[(full["status"] == "PAUSED") & (full["cost_micros"] >= 300_000_000) & (full["clicks"] > 10)]
+        assert 0 < len(df) < (full["status"] == "PAUSED").sum()
+        assert list(df.columns) == ["campaign_id", "clicks", "cost"]
+        assert df["campaign_id"].tolist() == expected["campaign_id"].tolist()
+        with pytest.raises(ValueError, match="Cannot apply predicate"):
+            plan_campaign_query(predicates=["campaign.name LIKE '%Brand%'"]).filter(full)
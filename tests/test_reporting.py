@@ -0,0 +1,133 @@
+"""
+Tests for segmented reporting and rollups
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DAYS = ["2026-03-23", "2026-03-24", "2026-03-29", "2026-03-30"]  # Mon, Tue, Sun, Mon
+
+
+def _segmented_row(campaign_id, day, device, network="SEARCH", impressions=1000, clicks=10, cost_micros=25_000_000):
+    """GoogleAdsRow-like object for a segmented campaign query."""
+    return SimpleNamespace(
+        campaign=SimpleNamespace(id=campaign_id, name=f"Campaign {campaign_id}"),
+        segments=SimpleNamespace(date=day, device=SimpleNamespace(name=device), ad_network_type=SimpleNamespace(name=network)),
+        metrics=SimpleNamespace(
+            impressions=impressions,
+            clicks=clicks,
+            cost_micros=cost_micros,
+            conversions=1.0,
+            conversions_value=80.0,
+        ),
+    )
+
+
+def _client(rows):
+    client = MagicMock()
+    ga_service = client.get_service.return_value
+    ga_service.search_stream.side_effect = lambda customer_id, query: iter([SimpleNamespace(results=list(rows))])
+    return client
+
+
+@pytest.fixture
+def rows():
+    return [
+        _segmented_row(campaign_id, day, device) for campaign_id in (1, 2) for day in DAYS for device in ("MOBILE", "DESKTOP")
+    ]
+
+
+class TestSegmentedReport:
+    """Test typed fetching and local rollups."""
+
+    def test_query_selects_segments_for_level(self):
+        """Test the query carries the level's dimensions, segments and metrics."""
+        from reporting import build_report_query
+
+        query, specs = build_report_query(level="keyword", segments=("date", "device"), days_back=7)
+
+        assert "FROM keyword_view" in query
+        assert "ad_group_criterion.keyword.text" in query
+        assert "segments.device" in query
+        assert "segments.ad_network_type" not in query
+        assert [name for name, _, _ in specs][-5:] == [
+            "impressions",
+            "clicks",
+            "cost_micros",
+            "conversions",
+            "conversion_value",
+        ]
+
+    def test_fetch_builds_compact_typed_frame(self, rows):
+        """Test dimensions are categorical and micros stay int64."""
+        from reporting import fetch_segmented_report
+
+        df = fetch_segmented_report(_client(rows), "1234567890")
+
+        assert len(df) == 16
+        assert isinstance(df["device"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["customer_id"].dtype, pd.CategoricalDtype)
+        assert df["cost_micros"].dtype == np.int64
+        assert df["campaign_id"].dtype == np.int64
+        assert df["date"].dtype.kind == "M"
+
+    def test_rollups_are_served_without_refetching(self, rows):
+        """Test campaign x day and account x week rollups come from the stored frame."""
+        from reporting import SegmentedReport
+
+        client = _client(rows)
+        report = SegmentedReport.fetch(client, ["1234567890"]).precompute()
+
+        campaign_day = report.get("campaign_day")
+        assert len(campaign_day) == 8
+        assert campaign_day["impressions"].tolist() == [2000] * 8
+        assert campaign_day["cost_micros"].dtype == np.int64
+
+        account_week = report.get("account_week")
+        assert [str(week.date()) for week in account_week["week"]] == ["2026-03-23", "2026-03-30"]
+        assert account_week["clicks"].tolist() == [120, 40]
+        assert account_week["ctr"].tolist() == pytest.approx([1.0, 1.0])
+
+        assert report.rollup(("campaign_id",), "day") is campaign_day
+        assert client.get_service.return_value.search_stream.call_count == 1
+
+    def test_device_rollup_and_totals(self, rows):
+        """Test non-time rollups and account totals."""
+        from reporting import SegmentedReport, fetch_segmented_report
+
+        report = SegmentedReport(fetch_segmented_report(_client(rows), "1234567890"))
+
+        by_device = report.rollup(("device",))
+        assert set(by_device["device"]) == {"DESKTOP", "MOBILE"}
+        assert by_device["cost"].tolist() == pytest.approx([200.0, 200.0])
+        assert by_device["cpa"].tolist() == pytest.approx([25.0, 25.0])
+
+        totals = report.totals()
+        assert totals["total_impressions"] == 16000
+        assert totals["total_spend"] == pytest.approx(400.0)
+        assert totals["roas"] == pytest.approx(3.2)
+
+    def test_fetch_combines_accounts(self, rows):
+        """Test multi-account reports keep categorical dimensions and roll up per account."""
+        from reporting import SegmentedReport
+
+        report = SegmentedReport.fetch(_client(rows), ["111", "222"])
+
+        assert isinstance(report.frame["customer_id"].dtype, pd.CategoricalDtype)
+        assert report.get("account_day")["customer_id"].astype(str).unique().tolist() == ["111", "222"]
+
+    def test_unknown_grain_raises(self, rows):
+        """Test an unsupported time grain is rejected."""
+        from reporting import SegmentedReport, fetch_segmented_report
+
+        report = SegmentedReport(fetch_segmented_report(_client(rows), "1234567890"))
+
+        with pytest.raises(ValueError):
+            report.rollup(("campaign_id",), "quarter")
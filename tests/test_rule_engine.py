@@ -0,0 +1,194 @@
+"""
+Tests for the declarative rule engine
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def campaigns_df():
+    return pd.DataFrame(
+        [
+            {"campaign_id": "1", "campaign_name": "Brand Search", "cost": 500.0, "conversions": 2, "ctr": 3.0},
+            {"campaign_id": "2", "campaign_name": "Generic Search", "cost": 500.0, "conversions": 2, "ctr": 3.0},
+            {"campaign_id": "3", "campaign_name": "Generic Display", "cost": 80.0, "conversions": 0, "ctr": 0.2},
+            {"campaign_id": "4", "campaign_name": "Tiny", "cost": 10.0, "conversions": 0, "ctr": 0.1},
+        ]
+    )
+
+
+def _definition():
+    return {
+        "skip_if": ["cost < 50"],
+        "rules": [
+            {
+                "name": "pause_low_ctr",
+                "priority": 20,
+                "action": "PAUSE",
+                "when": ["ctr < min_ctr"],
+                "params": {"min_ctr": 0.5},
+                "reason": "CTR {ctr:.2f}%",
+            },
+            {
+                "name": "pause_high_cpa",
+                "priority": 10,
+                "action": "pause",
+                "when": ["cpa > max_cpa"],
+                "params": {"max_cpa": 100},
+                "reason": "CPA ${cpa:.2f} > ${max_cpa}",
+                "campaigns": {"exclude": ["brand"]},
+            },
+        ],
+        "accounts": {"999": {"rules": {"pause_high_cpa": {"params": {"max_cpa": 300}}}}},
+    }
+
+
+class TestRuleEngine:
+    """Test compiling and evaluating rule definitions."""
+
+    def test_parse_condition(self):
+        """Test conditions resolve numbers and named params."""
+        from rule_engine import RuleDefinitionError, parse_condition
+
+        assert parse_condition("cpa > 100") == ("cpa", ">", 100.0)
+        assert parse_condition("ctr<=min_ctr", {"min_ctr": 0.5}) == ("ctr", "<=", 0.5)
+
+        with pytest.raises(RuleDefinitionError):
+            parse_condition("cpa > max_cpa")
+        with pytest.raises(RuleDefinitionError):
+            parse_condition("cpa is high")
+
+    def test_priorities_filters_and_skip(self, campaigns_df):
+        """Test priority order, name excludes and skip_if in one pass."""
+        from rule_engine import compile_rules
+
+        actions = compile_rules(_definition()).evaluate(campaigns_df)
+
+        assert [(a["campaign_id"], a["action"], a["reason"]) for a in actions] == [
+            ("2", "PAUSE", "CPA $250.00 > $100"),
+            ("3", "PAUSE", "CTR 0.20%"),
+        ]
+
+    def test_account_override(self, campaigns_df):
+        """Test per-account params replace the defaults for that account only."""
+        from rule_engine import compile_rules
+
+        actions = compile_rules(_definition(), customer_id="999").evaluate(campaigns_df)
+
+        assert [a["campaign_id"] for a in actions] == ["3"]
+        assert compile_rules(_definition(), customer_id="111") is compile_rules(_definition())
+
+    def test_statuses_filter(self, campaigns_df):
+        """Test only campaigns with a listed status are evaluated, with per-account replacement."""
+        from rule_engine import compile_rules
+
+        campaigns_df["status"] = pd.Categorical(["ENABLED", "PAUSED", "PAUSED", "ENABLED"])
+        definition = {**_definition(), "statuses": ["enabled"]}
+        definition["accounts"] = {"999": {"statuses": ["ENABLED", "PAUSED"]}}
+
+        assert compile_rules(definition).evaluate(campaigns_df) == []
+        assert [a["campaign_id"] for a in compile_rules(definition, customer_id="999").evaluate(campaigns_df)] == ["2", "3"]
+
+    def test_plans_are_cached(self):
+        """Test identical definitions reuse one compiled plan."""
+        from rule_engine import compile_rules
+
+        assert compile_rules(_definition()) is compile_rules(_definition())
+
+    def test_increase_budget_needs_room(self):
+        """Test budget increases only match when the capped budget is higher."""
+        from rule_engine import compile_rules
+
+        definition = {
+            "rules": [
+                {
+                    "name": "scale",
+                    "action": "INCREASE_BUDGET",
+                    "when": ["roas > 3"],
+                    "params": {"percent": 20, "max_budget": 500},
+                }
+            ]
+        }
+        df = pd.DataFrame(
+            {
+                "campaign_id": ["1", "2"],
+                "campaign_name": ["A", "B"],
+                "cost": [100.0, 100.0],
+                "conversion_value": [1000.0, 1000.0],
+                "daily_budget": [100.0, 500.0],
+            }
+        )
+
+        actions = compile_rules(definition).evaluate(df)
+
+        assert len(actions) == 1
+        assert actions[0]["new_budget"] == pytest.approx(120.0)
+
+    def test_many_rules_match_first_priority(self):
+        """Test hundreds of rules over a large frame give each campaign its first match."""
+        from rule_engine import compile_rules
+
+        n = 10_000
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame(
+            {
+                "campaign_id": np.arange(n),
+                "campaign_name": [f"Campaign {i}" for i in range(n)],
+                "cost": rng.uniform(0, 1000, n),
+            }
+        )
+        definition = {
+            "rules": [
+                {"name": f"over_{t}", "priority": -t, "action": "PAUSE", "when": [f"cost > {t}"], "reason": str(t)}
+                for t in range(0, 1000, 5)
+            ]
+        }
+
+        actions = compile_rules(definition).evaluate(df)
+
+        expected = (df["cost"].to_numpy() - 1e-9) // 5 * 5
+        assert [int(a["reason"]) for a in actions] == expected.astype(int).tolist()
+
+    def test_invalid_definitions(self):
+        """Test malformed rules are rejected at compile time."""
+        from rule_engine import RuleDefinitionError, compile_rules
+
+        with pytest.raises(RuleDefinitionError):
+            compile_rules({"rules": [{"name": "x", "action": "DELETE"}]})
+        with pytest.raises(RuleDefinitionError):
+            compile_rules({"rules": [{"name": "x", "action": "INCREASE_BUDGET", "params": {"percent": 10}}]})
+        with pytest.raises(RuleDefinitionError):
+            compile_rules({"rules": [], "accounts": {"1": {"rules": {"missing": {}}}}}, customer_id="1")
+
+    def test_example_file_loads(self):
+        """Test the shipped example rule set compiles, overrides included."""
+        from rule_engine import load_rules
+
+        definition = load_rules(os.path.join(REPO_ROOT, "rules.example.yaml"))
+
+        assert [rule["name"] for rule in definition["rules"]] == [
+            "pause_high_cpa",
+            "pause_low_ctr",
+            "increase_budget_high_roas",
+        ]
+
+    def test_json_matches_builtin_rules(self, tmp_path, campaigns_df):
+        """Test the built-in thresholds round-trip through a JSON file."""
+        import json
+
+        from automation_rules import RULES, evaluate_campaigns
+        from rule_engine import load_rules, rules_from_thresholds
+
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(rules_from_thresholds(RULES)))
+
+        assert evaluate_campaigns(campaigns_df, rules=load_rules(str(path))) == evaluate_campaigns(campaigns_df)
@@ -0,0 +1,255 @@
+"""
+Tests for the scheduler daemon
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+
+class TestScheduledJob:
+    """Test overlap protection."""
+
+    def test_overlapping_run_is_skipped(self):
+        """Test a tick is skipped while the previous run is still in progress."""
+        from scheduler_daemon import ScheduledJob
+
+        release = threading.Event()
+        calls = []
+
+        def slow_job():
+            calls.append(1)
+            release.wait(5)
+
+        job = ScheduledJob("slow", slow_job)
+
+        assert job() is True
+        assert job() is False
+
+        release.set()
+        job.wait(5)
+
+        assert job() is True
+        job.wait(5)
+        assert len(calls) == 2
+
+    def test_failing_job_releases_lock(self):
+        """Test an exception in a job does not block later runs."""
+        from scheduler_daemon import ScheduledJob
+
+        job = ScheduledJob("broken", MagicMock(side_effect=RuntimeError("boom")))
+
+        assert job() is True
+        job.wait(5)
+        assert job() is True
+        job.wait(5)
+
+
+class TestAutomationDaemon:
+    """Test the warm client and the scheduler loop."""
+
+    def test_service_stubs_are_cached(self):
+        """Test the daemon's client reuses service stubs."""
+        from google_ads_client import CachedServiceClient
+
+        raw_client = MagicMock()
+        raw_client.get_service.side_effect = lambda name: MagicMock(name=name)
+        client = CachedServiceClient(raw_client)
+
+        assert client.get_service("GoogleAdsService") is client.get_service("GoogleAdsService")
+        assert raw_client.get_service.call_count == 1
+        assert client.enums is raw_client.enums
+
+    def test_run_until_stopped(self):
+        """Test the loop runs rules at startup with the shared client and stops cleanly."""
+        from scheduler_daemon import AutomationDaemon
+
+        with patch("scheduler_daemon.run_automation_rules") as run_rules:
+            daemon = AutomationDaemon(client=MagicMock(), rules_every_minutes=15, report_at=None)
+            loop = threading.Thread(target=daemon.run, kwargs={"poll_seconds": 0.01})
+            loop.start()
+
+            daemon.rules_job.wait(5)
+            daemon.stop()
+            loop.join(5)
+
+        assert not loop.is_alive()
+        run_rules.assert_called_once()
+        assert run_rules.call_args.kwargs["client"] is daemon.client
+
+    def test_rules_share_the_daemon_cache(self, tmp_path, monkeypatch):
+        """Test rules runs reuse the daemon's MetricsCache instead of opening one per tick."""
+        from benchmarks.fake_google_ads import FakeGoogleAdsClient
+        from scheduler_daemon import AutomationDaemon
+
+        client = FakeGoogleAdsClient(campaigns_per_account=20)
+        monkeypatch.setenv("GOOGLE_ADS_CUSTOMER_ID", client.accounts[0])
+        daemon = AutomationDaemon(client=client, cache_path=str(tmp_path / "cache.sqlite"), report_at=None)
+
+        with (
+            patch("automation_rules.MetricsCache") as opened,
+            patch("automation_rules.run_account_rules", return_value=[]) as run_account_rules,
+        ):
+            daemon.run_rules()
+            daemon.run_rules()
+
+        opened.assert_not_called()
+        assert run_account_rules.call_count == 2
+        assert all(call.kwargs["cache"] is daemon.cache for call in run_account_rules.call_args_list)
+
+    def test_snapshots_are_read_once_across_ticks(self, tmp_path, monkeypatch):
+        """Test diff mode keeps the daemon's snapshots in memory, so a second tick does not re-read the file."""
+        import sqlite3
+
+        from benchmarks.fake_google_ads import FakeGoogleAdsClient
+        from scheduler_daemon import AutomationDaemon
+
+        client = FakeGoogleAdsClient(campaigns_per_account=200)
+        monkeypatch.setenv("GOOGLE_ADS_CUSTOMER_ID", client.accounts[0])
+        daemon = AutomationDaemon(client=client, snapshot_path=str(tmp_path / "snapshots.sqlite"), report_at=None)
+
+        statements = []
+        connect = sqlite3.connect
+
+        def traced_connect(*args, **kwargs):
+            conn = connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch("change_detection.sqlite3.connect", side_effect=traced_connect):
+            daemon.run_rules()
+            first = len(statements)
+            daemon.run_rules()
+
+        reads = [statement for statement in statements if statement.startswith("SELECT") and "campaign_snapshots" in statement]
+        assert len(reads) == 1 and statements.index(reads[0]) < first
+
+    def test_overlapping_rules_and_pacing_raise_a_budget_once(self, tmp_path):
+        """Test the rules and pacing jobs, running at the same time on one ledger, cannot both raise a budget."""
+        import automation_rules
+        from action_ledger import ActionLedger
+        from scheduler_daemon import AutomationDaemon
+
+        raise_budget = {
+            "campaign_id": 7,
+            "campaign_name": "Campaign 7",
+            "action": "INCREASE_BUDGET",
+            "reason": "ROAS",
+            "current_budget": 100.0,
+        }
+        entered, release = threading.Event(), threading.Event()
+        applied = []
+        results = {}
+
+        def slow_apply(client, customer_id, actions, **kwargs):
+            applied.append(actions)
+            if actions:
+                entered.set()
+                release.wait(5)
+            return [{**action, "status": "APPLIED", "error": None} for action in actions]
+
+        def job(name, new_budget):
+            def run(**kwargs):
+                ledger = ActionLedger(kwargs["ledger_path"])
+                action = {**raise_budget, "new_budget": new_budget}
+                results[name] = automation_rules.apply_actions(MagicMock(), "123", [action], dry_run=False, ledger=ledger)
+
+            return run
+
+        with (
+            patch("scheduler_daemon.run_automation_rules", side_effect=job("rules", 120.0)),
+            patch("scheduler_daemon.run_pacing_for_accounts", side_effect=job("pacing", 150.0)),
+            patch("scheduler_daemon.get_customer_id", return_value="123"),
+            patch.object(automation_rules, "apply_actions_batched", side_effect=slow_apply),
+            patch.object(automation_rules, "get_dispatcher", return_value=MagicMock()),
+        ):
+            daemon = AutomationDaemon(
+                client=MagicMock(),
+                dry_run=False,
+                ledger_path=str(tmp_path / "ledger.sqlite"),
+                pacing_path=str(tmp_path / "pacing.sqlite"),
+                report_at=None,
+            )
+            daemon.rules_job()
+            assert entered.wait(5)
+            daemon.pacing_job()
+            daemon.pacing_job.wait(5)
+            release.set()
+            daemon.rules_job.wait(5)
+
+        assert [len(actions) for actions in applied] == [1, 0]
+        assert [r["status"] for r in results["rules"]] == ["APPLIED"]
+        assert results["pacing"][0]["error"].startswith("In progress in another run")
+        history = ActionLedger(daemon.ledger_path).history("123")
+        assert [(row["new_budget"], row["status"]) for row in history] == [(120.0, "APPLIED")]
+
+    def test_overlapping_jobs_raise_a_shared_budget_once(self, tmp_path):
+        """Test rules and pacing raising one shared budget through different campaigns only apply one raise."""
+        import automation_rules
+        from action_ledger import ActionLedger
+        from scheduler_daemon import AutomationDaemon
+
+        budget = "customers/123/campaignBudgets/9"
+        entered, release = threading.Event(), threading.Event()
+        applied = []
+        results = {}
+
+        def slow_apply(client, customer_id, actions, **kwargs):
+            applied.append(actions)
+            if actions:
+                entered.set()
+                release.wait(5)
+            return [{**action, "status": "APPLIED", "error": None} for action in actions]
+
+        def raise_budget(campaign_id, new_budget):
+            return {
+                "campaign_id": campaign_id,
+                "campaign_name": f"Campaign {campaign_id}",
+                "action": "INCREASE_BUDGET",
+                "reason": "ROAS",
+                "current_budget": 100.0,
+                "new_budget": new_budget,
+            }
+
+        def rules(**kwargs):
+            # Rules actions carry no budget; it comes from the list_campaigns budget index
+            ledger = ActionLedger(kwargs["ledger_path"])
+            index = {"7": {"resource_name": budget, "shared": True}}
+            results["rules"] = automation_rules.apply_actions(
+                MagicMock(), "123", [raise_budget(7, 120.0)], dry_run=False, ledger=ledger, budget_index=index
+            )
+
+        def pacing(**kwargs):
+            ledger = ActionLedger(kwargs["ledger_path"])
+            action = {**raise_budget(8, 150.0), "budget_resource_name": budget}
+            results["pacing"] = automation_rules.apply_actions(MagicMock(), "123", [action], dry_run=False, ledger=ledger)
+
+        with (
+            patch("scheduler_daemon.run_automation_rules", side_effect=rules),
+            patch("scheduler_daemon.run_pacing_for_accounts", side_effect=pacing),
+            patch("scheduler_daemon.get_customer_id", return_value="123"),
+            patch.object(automation_rules, "apply_actions_batched", side_effect=slow_apply),
+            patch.object(automation_rules, "get_dispatcher", return_value=MagicMock()),
+        ):
+            daemon = AutomationDaemon(
+                client=MagicMock(),
+                dry_run=False,
+                ledger_path=str(tmp_path / "ledger.sqlite"),
+                pacing_path=str(tmp_path / "pacing.sqlite"),
+                report_at=None,
+            )
+            daemon.rules_job()
+            assert entered.wait(5)
+            daemon.pacing_job()
+            daemon.pacing_job.wait(5)
+            release.set()
+            daemon.rules_job.wait(5)
+
+        assert [len(actions) for actions in applied] == [1, 0]
+        assert results["pacing"][0]["error"].startswith("In progress in another run")
+        history = ActionLedger(daemon.ledger_path).history("123")
+        assert [(row["campaign_id"], row["budget_resource_name"], row["status"]) for row in history] == [
+            ("7", budget, "APPLIED")
+        ]
@@ -0,0 +1,35 @@
+"""
+Startup regression tests
+Empire Amplify
+
+Fails when an entry point starts importing heavy dependencies eagerly.
+Import-time budgets depend on the machine, so they are only enforced when
+STARTUP_BUDGET_SCALE is set (or with python benchmarks/startup_benchmark.py).
+
+Run with: pytest tests/ -v
+"""
+
+import os
+
+import pytest
+
+from benchmarks.startup_benchmark import STARTUP_BUDGETS, check_module
+
+
+@pytest.mark.parametrize("module", sorted(STARTUP_BUDGETS))
+def test_imports_lazily(module):
+    """Test the module does not import pandas, the Google Ads SDK or requests at import time."""
+    _, failures = check_module(module, None, runs=1)
+
+    assert not failures, "\n".join(failures)
+
+
+@pytest.mark.skipif("STARTUP_BUDGET_SCALE" not in os.environ, reason="set STARTUP_BUDGET_SCALE to enforce import budgets")
+@pytest.mark.parametrize("module", sorted(STARTUP_BUDGETS))
+def test_import_within_budget(module):
+    """Test the module imports within its startup budget."""
+    scale = float(os.environ["STARTUP_BUDGET_SCALE"])
+
+    _, failures = check_module(module, STARTUP_BUDGETS[module], scale=scale)
+
+    assert not failures, "\n".join(failures)
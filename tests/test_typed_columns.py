@@ -0,0 +1,69 @@
+"""
+Tests for the typed column reader
+Empire Amplify
+
+Run with: pytest tests/ -v
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+SPECS = [
+    ("campaign_id", "campaign.id", "int"),
+    ("campaign_name", "campaign.name", "str"),
+    ("status", "campaign.status", "enum"),
+    ("budget_shared", "campaign_budget.explicitly_shared", "bool"),
+    ("date", "segments.date", "date"),
+    ("cost_micros", "metrics.cost_micros", "int"),
+    ("cost", "metrics.cost_micros", "int"),
+    ("conversions", "metrics.conversions", "float"),
+]
+
+
+def _rows(n):
+    from benchmarks.fake_google_ads import _ENUMS
+
+    return [
+        SimpleNamespace(
+            campaign=SimpleNamespace(id=i, name=f"Campaign {i}", status=_ENUMS["ENABLED" if i % 2 else "PAUSED"]),
+            campaign_budget=SimpleNamespace(explicitly_shared=i % 3 == 0),
+            segments=SimpleNamespace(date=f"2026-03-{i % 28 + 1:02d}"),
+            metrics=SimpleNamespace(cost_micros=i * 1_000_000, conversions=i / 2),
+        )
+        for i in range(n)
+    ]
+
+
+class TestTypedColumns:
+    """Test typed buffers and chunked streaming."""
+
+    def test_kinds_become_typed_columns(self):
+        """Test every kind decodes to its dtype and columns naming one field share its buffer."""
+        from typed_columns import TypedColumns
+
+        columns = TypedColumns(SPECS)
+        columns.extend(_rows(3))
+        df = columns.to_frame()
+
+        assert len(columns) == 3 and len(columns.buffers) == 7
+        assert df["campaign_id"].dtype == np.int64 and df["conversions"].dtype == np.float64
+        assert df["budget_shared"].tolist() == [True, False, False]
+        assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+        assert df["status"].tolist() == ["PAUSED", "ENABLED", "PAUSED"]
+        assert df["date"].iloc[1] == pd.Timestamp("2026-03-02")
+        assert df["cost"].tolist() == df["cost_micros"].tolist() == [0, 1_000_000, 2_000_000]
+
+    def test_chunks_are_exact_across_batches(self):
+        """Test chunks hold exactly chunk_size rows however the stream is batched."""
+        from typed_columns import iter_column_chunks
+
+        rows = _rows(23)
+        batches = [SimpleNamespace(results=rows[start:end]) for start, end in ((0, 7), (7, 14), (14, 21), (21, 23))]
+        ga_service = SimpleNamespace(search_stream=lambda customer_id, query: iter(batches))
+
+        chunks = [chunk.to_frame() for chunk in iter_column_chunks(ga_service, "1", "", SPECS, chunk_size=5)]
+
+        assert [len(chunk) for chunk in chunks] == [5, 5, 5, 5, 3]
+        assert pd.concat(chunks)["campaign_id"].tolist() == list(range(23))
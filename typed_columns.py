@@ -0,0 +1,208 @@
+"""
+Typed Column Reader
+Empire Amplify - Campaign Management
+
+Decodes search_stream rows straight into typed column buffers:
+- Rows are read as raw protobuf messages (no proto-plus wrapper per row)
+- Each column spec is (name, GAQL field, kind); fields are grouped by parent
+  message, so each parent is read once per row, a whole batch at a time
+- int/float/bool fields go into array.array buffers and become numpy arrays
+  without a copy; enums are kept as int32 codes and named once per value
+- Streams can be cut into chunks of a fixed row count for bounded memory
+"""
+
+from array import array
+from operator import attrgetter
+
+import numpy as np
+
+# Column kinds: array typecode and numpy dtype of the buffered kinds
+_ARRAY_KINDS = {"int": ("q", np.int64), "float": ("d", np.float64), "bool": ("b", np.int8)}
+
+# Other kinds: "str" (list of str), "category" (str as pandas.Categorical),
+# "enum" (enum name as pandas.Categorical) and "date" (YYYY-MM-DD as datetime64[D])
+KINDS = (*_ARRAY_KINDS, "str", "category", "enum", "date")
+
+
+def raw_results(batch):
+    """
+    Rows of a search_stream batch as raw protobuf messages.
+
+    proto-plus wrappers are unwrapped with pb(), which shares the underlying
+    message instead of copying it; field reads on the raw message are plain
+    C attribute lookups, as with use_proto_plus=False.
+    """
+    pb = getattr(type(batch), "pb", None)
+    return (pb(batch) if pb is not None else batch).results
+
+
+def _enum_name(message, field, value):
+    """Name of an enum value read from message.field (proto-plus member or raw number)."""
+    name = getattr(value, "name", None)
+    if name is None:
+        name = message.DESCRIPTOR.fields_by_name[field].enum_type.values_by_number[value].name
+    return name
+
+
+class _EnumColumn:
+    """
+    Enum column buffered as int32 codes.
+
+    Raw protobuf rows carry enum numbers and proto-plus rows IntEnum members;
+    both are stored as numbers and each distinct number is named once, when
+    it is first seen. Values that only carry a .name are stored by name.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.numeric = None
+        self.codes = array("i")
+        self.names = {}
+        self.labels = []
+
+    def extend(self, messages):
+        """Append the field of every message, naming new numbers once per batch."""
+        messages = list(messages)
+        if not messages:
+            return
+        values = list(map(attrgetter(self.field), messages))
+        if self.numeric is None:
+            self.numeric = isinstance(values[0], int)
+
+        if self.numeric:
+            self.codes.extend(values)
+            for value in set(values).difference(self.names):
+                self.names[value] = _enum_name(messages[0], self.field, value)
+        else:
+            self.labels.extend(value.name for value in values)
+
+    def to_categorical(self):
+        import pandas as pd
+
+        if not self.numeric:
+            return pd.Categorical(self.labels)
+        if not self.names:
+            return pd.Categorical([])
+
+        numbers = np.array(sorted(self.names, key=self.names.get), dtype=np.int64)
+        lookup = np.zeros(int(numbers.max()) + 1, dtype=np.int32)
+        lookup[numbers] = np.arange(len(numbers), dtype=np.int32)
+        codes = lookup[np.frombuffer(self.codes, dtype=np.int32)]
+        return pd.Categorical.from_codes(codes, categories=[self.names[number] for number in numbers])
+
+
+class TypedColumns:
+    """
+    Typed column buffers for streamed rows.
+
+    Args:
+        specs: (column name, GAQL field, kind) per column, kind from KINDS;
+            columns naming the same field share one buffer
+    """
+
+    def __init__(self, specs):
+        self.specs = list(specs)
+        self.buffers = {}
+        self.rows = 0
+
+        # Enum buffers take the parent message and read their field themselves
+        groups = {}
+        for _, field, kind in self.specs:
+            if field in self.buffers:
+                continue
+            root, leaf = field.split(".", 1)
+            if kind == "enum":
+                buffer, read = _EnumColumn(leaf), None
+            else:
+                buffer, read = (array(_ARRAY_KINDS[kind][0]) if kind in _ARRAY_KINDS else []), attrgetter(leaf)
+            groups.setdefault(root, []).append((read, buffer))
+            self.buffers[field] = buffer
+
+        self._groups = [(attrgetter(root), fields) for root, fields in groups.items()]
+
+    def __len__(self):
+        return self.rows
+
+    def extend(self, rows):
+        """Append a sequence of raw rows, one field at a time."""
+        for read_parent, fields in self._groups:
+            parents = list(map(read_parent, rows))
+            for read, buffer in fields:
+                buffer.extend(map(read, parents) if read else parents)
+        self.rows += len(rows)
+
+    def to_columns(self):
+        """
+        Column values by name.
+
+        Returns:
+            dict: numpy arrays for int/float/bool/date, pandas.Categorical for
+            category/enum and lists for str
+        """
+        import pandas as pd
+
+        columns = {}
+        for name, field, kind in self.specs:
+            buffer = self.buffers[field]
+            if kind in _ARRAY_KINDS:
+                values = np.frombuffer(buffer, dtype=_ARRAY_KINDS[kind][1])
+                columns[name] = values.astype(bool) if kind == "bool" else values
+            elif kind == "enum":
+                columns[name] = buffer.to_categorical()
+            elif kind == "category":
+                columns[name] = pd.Categorical(buffer)
+            elif kind == "date":
+                columns[name] = np.array(buffer, dtype="datetime64[D]")
+            else:
+                columns[name] = buffer
+        return columns
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.to_columns())
+
+
+def read_columns(ga_service, customer_id, query, specs):
+    """
+    Stream a whole query into typed columns.
+
+    Args:
+        ga_service: GoogleAdsService client
+        customer_id: Customer ID to query
+        query: GAQL query selecting the specs' fields
+        specs: (column name, GAQL field, kind) per column
+
+    Returns:
+        TypedColumns: Buffers holding every row
+    """
+    columns = TypedColumns(specs)
+    for batch in ga_service.search_stream(customer_id=customer_id, query=query):
+        columns.extend(raw_results(batch))
+    return columns
+
+
+def iter_column_chunks(ga_service, customer_id, query, specs, chunk_size):
+    """
+    Stream a query as TypedColumns of exactly chunk_size rows (the last one may be shorter).
+
+    Stream batches are sliced, so chunks never exceed chunk_size even when a
+    batch is larger, and only one chunk is buffered at a time.
+
+    Yields:
+        TypedColumns: One chunk of rows
+    """
+    columns = TypedColumns(specs)
+    for batch in ga_service.search_stream(customer_id=customer_id, query=query):
+        rows = raw_results(batch)
+        start = 0
+        while start < len(rows):
+            stop = start + chunk_size - len(columns)
+            columns.extend(rows[start:stop])
+            start = stop
+            if len(columns) >= chunk_size:
+                yield columns
+                columns = TypedColumns(specs)
+
+    if len(columns):
+        yield columns